@@ -1135,7 +1135,9 @@ class TranslationViewSet(MultipleFieldMixin, WeblateViewSet, DestroyModelMixin):
             report_error()
             raise ValidationError(f"Failed to parse query string: {error}")
 
-        queryset = obj.unit_set.search(query_string).order_by("id").prefetch()
+        queryset = (
+            obj.unit_set.search(query_string, translation=obj).order_by("id").prefetch()
+        )
         page = self.paginate_queryset(queryset)
 
         serializer = UnitSerializer(page, many=True, context={"request": request})
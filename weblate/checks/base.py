@@ -30,6 +30,9 @@ from siphashc import siphash
 
 from weblate.utils.docs import get_doc_url
 
+# Number of stale checks deleted in a single query
+DELETE_BATCH_SIZE = 1000
+
 
 class Check:
     """Basic class for checks."""
@@ -46,6 +49,9 @@ class Check:
     always_display = False
     batch_project_wide = False
     skip_suggestions = False
+    # Result depends only on strings, flags, state and languages of the unit
+    # and can be cached, see Unit.get_checks_cache_key
+    cacheable = False
 
     def get_identifier(self):
         return self.check_id
@@ -231,28 +237,32 @@ class Check:
 
         Check.objects.bulk_create(create, batch_size=500, ignore_conflicts=True)
 
-        # Delete stale checks
-        stale_checks = Check.objects.exclude(unit_id__in=handled)
+        # Delete stale checks, these are looked up in Python as the list of
+        # handled units can be huge
+        existing = Check.objects.filter(name=self.check_id)
         if self.batch_project_wide and component.allow_translation_propagation:
-            stale_checks = stale_checks.filter(
+            existing = existing.filter(
                 unit__translation__component__project=component.project,
                 unit__translation__component__allow_translation_propagation=True,
-                name=self.check_id,
             )
-            for current in Component.objects.filter(
-                pk__in=stale_checks.values_list(
-                    "unit__translation__component", flat=True
-                )
-            ):
-                components[current.pk] = current
-            stale_checks.delete()
         else:
-            stale_checks = stale_checks.filter(
-                unit__translation__component=component,
-                name=self.check_id,
-            )
-            if stale_checks.delete()[0]:
-                components[component.id] = component
+            existing = existing.filter(unit__translation__component=component)
+        stale = []
+        stale_components = set()
+        for pk, unit_id, component_id in existing.values_list(
+            "pk", "unit_id", "unit__translation__component_id"
+        ).iterator(chunk_size=DELETE_BATCH_SIZE):
+            if unit_id not in handled:
+                stale.append(pk)
+                stale_components.add(component_id)
+        for start in range(0, len(stale), DELETE_BATCH_SIZE):
+            Check.objects.filter(
+                pk__in=stale[start : start + DELETE_BATCH_SIZE]
+            ).delete()
+        for current in Component.objects.filter(
+            pk__in=stale_components - components.keys()
+        ):
+            components[current.pk] = current
 
         # Invalidate stats in case there were changes
         for current in components.values():
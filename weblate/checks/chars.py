@@ -34,6 +34,7 @@ class BeginNewlineCheck(TargetCheck):
     check_id = "begin_newline"
     name = _("Starting newline")
     description = _("Source and translation do not both start with a newline")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         return self.check_chars(source, target, 0, ["\n"])
@@ -45,6 +46,7 @@ class EndNewlineCheck(TargetCheck):
     check_id = "end_newline"
     name = _("Trailing newline")
     description = _("Source and translation do not both end with a newline")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         return self.check_chars(source, target, -1, ["\n"])
@@ -58,6 +60,7 @@ class BeginSpaceCheck(TargetCheck):
     description = _(
         "Source and translation do not both start with same number of spaces"
     )
+    cacheable = True
 
     def check_single(self, source, target, unit):
         # One letter things are usually decimal/thousand separators
@@ -95,6 +98,7 @@ class EndSpaceCheck(TargetCheck):
     check_id = "end_space"
     name = _("Trailing space")
     description = _("Source and translation do not both end with a space")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         # One letter things are usually decimal/thousand separators
@@ -134,6 +138,7 @@ class DoubleSpaceCheck(TargetCheck):
     check_id = "double_space"
     name = _("Double space")
     description = _("Translation contains double space")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         # One letter things are usually decimal/thousand separators
@@ -156,6 +161,7 @@ class EndStopCheck(TargetCheck):
     check_id = "end_stop"
     name = _("Mismatched full stop")
     description = _("Source and translation do not both end with a full stop")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         if len(source) <= 4:
@@ -201,6 +207,7 @@ class EndColonCheck(TargetCheck):
     check_id = "end_colon"
     name = _("Mismatched colon")
     description = _("Source and translation do not both end with a colon")
+    cacheable = True
 
     def _check_hy(self, source, target):
         if source[-1] == ":":
@@ -233,6 +240,7 @@ class EndQuestionCheck(TargetCheck):
     name = _("Mismatched question mark")
     description = _("Source and translation do not both end with a question mark")
     question_el = ("?", ";", ";")
+    cacheable = True
 
     def _check_hy(self, source, target):
         if source[-1] == "?":
@@ -272,6 +280,7 @@ class EndExclamationCheck(TargetCheck):
     check_id = "end_exclamation"
     name = _("Mismatched exclamation mark")
     description = _("Source and translation do not both end with an exclamation mark")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         if not source or not target:
@@ -298,6 +307,7 @@ class EndEllipsisCheck(TargetCheck):
     check_id = "end_ellipsis"
     name = _("Mismatched ellipsis")
     description = _("Source and translation do not both end with an ellipsis")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         if not target:
@@ -319,6 +329,7 @@ class EscapedNewlineCountingCheck(CountingCheck):
     description = _("Number of \\n literals in translation does not match source")
 
     ignore_re = re.compile(r"[A-Z]:\\\\[^\\ ]+(\\[^\\ ]+)+")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         if not target or not source:
@@ -336,6 +347,7 @@ class NewLineCountCheck(CountingCheck):
     check_id = "newline-count"
     name = _("Mismatching line breaks")
     description = _("Number of new lines in translation does not match source")
+    cacheable = True
 
 
 class ZeroWidthSpaceCheck(TargetCheck):
@@ -344,6 +356,7 @@ class ZeroWidthSpaceCheck(TargetCheck):
     check_id = "zero-width-space"
     name = _("Zero-width space")
     description = _("Translation contains extra zero-width space character")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         if self.is_language(unit, ("km",)):
@@ -363,6 +376,7 @@ class MaxLengthCheck(TargetCheckParametrized):
     name = _("Maximum length of translation")
     description = _("Translation should not exceed given length")
     default_disabled = True
+    cacheable = True
 
     @property
     def param_type(self):
@@ -379,6 +393,7 @@ class EndSemicolonCheck(TargetCheck):
     check_id = "end_semicolon"
     name = _("Mismatched semicolon")
     description = _("Source and translation do not both end with a semicolon")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         if self.is_language(unit, ("el",)) and source and source[-1] == "?":
@@ -401,6 +416,7 @@ class KashidaCheck(TargetCheck):
         "[\u0640\uFCF2\uFCF3\uFCF4\uFE71\uFE77\uFE79\uFE7B\uFE7D\uFE7F]"
     )
     kashida_re = re.compile(kashida_regex)
+    cacheable = True
 
     def check_single(self, source, target, unit):
         return self.kashida_re.search(target)
@@ -413,6 +429,7 @@ class PunctuationSpacingCheck(TargetCheck):
     check_id = "punctuation_spacing"
     name = _("Punctuation spacing")
     description = _("Missing non breakable space before double punctuation sign")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         if (
@@ -17,14 +17,16 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from functools import reduce
-
-from django.db.models import Count, Prefetch, Q
+from django.db.models import BooleanField, Case, Value, When
+from django.db.models.functions import MD5
 from django.utils.translation import gettext_lazy as _
 
 from weblate.checks.base import TargetCheck
 from weblate.utils.state import STATE_TRANSLATED
 
+# Number of strings fetched at once in batch checks
+BATCH_SIZE = 1000
+
 
 class PluralsCheck(TargetCheck):
     """Check for incomplete plural forms."""
@@ -32,6 +34,7 @@ class PluralsCheck(TargetCheck):
     check_id = "plurals"
     name = _("Missing plurals")
     description = _("Some plural forms are untranslated")
+    cacheable = True
 
     def should_skip(self, unit):
         if unit.translation.component.is_multivalue:
@@ -59,6 +62,7 @@ class SamePluralsCheck(TargetCheck):
     check_id = "same-plurals"
     name = _("Same plurals")
     description = _("Some plural forms are translated in the same way")
+    cacheable = True
 
     def check_target_unit(self, sources, targets, unit):
         # Is this plural?
@@ -115,34 +119,40 @@ class ConsistencyCheck(TargetCheck):
             translation__component__allow_translation_propagation=True,
         )
 
-        # List strings with different targets
-        # Limit this to 100 strings, otherwise the resulting query is way too complex
-        matches = (
-            units.values("id_hash", "translation__language", "translation__plural")
-            .annotate(Count("target", distinct=True))
-            .filter(target__count__gt=1)
-            .order_by("id_hash")[:100]
-        )
-
-        if not matches:
-            return []
-
-        return (
-            units.filter(
-                reduce(
-                    lambda x, y: x
-                    | (
-                        Q(id_hash=y["id_hash"])
-                        & Q(translation__language=y["translation__language"])
-                        & Q(translation__plural=y["translation__plural"])
-                    ),
-                    matches,
-                    Q(),
-                )
+        # Find strings with different targets, the project strings are
+        # streamed once and grouped in memory
+        targets = {}
+        inconsistent = set()
+        for id_hash, language, plural, target in (
+            units.annotate(target_md5=MD5("target"))
+            .values_list(
+                "id_hash",
+                "translation__language",
+                "translation__plural",
+                "target_md5",
             )
-            .prefetch()
-            .prefetch_bulk()
-        )
+            .iterator(chunk_size=BATCH_SIZE)
+        ):
+            key = (id_hash, language, plural)
+            if key in inconsistent:
+                continue
+            if targets.setdefault(key, target) != target:
+                inconsistent.add(key)
+                del targets[key]
+        del targets
+
+        # Fetch matching units
+        id_hashes = sorted({key[0] for key in inconsistent})
+        for offset in range(0, len(id_hashes), BATCH_SIZE):
+            for unit in (
+                units.filter(id_hash__in=id_hashes[offset : offset + BATCH_SIZE])
+                .prefetch()
+                .prefetch_bulk()
+            ):
+                translation = unit.translation
+                key = (unit.id_hash, translation.language_id, translation.plural_id)
+                if key in inconsistent:
+                    yield unit
 
 
 class TranslatedCheck(TargetCheck):
@@ -203,28 +213,40 @@ class TranslatedCheck(TargetCheck):
     def check_component(self, component):
         from weblate.trans.models import Change, Unit
 
-        units = (
-            Unit.objects.filter(
-                translation__component=component,
-                change__action__in=self.change_states,
-                state__lt=STATE_TRANSLATED,
+        # Stream the changes of untranslated strings ordered by string and
+        # find the ones which have been translated since last source change
+        changes = (
+            Change.objects.filter(
+                unit__translation__component=component,
+                unit__state__lt=STATE_TRANSLATED,
+                action__in=self.change_states,
             )
-            .prefetch_related(
-                Prefetch(
-                    "change_set",
-                    queryset=Change.objects.filter(
-                        action__in=self.change_states
-                    ).order(),
-                    to_attr="recent_consistency_changes",
+            .annotate(
+                has_target=Case(
+                    When(target="", then=Value(False)),
+                    default=Value(True),
+                    output_field=BooleanField(),
                 )
             )
-            .prefetch()
-            .prefetch_bulk()
+            .order_by("unit_id", "-timestamp")
+            .values_list("unit_id", "action", "has_target")
         )
-
-        for unit in units:
-            for change in unit.recent_consistency_changes:
-                if change.action in Change.ACTIONS_CONTENT and change.target:
-                    yield unit
-                if change.action == Change.ACTION_SOURCE_CHANGE:
-                    break
+        translated = []
+        current = decided = None
+        for unit_id, action, has_target in changes.iterator(chunk_size=BATCH_SIZE):
+            if unit_id != current:
+                current = unit_id
+                decided = False
+            if decided:
+                continue
+            if action in Change.ACTIONS_CONTENT and has_target:
+                translated.append(unit_id)
+                decided = True
+            elif action == Change.ACTION_SOURCE_CHANGE:
+                decided = True
+
+        # Fetch matching units
+        for offset in range(0, len(translated), BATCH_SIZE):
+            yield from Unit.objects.filter(
+                pk__in=translated[offset : offset + BATCH_SIZE]
+            ).prefetch().prefetch_bulk()
@@ -45,6 +45,7 @@ class DuplicateCheck(TargetCheck):
     check_id = "duplicate"
     name = _("Consecutive duplicated words")
     description = _("Text contains the same word twice in a row:")
+    cacheable = True
 
     def extract_groups(self, text: str, language_code: str):
         previous = None
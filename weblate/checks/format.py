@@ -19,7 +19,7 @@
 
 import re
 from collections import defaultdict
-from typing import Optional, Pattern
+from typing import List, Optional, Pattern, Tuple
 
 from django.utils.functional import SimpleLazyObject
 from django.utils.html import format_html, format_html_join
@@ -261,11 +261,37 @@ FLAG_RULES = {
 }
 
 
+def get_placeholders(
+    string: str, regexp: Pattern[str], unit=None
+) -> List[Tuple[int, int, str, Optional[str]]]:
+    """
+    Return start, end, text and first group of placeholders in the string.
+
+    The matches are cached on the unit, so that every placeholder syntax is
+    matched once per string and the result is shared by all format checks and
+    highlighting.
+    """
+    if unit is None:
+        cache = {}
+    else:
+        cache = unit.check_cache.setdefault("placeholders", {})
+    key = (regexp, string)
+    try:
+        return cache[key]
+    except KeyError:
+        cache[key] = result = [
+            (match.start(), match.end(), match[0], match[1])
+            for match in regexp.finditer(string)
+        ]
+        return result
+
+
 class BaseFormatCheck(TargetCheck):
     """Base class for format string checks."""
 
     regexp: Optional[Pattern[str]] = None
     default_disabled = True
+    cacheable = True
 
     def check_target_unit(self, sources, targets, unit):
         """Check single unit, handling plurals."""
@@ -280,8 +306,8 @@ class BaseFormatCheck(TargetCheck):
         # Use plural as source in case singular misses format string and plural has it
         if (
             len(sources) > 1
-            and not self.extract_matches(sources[0])
-            and self.extract_matches(sources[1])
+            and not self.extract_matches(sources[0], unit)
+            and self.extract_matches(sources[1], unit)
         ):
             source = sources[1]
         else:
@@ -321,8 +347,13 @@ class BaseFormatCheck(TargetCheck):
     def normalize(self, matches):
         return matches
 
-    def extract_matches(self, string):
-        return [self.cleanup_string(x[0]) for x in self.regexp.findall(string)]
+    def extract_matches(self, string, unit=None):
+        return [
+            self.cleanup_string(group or "")
+            for _start, _end, _text, group in get_placeholders(
+                string, self.regexp, unit
+            )
+        ]
 
     def check_format(self, source, target, ignore_missing, unit):
         """Generic checker for format strings."""
@@ -332,11 +363,11 @@ class BaseFormatCheck(TargetCheck):
         uses_position = True
 
         # Calculate value
-        src_matches = self.extract_matches(source)
+        src_matches = self.extract_matches(source, unit)
         if src_matches:
             uses_position = any(self.is_position_based(x) for x in src_matches)
 
-        tgt_matches = self.extract_matches(target)
+        tgt_matches = self.extract_matches(target, unit)
 
         if not uses_position:
             src_matches = set(src_matches)
@@ -375,9 +406,8 @@ class BaseFormatCheck(TargetCheck):
     def check_highlight(self, source, unit):
         if self.should_skip(unit):
             return
-        match_objects = self.regexp.finditer(source)
-        for match in match_objects:
-            yield (match.start(), match.end(), match.group())
+        for start, end, text, _group in get_placeholders(source, self.regexp, unit):
+            yield (start, end, text)
 
     def format_result(self, result):
         if (
@@ -646,9 +676,9 @@ class MultipleUnnamedFormatsCheck(SourceCheck):
             return False
         found = set()
         for regexp, is_position_based in rules:
-            for match in regexp.finditer(source[0]):
-                if is_position_based(match[1]):
-                    found.add((match.start(0), match.end(0)))
+            for start, end, _text, group in get_placeholders(source[0], regexp, unit):
+                if is_position_based(group):
+                    found.add((start, end))
                     if len(found) >= 2:
                         return True
         return False
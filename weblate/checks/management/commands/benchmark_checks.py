@@ -0,0 +1,87 @@
+#
+# Copyright © 2012–2022 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from timeit import timeit
+
+from weblate.checks.models import CHECKS
+from weblate.checks.utils import highlight_string
+from weblate.trans.management.commands import WeblateLangCommand
+
+
+class Command(WeblateLangCommand):
+    """Measure quality checks throughput."""
+
+    help = "performs quality checks benchmark"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--count", type=int, default=10, help="number of iterations"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=1000, help="number of strings to check"
+        )
+
+    def report(self, name, duration, strings):
+        self.stdout.write(
+            f"{name}: {1000 * duration / strings:.3f} ms per string, "
+            f"{strings / duration:.1f} strings per second"
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        units = [
+            unit
+            for unit in self.get_units(**options)
+            .prefetch_checks()
+            .order_by("pk")[: options["limit"]]
+            if not unit.is_source and not unit.readonly
+        ]
+        if not units:
+            self.stdout.write("No strings to check")
+            return
+        strings = count * len(units)
+        checks = CHECKS.cacheable.values()
+
+        def run_checks():
+            for unit in units:
+                # Start without cached results to measure the checks
+                unit.check_cache = {}
+                sources = unit.get_source_plurals()
+                targets = unit.get_target_plurals()
+                for check in checks:
+                    check.check_target(sources, targets, unit)
+
+        def highlight():
+            for unit in units:
+                unit.check_cache = {}
+                highlight_string(unit.source, unit)
+
+        def check_and_highlight():
+            run_checks()
+            for unit in units:
+                highlight_string(unit.source, unit)
+
+        self.report("Content checks", timeit(run_checks, number=count), strings)
+        self.report("Highlighting", timeit(highlight, number=count), strings)
+        self.report(
+            "Checks and highlighting",
+            timeit(check_and_highlight, number=count),
+            strings,
+        )
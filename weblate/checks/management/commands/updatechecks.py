@@ -17,13 +17,69 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from typing import Iterable, List, Tuple
+
+from django.core.cache import close_caches
+from django.db import connections, transaction
+
+from weblate.checks.runner import update_checks
 from weblate.trans.management.commands import WeblateLangCommand
+from weblate.trans.models import Translation, Unit
+
+
+def close_connections():
+    """Close database and cache connections not to share them with forks."""
+    connections.close_all()
+    close_caches()
+
+
+def update_translation_checks(translation_id: int) -> Tuple[int, int, List[int]]:
+    """
+    Update checks for all units in translation.
+
+    Returns number of units, component ID and IDs of source units to update
+    checks for, these are updated once all translations of the component are
+    processed.
+    """
+    translation = Translation.objects.get(pk=translation_id)
+    component = translation.component
+    with transaction.atomic():
+        units = list(translation.unit_set.prefetch_checks())
+        for unit in units:
+            # Collect source checks and stats updates on the translation
+            unit.translation = translation
+            unit.is_batch_update = True
+        update_checks(units)
+    translation.invalidate_cache()
+    return len(units), component.pk, list(component.updated_sources)
+
+
+def update_source_checks(source_ids: Iterable[int]):
+    """Update checks for source units."""
+    with transaction.atomic():
+        update_checks(Unit.objects.filter(pk__in=source_ids).prefetch_checks())
 
 
 class Command(WeblateLangCommand):
     help = "updates checks for units"
 
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Process translations in parallel using given number of processes",
+        )
+
     def handle(self, *args, **options):
+        if options["workers"]:
+            self.handle_sharded(**options)
+            return
         translations = {}
         for unit in self.iterate_units(*args, **options):
             unit.run_checks()
@@ -32,3 +88,54 @@ class Command(WeblateLangCommand):
 
         for translation in translations.values():
             translation.invalidate_cache()
+
+    def handle_sharded(self, **options):
+        translations = dict(
+            self.get_translations(**options).values_list("id", "component_id")
+        )
+        translation_ids = list(translations)
+        total = len(translation_ids)
+        # Number of translations to process in each component
+        pending = Counter(translations.values())
+        sources = defaultdict(set)
+        workers = options["workers"]
+        futures = []
+        if workers > 1:
+            # Forked workers have to open own database and cache connections
+            close_connections()
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context("fork"),
+                initializer=close_connections,
+            )
+            futures = [
+                executor.submit(update_translation_checks, translation_id)
+                for translation_id in translation_ids
+            ]
+            results = (future.result() for future in as_completed(futures))
+        else:
+            executor = None
+            results = map(update_translation_checks, translation_ids)
+
+        start = time.monotonic()
+        units = 0
+        try:
+            for done, (count, component_id, source_ids) in enumerate(results, start=1):
+                units += count
+                sources[component_id].update(source_ids)
+                pending[component_id] -= 1
+                # Source checks are updated once per component
+                if not pending[component_id] and sources[component_id]:
+                    update_source_checks(sources.pop(component_id))
+                elapsed = time.monotonic() - start
+                self.stdout.write(
+                    f"Processed {done}/{total} translations, {units} units "
+                    f"({units / max(elapsed, 0.001):.1f} units/s)"
+                )
+        finally:
+            if executor is not None:
+                # cancel_futures parameter of shutdown needs Python 3.9
+                for future in futures:
+                    future.cancel()
+                executor.shutdown()
+        self.stdout.write("Operation completed")
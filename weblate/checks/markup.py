@@ -93,6 +93,7 @@ class BBCodeCheck(TargetCheck):
     check_id = "bbcode"
     name = _("BBCode markup")
     description = _("BBCode in translation does not match source")
+    cacheable = True
 
     def check_single(self, source, target, unit):
         # Parse source
@@ -119,6 +120,8 @@ class BBCodeCheck(TargetCheck):
 
 
 class BaseXMLCheck(TargetCheck):
+    cacheable = True
+
     def parse_xml(self, text, wrap=None):
         """Wrapper for parsing XML."""
         if wrap is None:
@@ -238,6 +241,7 @@ class XMLTagsCheck(BaseXMLCheck):
 
 class MarkdownBaseCheck(TargetCheck):
     default_disabled = True
+    cacheable = True
 
     def __init__(self):
         super().__init__()
@@ -328,6 +332,7 @@ class URLCheck(TargetCheck):
     name = _("URL")
     description = _("The translation does not contain an URL")
     default_disabled = True
+    cacheable = True
 
     @cached_property
     def validator(self):
@@ -348,6 +353,7 @@ class SafeHTMLCheck(TargetCheck):
     name = _("Unsafe HTML")
     description = _("The translation uses unsafe HTML markup")
     default_disabled = True
+    cacheable = True
 
     def check_single(self, source, target, unit):
 
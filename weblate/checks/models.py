@@ -25,6 +25,7 @@ from django.db.models import Q
 from django.utils.functional import cached_property
 
 from weblate.utils.classloader import ClassLoader
+from weblate.utils.hash import calculate_checksum
 
 
 class ChecksLoader(ClassLoader):
@@ -36,6 +37,17 @@ class ChecksLoader(ClassLoader):
     def target(self):
         return {k: v for k, v in self.items() if v.target}
 
+    @cached_property
+    def cacheable(self):
+        return {k: v for k, v in self.target.items() if v.cacheable}
+
+    @cached_property
+    def cache_version(self):
+        """Identify the checks implementation for the results cache."""
+        from weblate.utils.version import VERSION
+
+        return calculate_checksum(VERSION, ",".join(sorted(self.cacheable)))
+
 
 # Initialize checks list
 CHECKS = ChecksLoader("CHECK_LIST")
@@ -38,6 +38,7 @@ class PlaceholderCheck(TargetCheckParametrized):
     default_disabled = True
     name = _("Placeholders")
     description = _("Translation is missing some placeholders")
+    cacheable = True
 
     @property
     def param_type(self):
@@ -126,6 +127,7 @@ class RegexCheck(TargetCheckParametrized):
     default_disabled = True
     name = _("Regular expression")
     description = _("Translation does not match regular expression")
+    cacheable = True
 
     @property
     def param_type(self):
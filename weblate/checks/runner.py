@@ -0,0 +1,158 @@
+# Copyright © 2012–2022 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Set based runner updating quality checks for many strings at once."""
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+from django.db import transaction
+
+from weblate.checks.models import CHECKS, Check
+
+# Number of strings to look up propagated checks in a single query
+PROPAGATION_BATCH = 500
+
+
+def is_propagating(name: str) -> bool:
+    try:
+        return CHECKS[name].propagates
+    except KeyError:
+        # Disabled/removed checks
+        return False
+
+
+def get_propagation_key(unit) -> Tuple:
+    """Return key matching units considered same for checks propagation."""
+    translation = unit.translation
+    component = translation.component
+    return (
+        unit.source,
+        unit.context,
+        component.project_id,
+        translation.language_id,
+        component.source_language_id,
+        translation.plural_id,
+    )
+
+
+def get_same_source_units(units: List, exclude: Iterable[int]) -> List:
+    """Return units sharing source with given ones, looked up in batches."""
+    from weblate.trans.models import Unit
+
+    result = {}
+    exclude = set(exclude)
+    for offset in range(0, len(units), PROPAGATION_BATCH):
+        batch = units[offset : offset + PROPAGATION_BATCH]
+        keys = {get_propagation_key(unit) for unit in batch}
+        candidates = (
+            Unit.objects.filter(
+                source__in={key[0] for key in keys},
+                context__in={key[1] for key in keys},
+                translation__component__project_id__in={key[2] for key in keys},
+                translation__language_id__in={key[3] for key in keys},
+                translation__component__allow_translation_propagation=True,
+            )
+            .exclude(pk__in=exclude)
+            .prefetch_checks()
+        )
+        for unit in candidates:
+            if unit.pk not in result and get_propagation_key(unit) in keys:
+                result[unit.pk] = unit
+    return list(result.values())
+
+
+def update_checks(units: Iterable, propagate: bool = True) -> int:
+    """
+    Update checks for given units in bulk.
+
+    The units are expected to have checks prefetched (see
+    UnitQuerySet.prefetch_checks), the checks are evaluated in memory and the
+    differences are stored using a single insert and a single delete.
+
+    Checks which propagate are then updated on the units with the same source
+    and source checks on the affected source strings, again in bulk.
+
+    Returns number of units with changed checks.
+    """
+    from weblate.trans.models import Unit
+
+    units = list(units)
+    create = []
+    delete = []
+    changed = []
+    propagating = []
+
+    for unit in units:
+        existing = {check.name: check for check in unit.all_checks}
+        failing = unit.evaluate_checks()
+        added = failing - existing.keys()
+        removed = existing.keys() - failing
+        if not added and not removed:
+            continue
+        changed.append(unit)
+        create.extend(Check(unit=unit, dismissed=False, name=name) for name in added)
+        delete.extend(existing[name].pk for name in removed)
+        if any(is_propagating(name) for name in added | removed):
+            propagating.append(unit)
+
+    with transaction.atomic():
+        if create:
+            Check.objects.bulk_create(create, batch_size=500, ignore_conflicts=True)
+        if delete:
+            Check.objects.filter(pk__in=delete).delete()
+
+    # These have to be fetched again as the checks have changed
+    for unit in units:
+        unit.clear_checks_cache()
+
+    # Propagate checks which need it (for example consistency)
+    if propagate and propagating:
+        update_checks(
+            get_same_source_units(propagating, exclude=(unit.pk for unit in units)),
+            propagate=False,
+        )
+
+    # Trigger source checks on target check update (multiple failing checks),
+    # source units are looked up by ID to avoid a query for each unit
+    sources: Set[int] = set()
+    batch_sources: Dict[int, Dict] = {}
+    translations = {}
+    for unit in changed:
+        if not unit.is_source:
+            if unit.is_batch_update:
+                updated_sources = unit.translation.component.updated_sources
+                if unit.source_unit_id not in updated_sources:
+                    batch_sources[unit.source_unit_id] = updated_sources
+            else:
+                sources.add(unit.source_unit_id)
+        # Stats update is handled by the caller for batch updates
+        if not unit.is_batch_update and not unit.is_stats_update:
+            translations[unit.translation_id] = unit.translation
+
+    # Batch updates run source checks once the component is processed
+    if batch_sources:
+        for source in Unit.objects.filter(pk__in=batch_sources).prefetch_checks():
+            batch_sources[source.pk][source.pk] = source
+
+    if sources:
+        update_checks(Unit.objects.filter(pk__in=sources).prefetch_checks())
+
+    for translation in translations.values():
+        translation.invalidate_cache()
+
+    return len(changed)
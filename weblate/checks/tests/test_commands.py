@@ -20,10 +20,12 @@
 """Test for management commands."""
 
 from io import StringIO
+from unittest.mock import patch
 
 from django.core.management import call_command
 from django.test import SimpleTestCase
 
+from weblate.checks.models import Check
 from weblate.trans.tests.test_commands import WeblateComponentCommandTestCase
 from weblate.trans.tests.test_models import RepoTestCase
 
@@ -43,9 +45,31 @@ class UpdateChecksTest(WeblateComponentCommandTestCase):
     command_name = "updatechecks"
     expected_string = "Processing"
 
+    def test_workers(self):
+        output = StringIO()
+        call_command("updatechecks", "test", "--workers", "1", stdout=output)
+        self.assertIn("units/s", output.getvalue())
+        self.assertIn("Operation completed", output.getvalue())
+
+    def test_workers_source_checks(self):
+        # Failing end newline check
+        self.edit_unit("Hello, world!\n", "Nazdar svete!")
+        Check.objects.all().delete()
+        with patch(
+            "weblate.checks.management.commands.updatechecks.update_source_checks"
+        ) as update_source_checks:
+            call_command("updatechecks", "test", "--workers", "1", stdout=StringIO())
+        # Source checks are updated once for the component
+        update_source_checks.assert_called_once()
+
 
 class ListTestCase(SimpleTestCase):
     def test_list_checks(self):
         output = StringIO()
         call_command("list_checks", stdout=output)
         self.assertIn(".. _check-same:", output.getvalue())
+
+
+class BenchmarkChecksTest(WeblateComponentCommandTestCase):
+    command_name = "benchmark_checks"
+    expected_string = "strings per second"
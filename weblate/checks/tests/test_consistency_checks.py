@@ -112,3 +112,11 @@ class TranslatedCheckTest(ViewTestCase):
             self.check.get_description(check),
             'Previous translation was "Nazdar svete!\n".',
         )
+
+    def test_check_component(self):
+        self.test_untranslated()
+        self.assertEqual(
+            list(self.check.check_component(self.component)), [self.get_unit()]
+        )
+        self.get_unit().change_set.create(action=Change.ACTION_SOURCE_CHANGE)
+        self.assertEqual(list(self.check.check_component(self.component)), [])
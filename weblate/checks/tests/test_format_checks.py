@@ -23,6 +23,7 @@
 from django.test import SimpleTestCase
 
 from weblate.checks.format import (
+    PYTHON_PRINTF_MATCH,
     CFormatCheck,
     CSharpFormatCheck,
     ESTemplateLiteralsCheck,
@@ -64,6 +65,19 @@ class PythonFormatCheckTest(CheckTestCase):
     def test_no_format(self):
         self.assertFalse(self.check.check_format("strins", "string", False, None))
 
+    def test_placeholders_cache(self):
+        unit = MockUnit("python_format_cache", flags="python-format")
+        self.assertTrue(self.check.check_format("%s string", "string", False, unit))
+        cached = unit.check_cache["placeholders"]
+        self.assertEqual(
+            cached[(PYTHON_PRINTF_MATCH, "%s string")][0][:3], (0, 2, "%s")
+        )
+        # Highlighting uses the same matches
+        self.assertEqual(
+            list(self.check.check_highlight("%s string", unit)), [(0, 2, "%s")]
+        )
+        self.assertEqual(len(cached), 2)
+
     def test_format(self):
         self.assertFalse(self.check.check_format("%s string", "%s string", False, None))
 
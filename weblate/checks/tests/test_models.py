@@ -19,14 +19,19 @@
 
 """Tests for unitdata models."""
 
+from unittest.mock import patch
+
 from django.urls import reverse
 from django.utils.html import format_html
 
+from weblate.checks.chars import EndNewlineCheck
 from weblate.checks.models import Check
+from weblate.checks.runner import update_checks
 from weblate.checks.tasks import batch_update_checks
 from weblate.trans.models import Unit
 from weblate.trans.tasks import auto_translate
 from weblate.trans.tests.test_views import FixtureTestCase, ViewTestCase
+from weblate.utils.state import STATE_TRANSLATED
 
 
 class CheckModelTestCase(FixtureTestCase):
@@ -46,6 +51,17 @@ class CheckModelTestCase(FixtureTestCase):
         self.assertEqual(check.get_description(), "-invalid-")
         self.assertEqual(check.get_doc_url(), "")
 
+    def test_check_cache(self):
+        unit = self.get_unit()
+        unit.translate(self.user, "Nazdar svete", STATE_TRANSLATED)
+        self.assertIn("end_newline", unit.all_checks_names)
+        # Unchanged unit is not checked again
+        with patch.object(
+            EndNewlineCheck, "check_target_unit", side_effect=AssertionError
+        ):
+            unit.run_checks()
+        self.assertIn("end_newline", unit.all_checks_names)
+
     def test_check_render(self):
         unit = self.get_unit()
         unit.source_unit.extra_flags = "max-size:1:1"
@@ -143,3 +159,49 @@ class BatchUpdateTest(ViewTestCase):
             batch_update_checks(other.id, ["inconsistent"])
             unit = self.get_unit()
             self.assertEqual(unit.all_checks_names, expected)
+
+    def test_update_checks(self):
+        other = self.do_base()
+        one_unit = self.get_unit()
+        other_unit = Unit.objects.get(
+            translation__language_code=one_unit.translation.language_code,
+            translation__component=other,
+            id_hash=one_unit.id_hash,
+        )
+        self.assertEqual(other_unit.all_checks_names, {"inconsistent"})
+        Unit.objects.filter(pk=other_unit.pk).update(target=one_unit.target)
+
+        # Removal is propagated to the units with same source
+        self.assertEqual(
+            update_checks(Unit.objects.filter(pk=other_unit.pk).prefetch_checks()),
+            1,
+        )
+        other_unit = Unit.objects.get(pk=other_unit.pk)
+        self.assertEqual(other_unit.all_checks_names, set())
+        unit = self.get_unit()
+        self.assertEqual(unit.all_checks_names, set())
+
+        # Nothing to update
+        self.assertEqual(
+            update_checks(other_unit.translation.unit_set.prefetch_checks()), 0
+        )
+
+    def test_update_checks_batch_sources(self):
+        translation = self.get_translation()
+        component = translation.component
+        Check.objects.filter(unit__translation=translation).delete()
+        translation.unit_set.update(target="Nazdar svete")
+        units = list(translation.unit_set.prefetch_related("check_set"))
+        for unit in units:
+            unit.translation = translation
+            unit.is_batch_update = True
+        component.updated_sources = {}
+        self.assertGreater(update_checks(units), 0)
+        # Source units are collected for running source checks later
+        failing = translation.unit_set.filter(check__isnull=False)
+        self.assertEqual(
+            set(component.updated_sources),
+            set(failing.values_list("source_unit_id", flat=True)),
+        )
+        for pk, source in component.updated_sources.items():
+            self.assertEqual(source.pk, pk)
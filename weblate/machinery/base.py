@@ -18,15 +18,22 @@
 #
 """Base code for machine translation services."""
 
+import json
 import random
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
 from hashlib import md5
 from itertools import chain
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Optional
 from urllib.parse import quote
 
+from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import connections
+from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 from requests.exceptions import HTTPError
@@ -36,7 +43,13 @@ from weblate.lang.models import Language
 from weblate.logger import LOGGER
 from weblate.utils.errors import report_error
 from weblate.utils.hash import calculate_hash
-from weblate.utils.requests import request
+from weblate.utils.ratelimit import TokenBucket
+from weblate.utils.requests import (
+    get_connection_count,
+    get_session,
+    record_connection_usage,
+    request,
+)
 from weblate.utils.search import Comparer
 from weblate.utils.site import get_site_url
 
@@ -75,6 +88,11 @@ class MachineTranslation:
     hightlight_syntax = False
     settings_form = None
     validate_payload = ("en", "de", "test", None, None, False, 75)
+    # Services using the database can not be queried from other threads
+    concurrent = True
+    # Maximal number of texts translated in a single request, services
+    # implementing download_multiple_translations should set this
+    batch_download_size = 0
 
     @classmethod
     def get_rank(cls):
@@ -89,6 +107,9 @@ class MachineTranslation:
         self.supported_languages_error = None
         self.supported_languages_error_age = 0
         self.settings = settings
+        # Maximal time to wait for the rate limiter, not waiting is used for
+        # interactive requests
+        self.rate_limit_wait = 0
 
     def delete_cache(self):
         cache.delete_many([self.rate_limit_cache, self.languages_cache])
@@ -153,8 +174,30 @@ class MachineTranslation:
         if not skip_auth:
             headers.update(self.get_authentication())
 
-        # Fire request
-        response = request(method, url, headers=headers, timeout=5.0, **kwargs)
+        # Fire request using pooled connections
+        session = get_session(
+            self.mtid,
+            pool_size=settings.MACHINERY_POOL_SIZE,
+            retries=settings.MACHINERY_RETRIES,
+        )
+        connections = get_connection_count(session)
+        response = request(
+            method,
+            url,
+            headers=headers,
+            timeout=5.0,
+            session=session,
+            deadline=settings.MACHINERY_DEADLINE,
+            **kwargs,
+        )
+        created = get_connection_count(session) - connections
+        record_connection_usage(created)
+        LOGGER.debug(
+            "%s: %s request %s",
+            self.name,
+            method.upper(),
+            "using new connection" if created else "reusing connection",
+        )
 
         # Directly raise error when response is empty
         if response.content:
@@ -198,6 +241,16 @@ class MachineTranslation:
         """
         raise NotImplementedError()
 
+    def download_multiple_translations(
+        self, source, language, texts: List[str], user=None, threshold: int = 75
+    ) -> Dict[str, List[Dict]]:
+        """Download translations for multiple strings in a single request.
+
+        Should return dict mapping source text to list of translations in the
+        same format as download_translations.
+        """
+        raise NotImplementedError()
+
     def map_language_code(self, code):
         """Map language code to service specific."""
         if code.endswith("_devel"):
@@ -250,6 +303,24 @@ class MachineTranslation:
     def is_rate_limited(self):
         return cache.get(self.rate_limit_cache, False)
 
+    @cached_property
+    def rate_limiter(self):
+        """Token bucket limiting requests with the configured credentials."""
+        limit = settings.MACHINERY_RATE_LIMITS.get(self.mtid)
+        if not limit:
+            return None
+        capacity, period = limit
+        credentials = calculate_hash(json.dumps(self.settings, sort_keys=True))
+        return TokenBucket(f"{self.mtid}-bucket-{credentials}", capacity, period)
+
+    def acquire_rate_limit(self):
+        """Wait for the rate limiter, raises error if it would take too long."""
+        limiter = self.rate_limiter
+        if limiter is not None and not limiter.acquire(self.rate_limit_wait):
+            raise MachineryRateLimit(
+                _("Request rate limit reached, please try again later.")
+            )
+
     def set_rate_limit(self):
         return cache.set(self.rate_limit_cache, True, 1800)
 
@@ -351,10 +422,69 @@ class MachineTranslation:
 
         raise UnsupportedLanguage("Not supported")
 
+    def get_database_cache(self, source, language, text_hashes, threshold):
+        """Return results stored in the database for the text hashes."""
+        from weblate.machinery.models import CachedTranslation
+
+        cutoff = timezone.now() - timedelta(days=settings.MACHINERY_DATABASE_CACHE_DAYS)
+        return dict(
+            CachedTranslation.objects.filter(
+                text_hash__in=text_hashes,
+                service=self.mtid,
+                source_language=str(source),
+                target_language=str(language),
+                threshold=threshold,
+                timestamp__gte=cutoff,
+            ).values_list("text_hash", "result")
+        )
+
+    def store_database_cache(self, source, language, text, threshold, result):
+        from weblate.machinery.models import CachedTranslation
+
+        CachedTranslation.objects.update_or_create(
+            text_hash=calculate_hash(text),
+            service=self.mtid,
+            source_language=str(source),
+            target_language=str(language),
+            threshold=threshold,
+            defaults={"result": result, "timestamp": timezone.now()},
+        )
+
+    def prefetch_cached(self, source, language, units, threshold):
+        """Load results stored in the database for the units into the cache."""
+        if not self.cache_translations or not settings.MACHINERY_DATABASE_CACHE:
+            return
+        keys = {}
+        for unit in units:
+            if unit.machinery["best"] >= self.max_score:
+                continue
+            text = self.cleanup_text(unit)[0]
+            if text:
+                keys[calculate_hash(text)] = self.translate_cache_key(
+                    source, language, text, threshold
+                )
+        cached = cache.get_many(keys.values())
+        missing = {
+            text_hash: key for text_hash, key in keys.items() if key not in cached
+        }
+        if missing:
+            stored = self.get_database_cache(source, language, missing, threshold)
+            cache.set_many(
+                {missing[text_hash]: result for text_hash, result in stored.items()},
+                30 * 86400,
+            )
+
     def get_cached(self, source, language, text, threshold, replacements):
         cache_key = self.translate_cache_key(source, language, text, threshold)
         if cache_key:
             result = cache.get(cache_key)
+            if result is None and settings.MACHINERY_DATABASE_CACHE:
+                text_hash = calculate_hash(text)
+                result = self.get_database_cache(
+                    source, language, [text_hash], threshold
+                ).get(text_hash)
+                if result is not None:
+                    cache.set(cache_key, result, 30 * 86400)
             if result and (replacements or self.force_uncleanup):
                 self.uncleanup_results(replacements, result)
             return cache_key, result
@@ -396,6 +526,8 @@ class MachineTranslation:
         if result is not None:
             return result
 
+        self.acquire_rate_limit()
+
         try:
             result = list(
                 self.download_translations(
@@ -412,15 +544,78 @@ class MachineTranslation:
                 self.uncleanup_results(replacements, result)
             if cache_key:
                 cache.set(cache_key, result, 30 * 86400)
+                if settings.MACHINERY_DATABASE_CACHE:
+                    self.store_database_cache(source, language, text, threshold, result)
             return result
         except Exception as exc:
-            if self.is_rate_limit_error(exc):
-                self.set_rate_limit()
+            self.handle_download_error(exc)
+
+    def handle_download_error(self, exc):
+        if self.is_rate_limit_error(exc):
+            self.set_rate_limit()
+
+        self.report_error("Failed to fetch translations from %s")
+        if isinstance(exc, MachineTranslationError):
+            raise exc
+        raise MachineTranslationError(self.get_error_message(exc))
+
+    def translate_multiple(self, source, language, units, user=None, threshold=75):
+        """
+        Translate units using as few requests as possible.
 
-            self.report_error("Failed to fetch translations from %s")
-            if isinstance(exc, MachineTranslationError):
-                raise
-            raise MachineTranslationError(self.get_error_message(exc))
+        Cached results are used where available, the remaining texts are
+        translated in batches as returned by get_batches.
+        """
+        if self.is_rate_limited():
+            return
+        pending = defaultdict(list)
+        for unit in units:
+            text, replacements = self.cleanup_text(unit)
+            if not text:
+                continue
+            cache_key, result = self.get_cached(
+                source, language, text, threshold, replacements
+            )
+            if result is not None:
+                yield unit, result
+            else:
+                pending[text].append((unit, replacements, cache_key))
+
+        texts = list(pending)
+        if len(texts) == 1 and len(pending[texts[0]]) == 1:
+            # Single string, no need to use batch API
+            unit = pending[texts[0]][0][0]
+            yield unit, self._translate(
+                source, language, unit, user=user, threshold=threshold
+            )
+            return
+
+        for chunk in self.get_batches(texts):
+            # Each batch is translated using a single request
+            self.acquire_rate_limit()
+            try:
+                translations = self.download_multiple_translations(
+                    source, language, chunk, user=user, threshold=threshold
+                )
+            except Exception as exc:
+                self.handle_download_error(exc)
+            for text in chunk:
+                for unit, replacements, cache_key in pending[text]:
+                    result = [item.copy() for item in translations.get(text, [])]
+                    if replacements or self.force_uncleanup:
+                        self.uncleanup_results(replacements, result)
+                    if cache_key:
+                        cache.set(cache_key, result, 30 * 86400)
+                        if settings.MACHINERY_DATABASE_CACHE:
+                            self.store_database_cache(
+                                source, language, text, threshold, result
+                            )
+                    yield unit, result
+
+    def get_batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """Split texts to batches translated using a single request."""
+        for start in range(0, len(texts), self.batch_download_size):
+            yield texts[start : start + self.batch_download_size]
 
     def get_error_message(self, exc):
         return f"{exc.__class__.__name__}: {exc}"
@@ -447,17 +642,133 @@ class MachineTranslation:
             return
 
         self.account_usage(translation.component.project, delta=len(units))
-        self._batch_translate(source, language, units, user=user, threshold=threshold)
+        self.rate_limit_wait = settings.MACHINERY_RATE_LIMIT_WAIT
+        try:
+            self._batch_translate(
+                source, language, units, user=user, threshold=threshold
+            )
+        finally:
+            self.rate_limit_wait = 0
 
     def _batch_translate(self, source, language, units, user=None, threshold: int = 75):
-        for unit in units:
+        self.prefetch_cached(source, language, units, threshold)
+        units = [unit for unit in units if unit.machinery["best"] < self.max_score]
+        if self.batch_download_size:
+            translations = self.translate_multiple(
+                source, language, units, user=user, threshold=threshold
+            )
+        else:
+            translations = (
+                (
+                    unit,
+                    self._translate(
+                        source, language, unit, user=user, threshold=threshold
+                    ),
+                )
+                for unit in units
+            )
+        for unit, translation in translations:
             result = unit.machinery
-            if result["best"] >= self.max_score:
-                continue
-            for item in self._translate(
-                source, language, unit, user=user, threshold=threshold
-            ):
+            for item in translation:
                 if result["best"] > item["quality"]:
                     continue
                 result["best"] = item["quality"]
                 result["translation"] = item["text"]
+
+
+def prepare_units(units):
+    """
+    Load database backed unit attributes used by the services.
+
+    This has to be done before the units are passed to other threads, those
+    would otherwise fetch them using own database connections.
+    """
+    for unit in units:
+        component = unit.translation.component
+        component.project
+        component.source_language
+        unit.translation.language
+        unit.all_flags
+
+
+def call_service(
+    func: Callable, service: MachineTranslation, close_connections: bool = False
+):
+    try:
+        return func(service)
+    except MachineTranslationError:
+        raise
+    except Exception:
+        report_error(cause="Machinery error")
+        raise
+    finally:
+        # Database connections are per thread, close ones opened by the worker
+        if close_connections:
+            connections.close_all()
+
+
+def dispatch_services(
+    services: List[MachineTranslation],
+    func: Callable,
+    deadline: Optional[float] = None,
+    progress: Optional[Callable] = None,
+):
+    """
+    Run func for all services in parallel.
+
+    The services which do not support concurrent use are run in the current
+    thread. Returns list of service, result and error tuples in the order of
+    the services, services not finished within the deadline (in seconds) get
+    an error. The optional progress callback is invoked every second from the
+    current thread while waiting.
+    """
+    start = time.monotonic()
+    outcome = {}
+    remote = [service for service in services if service.concurrent]
+    executor = None
+    not_done = set()
+    if remote:
+        executor = ThreadPoolExecutor(
+            max_workers=min(len(remote), settings.MACHINERY_WORKERS),
+            thread_name_prefix="machinery",
+        )
+    try:
+        pending = {
+            executor.submit(call_service, func, service, True): service
+            for service in remote
+        }
+        for service in services:
+            if service.concurrent:
+                continue
+            try:
+                outcome[service] = (call_service(func, service), None)
+            except Exception as error:
+                outcome[service] = (None, error)
+        not_done = set(pending)
+        while not_done:
+            timeout = 1 if progress else None
+            if deadline is not None:
+                remaining = max(0, deadline - (time.monotonic() - start))
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            not_done = wait(not_done, timeout=timeout).not_done
+            if progress:
+                progress()
+            if deadline is not None and time.monotonic() - start >= deadline:
+                break
+        for future, service in pending.items():
+            if future in not_done:
+                outcome[service] = (
+                    None,
+                    MachineTranslationError(_("The request has timed out.")),
+                )
+            else:
+                error = future.exception()
+                outcome[service] = (None if error else future.result(), error)
+    finally:
+        if executor is not None:
+            # Do not wait for the timed out requests, cancel_futures parameter
+            # of shutdown is not available on Python < 3.9
+            for future in not_done:
+                future.cancel()
+            executor.shutdown(wait=False)
+    return [(service, *outcome[service]) for service in services]
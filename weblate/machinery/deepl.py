@@ -18,6 +18,8 @@
 #
 
 from html import escape, unescape
+from typing import Dict, Iterator, List
+from urllib.parse import quote_plus
 
 from django.conf import settings
 
@@ -26,6 +28,8 @@ from .forms import DeepLMachineryForm
 
 # Extracted from https://www.deepl.com/docs-api/translating-text/response/
 FORMAL_LANGUAGES = {"DE", "FR", "IT", "ES", "NL", "PL", "PT-PT", "PT-BR", "RU"}
+# Request size is limited to 128 KiB, keep space for other parameters
+MAX_REQUEST_SIZE = 120000
 
 
 class DeepLTranslation(MachineTranslation):
@@ -40,6 +44,7 @@ class DeepLTranslation(MachineTranslation):
     }
     force_uncleanup = True
     hightlight_syntax = True
+    batch_download_size = 50
     settings_form = DeepLMachineryForm
 
     @staticmethod
@@ -78,9 +83,34 @@ class DeepLTranslation(MachineTranslation):
         threshold: int = 75,
     ):
         """Download list of possible translations from a service."""
+        translations = self.download_multiple_translations(source, language, [text])
+        yield from translations.get(text, [])
+
+    def get_batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """Split texts to fit into request size limit."""
+        batch = []
+        size = 0
+        for text in texts:
+            # Texts are sent form encoded as text parameters
+            text_size = len(quote_plus(text)) + 6
+            if batch and (
+                size + text_size > MAX_REQUEST_SIZE
+                or len(batch) >= self.batch_download_size
+            ):
+                yield batch
+                batch = []
+                size = 0
+            batch.append(text)
+            size += text_size
+        if batch:
+            yield batch
+
+    def download_multiple_translations(
+        self, source, language, texts: List[str], user=None, threshold: int = 75
+    ) -> Dict[str, List[Dict]]:
         params = {
             "auth_key": self.settings["key"],
-            "text": text,
+            "text": texts,
             "source_lang": source,
             "target_lang": language,
             "tag_handling": "xml",
@@ -99,13 +129,17 @@ class DeepLTranslation(MachineTranslation):
         )
         payload = response.json()
 
-        for translation in payload["translations"]:
-            yield {
-                "text": translation["text"],
-                "quality": self.max_score,
-                "service": self.name,
-                "source": text,
-            }
+        return {
+            text: [
+                {
+                    "text": translation["text"],
+                    "quality": self.max_score,
+                    "service": self.name,
+                    "source": text,
+                }
+            ]
+            for text, translation in zip(texts, payload["translations"])
+        }
 
     def unescape_text(self, text: str):
         """Unescaping of the text with replacements."""
@@ -17,6 +17,8 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from typing import Dict, List
+
 from django.conf import settings
 from requests.exceptions import RequestException
 
@@ -46,6 +48,7 @@ class GoogleTranslation(GoogleBaseTranslation):
     name = "Google Translate"
     max_score = 90
     settings_form = KeyMachineryForm
+    batch_download_size = 100
 
     @staticmethod
     def migrate_settings():
@@ -101,6 +104,38 @@ class GoogleTranslation(GoogleBaseTranslation):
             "source": text,
         }
 
+    def download_multiple_translations(
+        self, source, language, texts: List[str], user=None, threshold: int = 75
+    ) -> Dict[str, List[Dict]]:
+        # Use POST to avoid hitting URL length limits
+        response = self.request(
+            "post",
+            GOOGLE_API_ROOT,
+            params={"key": self.settings["key"]},
+            data={
+                "q": texts,
+                "source": source,
+                "target": language,
+                "format": "text",
+            },
+        )
+        payload = response.json()
+
+        if "error" in payload:
+            raise MachineTranslationError(payload["error"]["message"])
+
+        return {
+            text: [
+                {
+                    "text": translation["translatedText"],
+                    "quality": self.max_score,
+                    "service": self.name,
+                    "source": text,
+                }
+            ]
+            for text, translation in zip(texts, payload["data"]["translations"])
+        }
+
     def get_error_message(self, exc):
         if isinstance(exc, RequestException) and exc.response is not None:
             data = exc.response.json()
@@ -18,6 +18,7 @@
 #
 
 import json
+from typing import Dict, List
 
 from django.conf import settings
 from django.utils.functional import cached_property
@@ -35,6 +36,7 @@ class GoogleV3Translation(GoogleBaseTranslation):
     name = "Google Translate API v3"
     max_score = 90
     settings_form = GoogleV3MachineryForm
+    batch_download_size = 100
 
     @cached_property
     def client(self):
@@ -74,17 +76,28 @@ class GoogleV3Translation(GoogleBaseTranslation):
         threshold: int = 75,
     ):
         """Download list of possible translations from a service."""
+        translations = self.download_multiple_translations(source, language, [text])
+        yield from translations.get(text, [])
+
+    def download_multiple_translations(
+        self, source, language, texts: List[str], user=None, threshold: int = 75
+    ) -> Dict[str, List[Dict]]:
         request = {
             "parent": self.parent,
-            "contents": [text],
+            "contents": texts,
             "target_language_code": language,
             "source_language_code": source,
         }
         response = self.client.translate_text(request)
 
-        yield {
-            "text": response.translations[0].translated_text,
-            "quality": self.max_score,
-            "service": self.name,
-            "source": text,
+        return {
+            text: [
+                {
+                    "text": translation.translated_text,
+                    "quality": self.max_score,
+                    "service": self.name,
+                    "source": text,
+                }
+            ]
+            for text, translation in zip(texts, response.translations)
         }
@@ -18,6 +18,8 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from typing import Dict, List
+
 from django.conf import settings
 
 from weblate.machinery.base import MachineTranslation
@@ -34,6 +36,7 @@ class LibreTranslateTranslation(MachineTranslation):
         "zh_hans": "zh",
     }
     settings_form = KeyURLMachineryForm
+    batch_download_size = 20
 
     @staticmethod
     def migrate_settings():
@@ -78,3 +81,30 @@ class LibreTranslateTranslation(MachineTranslation):
             "service": self.name,
             "source": text,
         }
+
+    def download_multiple_translations(
+        self, source, language, texts: List[str], user=None, threshold: int = 75
+    ) -> Dict[str, List[Dict]]:
+        response = self.request(
+            "post",
+            self.get_api_url("translate"),
+            json={
+                "api_key": self.settings["key"],
+                "q": texts,
+                "source": source,
+                "target": language,
+            },
+        )
+        payload = response.json()
+
+        return {
+            text: [
+                {
+                    "text": translation,
+                    "quality": self.max_score,
+                    "service": self.name,
+                    "source": text,
+                }
+            ]
+            for text, translation in zip(texts, payload["translatedText"])
+        }
@@ -18,7 +18,7 @@
 #
 
 from datetime import timedelta
-from typing import Dict
+from typing import Dict, Iterator, List
 
 from django.conf import settings
 from django.utils import timezone
@@ -28,6 +28,9 @@ from .forms import MicrosoftMachineryForm
 
 TOKEN_URL = "https://{0}{1}/sts/v1.0/issueToken?Subscription-Key={2}"
 TOKEN_EXPIRY = timedelta(minutes=9)
+# Limits of the translate API
+MAX_TEXT_LENGTH = 5000
+MAX_REQUEST_LENGTH = 50000
 
 
 class MicrosoftCognitiveTranslation(MachineTranslation):
@@ -36,6 +39,7 @@ class MicrosoftCognitiveTranslation(MachineTranslation):
     name = "Microsoft Translator"
     max_score = 90
     settings_form = MicrosoftMachineryForm
+    batch_download_size = 100
 
     language_map = {
         "zh-hant": "zh-Hant",
@@ -139,21 +143,52 @@ class MicrosoftCognitiveTranslation(MachineTranslation):
         threshold: int = 75,
     ):
         """Download list of possible translations from a service."""
-        args = {
-            "api-version": "3.0",
-            "from": source,
-            "to": language,
-            "category": "general",
-        }
+        translations = self.download_multiple_translations(source, language, [text])
+        yield from translations.get(text, [])
+
+    def get_batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """Split texts to fit into request size limit."""
+        batch = []
+        length = 0
+        for text in texts:
+            text_length = min(len(text), MAX_TEXT_LENGTH)
+            if batch and (
+                length + text_length > MAX_REQUEST_LENGTH
+                or len(batch) >= self.batch_download_size
+            ):
+                yield batch
+                batch = []
+                length = 0
+            batch.append(text)
+            length += text_length
+        if batch:
+            yield batch
+
+    def download_multiple_translations(
+        self, source, language, texts: List[str], user=None, threshold: int = 75
+    ) -> Dict[str, List[Dict]]:
         response = self.request(
-            "post", self.get_url("translate"), params=args, json=[{"Text": text[:5000]}]
+            "post",
+            self.get_url("translate"),
+            params={
+                "api-version": "3.0",
+                "from": source,
+                "to": language,
+                "category": "general",
+            },
+            json=[{"Text": text[:MAX_TEXT_LENGTH]} for text in texts],
         )
         # Microsoft tends to use utf-8-sig instead of plain utf-8
         response.encoding = "utf-8-sig"
         payload = response.json()
-        yield {
-            "text": payload[0]["translations"][0]["text"],
-            "quality": self.max_score,
-            "service": self.name,
-            "source": text,
+        return {
+            text: [
+                {
+                    "text": item["translations"][0]["text"],
+                    "quality": self.max_score,
+                    "service": self.name,
+                    "source": text,
+                }
+            ]
+            for text, item in zip(texts, payload)
         }
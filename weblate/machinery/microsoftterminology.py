@@ -79,12 +79,15 @@ class MicrosoftTerminologyService(MachineTranslation):
         if not result:
             return
 
-        for item in result:
+        qualities = self.comparer.similarity_many(
+            text, [item["OriginalText"] for item in result]
+        )
+        for item, quality in zip(result, qualities):
             target = item["Translations"]["Translation"][0]["TranslatedText"]
             source = item["OriginalText"]
             yield {
                 "text": target,
-                "quality": self.comparer.similarity(text, source),
+                "quality": quality,
                 "service": self.name,
                 "source": source,
             }
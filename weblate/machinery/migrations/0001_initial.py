@@ -0,0 +1,53 @@
+# Generated by Django 4.1.3 on 2022-11-24 10:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="CachedTranslation",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("service", models.CharField(max_length=100)),
+                ("source_language", models.CharField(max_length=100)),
+                ("target_language", models.CharField(max_length=100)),
+                ("text_hash", models.BigIntegerField()),
+                ("threshold", models.SmallIntegerField()),
+                ("result", models.JSONField()),
+                (
+                    "timestamp",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Cached machine translation",
+                "verbose_name_plural": "Cached machine translations",
+                "unique_together": {
+                    (
+                        "text_hash",
+                        "service",
+                        "source_language",
+                        "target_language",
+                        "threshold",
+                    )
+                },
+            },
+        ),
+    ]
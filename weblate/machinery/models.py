@@ -18,6 +18,8 @@
 #
 
 from appconf import AppConf
+from django.db import models
+from django.utils import timezone
 
 from weblate.utils.classloader import ClassLoader
 
@@ -129,5 +131,57 @@ class WeblateConf(AppConf):
         "weblate.memory.machine.WeblateMemory",
     )
 
+    # Time limit in seconds for querying all machinery services
+    MACHINERY_DEADLINE = 10
+
+    # Maximal number of machinery services queried in parallel
+    MACHINERY_WORKERS = 8
+
+    # Number of kept alive connections per machinery service
+    MACHINERY_POOL_SIZE = 10
+
+    # Number of retries on connection errors, temporary server errors are
+    # retried for idempotent requests only
+    MACHINERY_RETRIES = 2
+
+    # Client side rate limits as number of requests per period in seconds
+    MACHINERY_RATE_LIMITS = {}
+
+    # Maximal time to wait for the rate limit in automatic translation
+    MACHINERY_RATE_LIMIT_WAIT = 60
+
+    # Persistent cache of machine translation results
+    MACHINERY_DATABASE_CACHE = False
+    MACHINERY_DATABASE_CACHE_DAYS = 90
+    MACHINERY_DATABASE_CACHE_SIZE = 1000000
+
+    # Number of following strings to prefetch machine translations for
+    MACHINERY_PREFETCH = 0
+
+    # Prefetch rate limit per user as number of requests per period in seconds
+    MACHINERY_PREFETCH_RATE_LIMIT = (200, 3600)
+
     class Meta:
         prefix = ""
+
+
+class CachedTranslation(models.Model):
+    """Machine translation result stored in the database."""
+
+    service = models.CharField(max_length=100)
+    source_language = models.CharField(max_length=100)
+    target_language = models.CharField(max_length=100)
+    text_hash = models.BigIntegerField()
+    threshold = models.SmallIntegerField()
+    result = models.JSONField()
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "Cached machine translation"
+        verbose_name_plural = "Cached machine translations"
+        unique_together = [
+            ("text_hash", "service", "source_language", "target_language", "threshold")
+        ]
+
+    def __str__(self):
+        return f"{self.service}: {self.source_language} → {self.target_language}"
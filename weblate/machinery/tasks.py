@@ -0,0 +1,80 @@
+#
+# Copyright © 2012–2022 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from datetime import timedelta
+from typing import List
+
+from django.conf import settings
+from django.utils import timezone
+
+from weblate.auth.models import User
+from weblate.machinery.base import dispatch_services, prepare_units
+from weblate.machinery.models import MACHINERY, CachedTranslation
+from weblate.trans.models import Unit
+from weblate.utils.celery import app
+
+
+@app.task(trail=False)
+def cleanup_machinery_cache():
+    """Remove expired and excessive stored machine translations."""
+    cutoff = timezone.now() - timedelta(days=settings.MACHINERY_DATABASE_CACHE_DAYS)
+    CachedTranslation.objects.filter(timestamp__lt=cutoff).delete()
+    # Trim oldest entries over the size limit
+    oldest = (
+        CachedTranslation.objects.order_by("-timestamp")
+        .values_list("timestamp", flat=True)[settings.MACHINERY_DATABASE_CACHE_SIZE :]
+        .first()
+    )
+    if oldest is not None:
+        CachedTranslation.objects.filter(timestamp__lte=oldest).delete()
+
+
+@app.task(trail=False, expires=60)
+def prefetch_machinery(unit_ids: List[int], user_id: int):
+    """Store machine translations for the units in the cache."""
+    user = User.objects.get(pk=user_id)
+    units = Unit.objects.filter(pk__in=unit_ids).prefetch()
+    prepare_units(units)
+    for unit in units:
+        translation = unit.translation
+        if not user.has_perm("machinery.view", translation):
+            continue
+        machinery_settings = translation.component.project.get_machinery_settings()
+        # Only services with cached results are worth prefetching
+        services = [
+            MACHINERY[service](setting)
+            for service, setting in machinery_settings.items()
+            if service in MACHINERY and MACHINERY[service].cache_translations
+        ]
+        dispatch_services(
+            services,
+            # Bind the loop variable, the function is evaluated in threads
+            lambda translation_service, unit=unit: translation_service.translate(
+                unit, user
+            ),
+            deadline=settings.MACHINERY_DEADLINE,
+        )
+
+
+@app.on_after_finalize.connect
+def setup_periodic_tasks(sender, **kwargs):
+    sender.add_periodic_task(
+        3600 * 24, cleanup_machinery_cache.s(), name="machinery-cache-cleanup"
+    )
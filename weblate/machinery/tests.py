@@ -19,6 +19,7 @@
 
 import json
 from copy import copy
+from threading import Event
 from typing import Type
 from unittest import SkipTest
 from unittest.mock import Mock, patch
@@ -26,7 +27,9 @@ from urllib.parse import parse_qs
 
 import responses
 from botocore.stub import ANY, Stubber
+from django.core.cache import cache
 from django.test import TestCase
+from django.test.utils import override_settings
 from django.urls import reverse
 from google.cloud.translate_v3 import (
     SupportedLanguages,
@@ -44,6 +47,7 @@ from weblate.machinery.base import (
     MachineryRateLimit,
     MachineTranslation,
     MachineTranslationError,
+    dispatch_services,
 )
 from weblate.machinery.deepl import DeepLTranslation
 from weblate.machinery.dummy import DummyTranslation
@@ -56,10 +60,12 @@ from weblate.machinery.microsoftterminology import (
     MST_API_URL,
     MicrosoftTerminologyService,
 )
+from weblate.machinery.models import CachedTranslation
 from weblate.machinery.modernmt import ModernMTTranslation
 from weblate.machinery.mymemory import MyMemoryTranslation
 from weblate.machinery.netease import NETEASE_API_ROOT, NeteaseSightTranslation
 from weblate.machinery.saptranslationhub import SAPTranslationHub
+from weblate.machinery.tasks import cleanup_machinery_cache, prefetch_machinery
 from weblate.machinery.tmserver import AMAGAMA_LIVE, AmagamaTranslation
 from weblate.machinery.weblatetm import WeblateTranslation
 from weblate.machinery.yandex import YandexTranslation
@@ -69,6 +75,7 @@ from weblate.trans.tests.test_views import FixtureTestCase
 from weblate.trans.tests.utils import get_test_file
 from weblate.utils.classloader import load_class
 from weblate.utils.db import using_postgresql
+from weblate.utils.requests import get_connection_counters, get_session
 from weblate.utils.state import STATE_TRANSLATED
 
 GLOSBE_JSON = {
@@ -436,6 +443,61 @@ class MachineTranslationTest(BaseMachineTranslationTest):
             ],
         )
 
+    @override_settings(MACHINERY_RATE_LIMITS={"dummy": (1, 3600)})
+    def test_rate_limiter(self):
+        machine = self.get_machine()
+        cache.delete(machine.rate_limiter.key)
+        unit = MockUnit(code="cs", source="Hello, world!")
+        self.assertEqual(len(machine.translate(unit)), 2)
+        with self.assertRaises(MachineryRateLimit):
+            machine.translate(unit)
+        # Local rate limiting does not block the service
+        self.assertFalse(machine.is_rate_limited())
+
+    @override_settings(MACHINERY_DATABASE_CACHE=True)
+    def test_database_cache(self):
+        machine = self.get_machine(cache=True)
+        unit = MockUnit(code="cs", source="Hello, world!")
+        translation = machine.translate(unit)
+        self.assertEqual(CachedTranslation.objects.count(), 1)
+        # Results are loaded from the database once the cache is gone
+        cache.clear()
+        with patch.object(machine, "download_translations", side_effect=Exception):
+            self.assertEqual(machine.translate(unit), translation)
+            unit = MockUnit(code="cs", source="Hello, world!")
+            machine.batch_translate([unit])
+            self.assertEqual(unit.machinery["translation"], "Ahoj světe!")
+        with override_settings(MACHINERY_DATABASE_CACHE_SIZE=0):
+            cleanup_machinery_cache()
+        self.assertEqual(CachedTranslation.objects.count(), 0)
+
+    @responses.activate
+    def test_request_session(self):
+        responses.add(responses.GET, "https://example.com/", json={})
+        machine = self.get_machine()
+        session = get_session(machine.mtid)
+        self.assertIs(session, get_session(machine.mtid))
+        self.assertIsNot(session, get_session("other"))
+        requests = get_connection_counters()["requests"]
+        machine.request("get", "https://example.com/")
+        self.assertEqual(get_connection_counters()["requests"], requests + 1)
+
+    def test_dispatch_deadline(self):
+        event = Event()
+
+        def translate(service):
+            if service is slow:
+                event.wait(5)
+            return service.name
+
+        fast = self.get_machine()
+        slow = self.get_machine()
+        results = dispatch_services([fast, slow], translate, deadline=0.5)
+        event.set()
+        self.assertEqual(results[0], (fast, "Dummy", None))
+        self.assertEqual(results[1][0], slow)
+        self.assertIsInstance(results[1][2], MachineTranslationError)
+
 
 class GlosbeTranslationTest(BaseMachineTranslationTest):
     MACHINE_CLS = GlosbeTranslation
@@ -591,6 +653,61 @@ class MicrosoftCognitiveTranslationTest(BaseMachineTranslationTest):
             json=MICROSOFT_RESPONSE,
         )
 
+    def mock_batch(self, machine, calls):
+        def request_callback(request):
+            texts = [item["Text"] for item in json.loads(request.body)]
+            calls.append(texts)
+            translations = [
+                {"translations": [{"text": text.upper(), "to": "cs"}]} for text in texts
+            ]
+            return (200, {}, json.dumps(translations))
+
+        self.mock_response()
+        # Fetch languages and access token
+        self.assert_translate(
+            self.SUPPORTED, self.SOURCE_TRANSLATED, self.EXPECTED_LEN, machine=machine
+        )
+        responses.reset()
+        responses.add_callback(
+            responses.POST,
+            "https://api.cognitive.microsofttranslator.com/"
+            "translate?api-version=3.0&from=en&to=cs&category=general",
+            callback=request_callback,
+        )
+
+    @responses.activate
+    def test_batch_multiple(self):
+        machine = self.get_machine()
+        calls = []
+        self.mock_batch(machine, calls)
+        units = [
+            MockUnit(code=self.SUPPORTED, source=source)
+            for source in ("First", "Second", "First")
+        ]
+        machine.batch_translate(units)
+        self.assertEqual(calls, [["First", "Second"]])
+        self.assertEqual(
+            [unit.machinery["translation"] for unit in units],
+            ["FIRST", "SECOND", "FIRST"],
+        )
+
+    @responses.activate
+    def test_batch_request_size(self):
+        machine = self.get_machine()
+        calls = []
+        self.mock_batch(machine, calls)
+        # Twelve strings of the maximal length do not fit into a single request
+        sources = [f"{i:02d}".ljust(5000, "x") for i in range(12)]
+        units = [MockUnit(code=self.SUPPORTED, source=source) for source in sources]
+        with patch.object(machine, "acquire_rate_limit") as acquire_rate_limit:
+            machine.batch_translate(units)
+        self.assertEqual(calls, [sources[:10], sources[10:]])
+        self.assertEqual(acquire_rate_limit.call_count, len(calls))
+        self.assertEqual(
+            [unit.machinery["translation"] for unit in units],
+            [source.upper() for source in sources],
+        )
+
 
 class MicrosoftCognitiveTranslationRegionTest(MicrosoftCognitiveTranslationTest):
     CONFIGURATION = {
@@ -705,6 +822,34 @@ class GoogleTranslationTest(BaseMachineTranslationTest):
             json={"data": {"translations": [{"translatedText": "svet"}]}},
         )
 
+    @responses.activate
+    def test_batch_multiple(self):
+        def request_callback(request):
+            texts = parse_qs(request.body)["q"]
+            translations = [{"translatedText": text.upper()} for text in texts]
+            return (200, {}, json.dumps({"data": {"translations": translations}}))
+
+        machine = self.get_machine()
+        self.mock_response()
+        # Fetch supported languages
+        self.assert_translate(
+            self.SUPPORTED, self.SOURCE_TRANSLATED, self.EXPECTED_LEN, machine=machine
+        )
+        responses.reset()
+        responses.add_callback(
+            responses.POST, GOOGLE_API_ROOT, callback=request_callback
+        )
+        units = [
+            MockUnit(code=self.SUPPORTED, source=source)
+            for source in ("First", "Second", "First")
+        ]
+        machine.batch_translate(units)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(
+            [unit.machinery["translation"] for unit in units],
+            ["FIRST", "SECOND", "FIRST"],
+        )
+
     @responses.activate
     def test_ratelimit_set(self):
         """Test manual setting of rate limit."""
@@ -764,6 +909,35 @@ class GoogleV3TranslationTest(BaseMachineTranslationTest):
         patcher.start()
         self.addCleanup(patcher.stop)
 
+    def test_batch_multiple(self):
+        def translate_text(request):
+            return TranslateTextResponse(
+                {
+                    "translations": [
+                        {"translated_text": text.upper()}
+                        for text in request["contents"]
+                    ]
+                }
+            )
+
+        self.mock_response()
+        TranslationServiceClient.translate_text.side_effect = translate_text
+        machine = self.get_machine()
+        units = [
+            MockUnit(code=self.SUPPORTED, source=source)
+            for source in ("First", "Second", "First")
+        ]
+        machine.batch_translate(units)
+        TranslationServiceClient.translate_text.assert_called_once()
+        self.assertEqual(
+            TranslationServiceClient.translate_text.call_args[0][0]["contents"],
+            ["First", "Second"],
+        )
+        self.assertEqual(
+            [unit.machinery["translation"] for unit in units],
+            ["FIRST", "SECOND", "FIRST"],
+        )
+
 
 class AmagamaTranslationTest(BaseMachineTranslationTest):
     MACHINE_CLS = AmagamaTranslation
@@ -1164,6 +1338,72 @@ class DeepLTranslationTest(BaseMachineTranslationTest):
         )
         self.assertEqual(len(responses.calls), 0)
 
+    @responses.activate
+    def test_batch_multiple(self):
+        def request_callback(request):
+            texts = parse_qs(request.body)["text"]
+            self.assertNotIn(self.SOURCE_TRANSLATED, texts)
+            translations = [{"text": text.upper()} for text in texts]
+            return (200, {}, json.dumps({"translations": translations}))
+
+        machine = self.MACHINE_CLS(self.CONFIGURATION)
+        machine.delete_cache()
+        self.mock_response()
+        # Cached string is not translated again
+        self.assert_translate(
+            self.SUPPORTED, self.SOURCE_TRANSLATED, self.EXPECTED_LEN, machine=machine
+        )
+        responses.reset()
+        responses.add_callback(
+            responses.POST,
+            "https://api.deepl.com/v2/translate",
+            callback=request_callback,
+        )
+        units = [
+            MockUnit(code=self.SUPPORTED, source=source)
+            for source in (self.SOURCE_TRANSLATED, "First", "Second", "First")
+        ]
+        machine.batch_translate(units)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(
+            [unit.machinery["translation"] for unit in units],
+            ["Hallo", "FIRST", "SECOND", "FIRST"],
+        )
+
+    @responses.activate
+    def test_batch_request_size(self):
+        calls = []
+
+        def request_callback(request):
+            texts = parse_qs(request.body)["text"]
+            calls.append(texts)
+            translations = [{"text": text.upper()} for text in texts]
+            return (200, {}, json.dumps({"translations": translations}))
+
+        machine = self.get_machine()
+        self.mock_response()
+        # Fetch supported languages
+        self.assert_translate(
+            self.SUPPORTED, self.SOURCE_TRANSLATED, self.EXPECTED_LEN, machine=machine
+        )
+        responses.reset()
+        responses.add_callback(
+            responses.POST,
+            "https://api.deepl.com/v2/translate",
+            callback=request_callback,
+        )
+        # Fifteen long strings do not fit into a single request
+        sources = [f"{i:02d}".ljust(10000, "x") for i in range(15)]
+        units = [MockUnit(code=self.SUPPORTED, source=source) for source in sources]
+        with patch.object(machine, "acquire_rate_limit") as acquire_rate_limit:
+            machine.batch_translate(units)
+        self.assertEqual(calls, [sources[:11], sources[11:]])
+        self.assertEqual(acquire_rate_limit.call_count, len(calls))
+        self.assertEqual(
+            [unit.machinery["translation"] for unit in units],
+            [source.upper() for source in sources],
+        )
+
 
 class LibreTranslateTranslationTest(BaseMachineTranslationTest):
     MACHINE_CLS = LibreTranslateTranslation
@@ -1217,6 +1457,36 @@ class LibreTranslateTranslationTest(BaseMachineTranslationTest):
         )
         self.assertEqual(len(responses.calls), 0)
 
+    @responses.activate
+    def test_batch_multiple(self):
+        def request_callback(request):
+            texts = json.loads(request.body)["q"]
+            translations = [text.upper() for text in texts]
+            return (200, {}, json.dumps({"translatedText": translations}))
+
+        machine = self.get_machine()
+        self.mock_response()
+        # Fetch supported languages
+        self.assert_translate(
+            self.SUPPORTED, self.SOURCE_TRANSLATED, self.EXPECTED_LEN, machine=machine
+        )
+        responses.reset()
+        responses.add_callback(
+            responses.POST,
+            "https://libretranslate.com/translate",
+            callback=request_callback,
+        )
+        units = [
+            MockUnit(code=self.SUPPORTED, source=source)
+            for source in ("First", "Second", "First")
+        ]
+        machine.batch_translate(units)
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(
+            [unit.machinery["translation"] for unit in units],
+            ["FIRST", "SECOND", "FIRST"],
+        )
+
 
 class AWSTranslationTest(BaseMachineTranslationTest):
     MACHINE_CLS = AWSTranslation
@@ -1370,6 +1640,50 @@ class ViewsTest(FixtureTestCase):
         )
         self.assertEqual(response.status_code, 404)
 
+    def test_translate_all(self):
+        self.ensure_dummy_mt()
+        unit = self.get_unit()
+        response = self.client.post(
+            reverse("js-translate-all", kwargs={"unit_id": unit.id})
+        )
+        responses = {item["service"]: item for item in response.json()["responses"]}
+        self.assertEqual(responses["Dummy"]["responseStatus"], 200)
+        self.assertEqual(
+            [item["text"] for item in responses["Dummy"]["translations"]],
+            ["Nazdar světe!", "Ahoj světe!"],
+        )
+        self.assertEqual(responses["Weblate Translation Memory"]["responseStatus"], 200)
+
+    def test_prefetch_disabled(self):
+        self.ensure_dummy_mt()
+        translation = self.get_unit().translation
+        with patch("weblate.trans.views.edit.prefetch_machinery.delay") as delay:
+            self.client.get(translation.get_translate_url(), {"offset": 1})
+        delay.assert_not_called()
+
+    @override_settings(MACHINERY_PREFETCH=3)
+    def test_prefetch(self):
+        service = self.ensure_dummy_mt()
+        unit = self.get_unit()
+        translation = unit.translation
+        with patch("weblate.trans.views.edit.prefetch_machinery.delay") as delay:
+            self.client.get(translation.get_translate_url(), {"offset": 1})
+        delay.assert_called_once()
+        unit_ids = delay.call_args[1]["unit_ids"]
+        self.assertTrue(0 < len(unit_ids) <= 3)
+
+        # Prefetching stores results in the cache
+        machine = service({})
+        source, language = machine.get_languages(
+            translation.component.source_language, translation.language
+        )
+        cache_key = machine.translate_cache_key(
+            source, language, machine.cleanup_text(unit)[0], 75
+        )
+        cache.delete(cache_key)
+        prefetch_machinery(unit_ids=[unit.id], user_id=self.user.id)
+        self.assertEqual(len(cache.get(cache_key)), 2)
+
     def test_memory(self):
         unit = self.get_unit()
         url = reverse("js-memory", kwargs={"unit_id": unit.id})
@@ -19,6 +19,7 @@
 
 from typing import Dict, Optional
 
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
 from django.http import (
     Http404,
@@ -35,7 +36,11 @@ from django.views.generic import TemplateView
 from django.views.generic.edit import FormView
 
 from weblate.configuration.models import Setting
-from weblate.machinery.base import MachineTranslationError
+from weblate.machinery.base import (
+    MachineTranslationError,
+    dispatch_services,
+    prepare_units,
+)
 from weblate.machinery.models import MACHINERY
 from weblate.trans.models import Unit
 from weblate.utils.errors import report_error
@@ -300,6 +305,36 @@ class EditMachineryProjectView(MachineryProjectMixin, EditMachineryView):
         return result
 
 
+def get_machinery_response(translation, translation_service_class):
+    """Return error response for the service, updated on success."""
+    return {
+        "responseStatus": 500,
+        "responseDetails": "",
+        "translations": [],
+        "lang": translation.language.code,
+        "dir": translation.language.direction,
+        "service": translation_service_class.name,
+    }
+
+
+def update_machinery_response(response, translations, error):
+    if error is None:
+        response["translations"] = translations
+        response["responseStatus"] = 200
+    elif isinstance(error, MachineTranslationError):
+        response["responseDetails"] = str(error)
+    else:
+        response["responseDetails"] = f"{error.__class__.__name__}: {error}"
+
+
+def get_translation_service(service, machinery_settings):
+    """Return configured machine translation service or None if not available."""
+    try:
+        return MACHINERY[service](machinery_settings[service])
+    except KeyError:
+        return None
+
+
 def handle_machinery(request, service, unit, search=None):
     if service not in MACHINERY:
         raise Http404("Invalid service specified")
@@ -311,32 +346,24 @@ def handle_machinery(request, service, unit, search=None):
     translation_service_class = MACHINERY[service]
 
     # Error response
-    response = {
-        "responseStatus": 500,
-        "responseDetails": "",
-        "translations": [],
-        "lang": translation.language.code,
-        "dir": translation.language.direction,
-        "service": translation_service_class.name,
-    }
+    response = get_machinery_response(translation, translation_service_class)
 
     machinery_settings = translation.component.project.get_machinery_settings()
 
-    try:
-        translation_service = translation_service_class(machinery_settings[service])
-    except KeyError:
+    translation_service = get_translation_service(service, machinery_settings)
+    if translation_service is None:
         response["responseDetails"] = _("Service is currently not available.")
     else:
         try:
-            response["translations"] = translation_service.translate(
+            translations = translation_service.translate(
                 unit, request.user, search=search
             )
-            response["responseStatus"] = 200
-        except MachineTranslationError as exc:
-            response["responseDetails"] = str(exc)
         except Exception as error:
-            report_error()
-            response["responseDetails"] = f"{error.__class__.__name__}: {error}"
+            if not isinstance(error, MachineTranslationError):
+                report_error()
+            update_machinery_response(response, None, error)
+        else:
+            update_machinery_response(response, translations, None)
 
     if response["responseStatus"] != 200:
         translation.log_info("machinery failed: %s", response["responseDetails"])
@@ -360,3 +387,40 @@ def memory(request, unit_id):
         return HttpResponseBadRequest("Missing search string")
 
     return handle_machinery(request, "weblate-translation-memory", unit, search=query)
+
+
+@require_POST
+def translate_all(request, unit_id):
+    """AJAX handler for translating using all services in parallel."""
+    unit = get_object_or_404(Unit.objects.prefetch(), pk=int(unit_id))
+    translation = unit.translation
+    if not request.user.has_perm("machinery.view", translation):
+        raise PermissionDenied()
+
+    machinery_settings = translation.component.project.get_machinery_settings()
+    services = []
+    responses = []
+    for service in machinery_settings:
+        translation_service = get_translation_service(service, machinery_settings)
+        if translation_service is None:
+            if service in MACHINERY:
+                response = get_machinery_response(translation, MACHINERY[service])
+                response["responseDetails"] = _("Service is currently not available.")
+                responses.append(response)
+            continue
+        services.append(translation_service)
+    prepare_units([unit])
+    user = request.user
+
+    for translation_service, translations, error in dispatch_services(
+        services,
+        lambda translation_service: translation_service.translate(unit, user),
+        deadline=settings.MACHINERY_DEADLINE,
+    ):
+        response = get_machinery_response(translation, translation_service)
+        update_machinery_response(response, translations, error)
+        if response["responseStatus"] != 200:
+            translation.log_info("machinery failed: %s", response["responseDetails"])
+        responses.append(response)
+
+    return JsonResponse(data={"responses": responses})
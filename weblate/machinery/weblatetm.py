@@ -36,6 +36,7 @@ class WeblateTranslation(MachineTranslation):
     rank_boost = 1
     cache_translations = False
     accounting_key = "internal"
+    concurrent = False
     do_cleanup = False
 
     def convert_language(self, language):
@@ -83,13 +84,18 @@ class WeblateTranslation(MachineTranslation):
         # We want only close matches here
         adjust_similarity_threshold(0.95)
 
-        for munit in matching_units:
-            source = munit.source_string
-            if "forbidden" in munit.all_flags:
-                continue
-            quality = self.comparer.similarity(text, source)
-            if quality < 10 or (quality < threshold and not search):
+        matching_units = [
+            munit for munit in matching_units if "forbidden" not in munit.all_flags
+        ]
+        qualities = self.comparer.similarity_many(
+            text,
+            [munit.source_string for munit in matching_units],
+            cutoff=10 if search else max(10, threshold),
+        )
+        for munit, quality in zip(matching_units, qualities):
+            if not quality:
                 continue
+            source = munit.source_string
             yield {
                 "text": munit.get_target_plurals()[0],
                 "quality": quality,
@@ -0,0 +1,231 @@
+#
+# Copyright © 2012–2022 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Optional local index for translation memory lookups."""
+
+import math
+import re
+from functools import partial
+from typing import Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+
+from weblate.utils.localindex import LocalIndex, get_index
+
+WORD_RE = re.compile(r"\w+")
+
+
+def get_trigrams(text: str) -> Set[str]:
+    """Return trigrams of words in the text the same way as pg_trgm does."""
+    result = set()
+    for word in WORD_RE.findall(text.lower()):
+        word = f"  {word} "
+        result.update(word[pos : pos + 3] for pos in range(len(word) - 2))
+    return result
+
+
+def get_scopes(
+    from_file: bool, shared: bool, project_id: Optional[int], user_id: Optional[int]
+) -> List[str]:
+    """
+    Return ownership scopes of an entry.
+
+    These match MemoryQuerySet.filter_type, lookups are limited to the scopes
+    visible to the caller.
+    """
+    scopes = []
+    if from_file:
+        scopes.append("file")
+    if shared:
+        scopes.append("shared")
+    if project_id:
+        scopes.append(f"project-{project_id}")
+    if user_id:
+        scopes.append(f"user-{user_id}")
+    return scopes
+
+
+class MemoryIndex:
+    """
+    Translation memory index interface.
+
+    The index is used to shortlist similar entries, the lookup falls back to
+    the database when the index can not handle it.
+    """
+
+    # Maximal number of shortlisted entries
+    max_results = 200
+
+    fields = (
+        "source_language_id",
+        "target_language_id",
+        "source",
+        "from_file",
+        "shared",
+        "project_id",
+        "user_id",
+    )
+
+    def get_entry_values(self, entry) -> Tuple:
+        return (entry.pk, *(getattr(entry, field) for field in self.fields))
+
+    def schedule_update(self, entries: Iterable):
+        """Update entries in the index once the transaction is committed."""
+        values = [self.get_entry_values(entry) for entry in entries]
+        transaction.on_commit(partial(self.update_entries, values))
+
+    def update_entries(self, values: Iterable[Tuple]):
+        """Update entries in the index, values are as from get_entry_values."""
+        raise NotImplementedError()
+
+    def schedule_delete(self, ids: Iterable[int]):
+        """Delete entries from the index once the transaction is committed."""
+        transaction.on_commit(partial(self.delete_entries, list(ids)))
+
+    def delete_entries(self, ids: Iterable[int]):
+        raise NotImplementedError()
+
+    def clear(self):
+        raise NotImplementedError()
+
+    def set_ready(self, ready: bool = True):
+        """Mark index as complete and usable for lookups."""
+        raise NotImplementedError()
+
+    def lookup(
+        self,
+        source_language_id: int,
+        target_language_id: int,
+        scopes: Iterable[str],
+        text: str,
+        threshold: float,
+    ) -> Optional[List[int]]:
+        """
+        Return IDs of entries similar to the text, the most similar first.
+
+        Only entries in given scopes (see get_scopes) are considered. The
+        similarity is trigram similarity as used by pg_trgm. None is returned
+        when the index can not handle the lookup.
+        """
+        raise NotImplementedError()
+
+
+class SQLiteMemoryIndex(LocalIndex, MemoryIndex):
+    """
+    Trigram posting lists stored on disk in SQLite.
+
+    The posting lists are partitioned by ownership scope, languages and number
+    of trigrams, so only entries visible to the caller and with a chance to
+    reach the similarity threshold are scanned. Entries in several scopes are
+    stored in each of them.
+    """
+
+    name = "memory"
+    schema = (
+        "CREATE TABLE IF NOT EXISTS trigrams "
+        "(partition TEXT, trigram TEXT, memory_id INTEGER, count INTEGER)",
+        "CREATE INDEX IF NOT EXISTS trigrams_lookup ON trigrams (partition, trigram)",
+        "CREATE INDEX IF NOT EXISTS trigrams_memory ON trigrams (memory_id)",
+    )
+    tables = ("trigrams",)
+
+    @staticmethod
+    def get_partition(
+        scope: str, source_language_id: int, target_language_id: int, bucket: int
+    ):
+        return f"{scope}:{source_language_id}:{target_language_id}:{bucket}"
+
+    def update_entries(self, values: Iterable[Tuple]):
+        values = list(values)
+        rows = []
+        for pk, source_language_id, target_language_id, source, *owner in values:
+            trigrams = get_trigrams(source)
+            for scope in get_scopes(*owner):
+                partition = self.get_partition(
+                    scope,
+                    source_language_id,
+                    target_language_id,
+                    len(trigrams).bit_length(),
+                )
+                rows.extend(
+                    (partition, trigram, pk, len(trigrams)) for trigram in trigrams
+                )
+        with self.connection as connection:
+            connection.executemany(
+                "DELETE FROM trigrams WHERE memory_id = ?",
+                [(item[0],) for item in values],
+            )
+            connection.executemany("INSERT INTO trigrams VALUES (?, ?, ?, ?)", rows)
+
+    def delete_entries(self, ids: Iterable[int]):
+        with self.connection as connection:
+            connection.executemany(
+                "DELETE FROM trigrams WHERE memory_id = ?", [(pk,) for pk in ids]
+            )
+
+    def lookup(
+        self,
+        source_language_id: int,
+        target_language_id: int,
+        scopes: Iterable[str],
+        text: str,
+        threshold: float,
+    ) -> Optional[List[int]]:
+        trigrams = get_trigrams(text)
+        if not trigrams or threshold <= 0 or not self.is_ready:
+            return None
+        count = len(trigrams)
+        # Similarity of shared / all trigrams limits number of trigrams
+        minimum = math.ceil(count * threshold)
+        maximum = math.floor(count / threshold)
+        partitions = [
+            self.get_partition(scope, source_language_id, target_language_id, bucket)
+            for scope in scopes
+            for bucket in range(minimum.bit_length(), maximum.bit_length() + 1)
+        ]
+        # Entries in several scopes are counted once
+        result = self.connection.execute(
+            f"""
+            SELECT memory_id, COUNT(DISTINCT trigram) AS shared
+            FROM trigrams
+            WHERE
+                partition IN ({", ".join("?" for _partition in partitions)})
+                AND trigram IN ({", ".join("?" for _trigram in trigrams)})
+                AND count BETWEEN ? AND ?
+            GROUP BY memory_id
+            HAVING shared >= ? * (? + MAX(count) - shared)
+            ORDER BY shared * 1.0 / (? + MAX(count) - shared) DESC
+            LIMIT ?
+            """,  # nosec
+            (
+                *partitions,
+                *trigrams,
+                minimum,
+                maximum,
+                threshold,
+                count,
+                count,
+                self.max_results,
+            ),
+        )
+        return [row[0] for row in result]
+
+
+def get_memory_index() -> Optional[MemoryIndex]:
+    """Return configured memory index or None if not configured."""
+    return get_index("MEMORY_INDEX")
@@ -29,6 +29,7 @@ class WeblateMemory(MachineTranslation):
     cache_translations = False
     same_languages = True
     accounting_key = "internal"
+    concurrent = False
     do_cleanup = False
 
     def convert_language(self, language):
@@ -54,16 +55,23 @@ class WeblateMemory(MachineTranslation):
         threshold: int = 75,
     ):
         """Download list of possible translations from a service."""
-        for result in Memory.objects.lookup(
-            source,
-            language,
+        results = list(
+            Memory.objects.lookup(
+                source,
+                language,
+                text,
+                user,
+                unit.translation.component.project,
+                unit.translation.component.project.use_shared_tm,
+            )
+        )
+        qualities = self.comparer.similarity_many(
             text,
-            user,
-            unit.translation.component.project,
-            unit.translation.component.project.use_shared_tm,
-        ).iterator():
-            quality = self.comparer.similarity(text, result.source)
-            if quality < 10 or (quality < threshold and not search):
+            [result.source for result in results],
+            cutoff=10 if search else max(10, threshold),
+        )
+        for result, quality in zip(results, qualities):
+            if not quality:
                 continue
             yield {
                 "text": result.target,
@@ -73,3 +81,32 @@ class WeblateMemory(MachineTranslation):
                 "source": result.source,
                 "show_quality": True,
             }
+
+    def _batch_translate(self, source, language, units, user=None, threshold: int = 75):
+        units = [unit for unit in units if unit.machinery["best"] < self.max_score]
+        if not units:
+            return
+        project = units[0].translation.component.project
+
+        # Resolve exact matches for all units in a single query
+        texts = {unit.source_string for unit in units}
+        matches = {}
+        for result in Memory.objects.lookup_exact(
+            source, language, texts, user, project, project.use_shared_tm
+        ).order_by("pk"):
+            if result.source in texts:
+                matches[result.source] = result.target
+
+        remaining = []
+        for unit in units:
+            text = unit.source_string
+            if text in matches:
+                unit.machinery["best"] = self.max_score
+                unit.machinery["translation"] = matches[text]
+            else:
+                remaining.append(unit)
+
+        # Fuzzy lookup for strings without exact match
+        super()._batch_translate(
+            source, language, remaining, user=user, threshold=threshold
+        )
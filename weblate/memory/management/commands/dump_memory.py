@@ -17,9 +17,8 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-import json
-
 from weblate.memory.models import Memory
+from weblate.memory.utils import iter_json
 from weblate.utils.management.base import BaseCommand
 
 
@@ -44,9 +43,8 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        memory = Memory.objects.all().prefetch_lang()
+        memory = Memory.objects.all()
         self.stdout.ending = None
-        json.dump(
-            [item.as_dict() for item in memory], self.stdout, indent=options["indent"]
-        )
+        for chunk in iter_json(memory, indent=options["indent"]):
+            self.stdout.write(chunk)
         self.stdout.write("\n")
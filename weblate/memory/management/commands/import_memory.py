@@ -48,6 +48,12 @@ class Command(BaseCommand):
             langmap = dict(z.split(":", 1) for z in options["language_map"].split(","))
 
         try:
-            Memory.objects.import_file(None, options["file"], langmap)
+            result = Memory.objects.import_file(
+                None, options["file"], langmap, callback=self.report_progress
+            )
         except MemoryImportError as error:
             raise CommandError(f"Import failed: {error}")
+        self.stdout.write(f"Imported {result} entries")
+
+    def report_progress(self, count: int):
+        self.stdout.write(f"Processed {count} entries...")
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.3 on 2022-11-28 10:12
+
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX memory_source_md5 ON memory_memory (MD5(source))"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX memory_source_md5")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("memory", "0012_remove_blank"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index, elidable=False, atomic=False)
+    ]
@@ -17,24 +17,28 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import codecs
 import json
 import math
 import os
 from functools import reduce
+from hashlib import md5
+from typing import Iterable
 
 from django.conf import settings
-from django.db import models
-from django.db.models import Q
-from django.utils.encoding import force_str
+from django.db import models, transaction
+from django.db.models import Case, IntegerField, Q, When
+from django.db.models.functions import MD5
 from django.utils.translation import gettext as _
 from django.utils.translation import pgettext
 from jsonschema import validate
 from jsonschema.exceptions import ValidationError
-from translate.misc.xml_helpers import getXMLlang, getXMLspace
-from translate.storage.tmx import tmxfile
+from lxml import etree
+from translate.misc.xml_helpers import getText, getXMLlang, getXMLspace
 from weblate_schemas import load_schema
 
 from weblate.lang.models import Language
+from weblate.memory.index import get_memory_index, get_scopes
 from weblate.memory.utils import (
     CATEGORY_FILE,
     CATEGORY_PRIVATE_OFFSET,
@@ -44,21 +48,77 @@ from weblate.memory.utils import (
 from weblate.utils.db import adjust_similarity_threshold
 from weblate.utils.errors import report_error
 
+# Number of entries stored at once while importing
+IMPORT_BATCH_SIZE = 1000
+
 
 class MemoryImportError(Exception):
     pass
 
 
-def get_node_data(unit, node):
-    """Generic implementation of LISAUnit.gettarget."""
+def get_node_data(node, xml_space: str):
+    """Return language and text of a TMX translation unit variant."""
     # The language should be present as xml:lang, but in some
     # cases it's there only as lang
+    seg = next(node.iterchildren("{*}seg"), None)
     return (
         getXMLlang(node) or node.get("lang"),
-        unit.getNodeText(node, getXMLspace(unit.xmlelement, "preserve")),
+        None if seg is None else getText(seg, xml_space),
     )
 
 
+def iter_json_array(fileobj, chunk_size: int = 65536):
+    """Incrementally parse items of JSON array from a binary file."""
+    decoder = json.JSONDecoder()
+    charset = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    eof = need_more = False
+    state = "start"
+    while True:
+        if not eof and (need_more or len(buffer) < chunk_size):
+            chunk = fileobj.read(chunk_size)
+            eof = not chunk
+            buffer += charset.decode(chunk, final=eof)
+            need_more = False
+        buffer = buffer.lstrip()
+        if state == "end":
+            if buffer:
+                raise ValueError("Extra data after the array")
+            if eof:
+                return
+            continue
+        if not buffer:
+            if eof:
+                raise ValueError("Unexpected end of data")
+            continue
+        char = buffer[0]
+        if state == "start":
+            if char != "[":
+                raise ValueError("Expecting array")
+            buffer, state = buffer[1:], "first"
+        elif char == "]" and state in ("first", "next"):
+            buffer, state = buffer[1:], "end"
+        elif state == "next":
+            if char != ",":
+                raise ValueError("Expecting ',' delimiter")
+            buffer, state = buffer[1:], "item"
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except ValueError:
+                if eof:
+                    raise
+                # The item continues in the next chunk
+                need_more = True
+                continue
+            if end == len(buffer) and not eof:
+                # Value such as number might continue in the next chunk
+                need_more = True
+                continue
+            yield item
+            buffer, state = buffer[end:], "next"
+
+
 class MemoryQuerySet(models.QuerySet):
     def filter_type(self, user=None, project=None, use_shared=False, from_file=False):
         query = []
@@ -82,17 +142,44 @@ class MemoryQuerySet(models.QuerySet):
         # for long strings
         if length > 50:
             threshold = 1 - 28.1838 * math.log(0.0443791 * length) / length
-        adjust_similarity_threshold(threshold)
+        # Shortlist candidates using the local index
+        memory_index = get_memory_index()
+        if memory_index is not None:
+            ids = memory_index.lookup(
+                source_language.pk,
+                target_language.pk,
+                # Same as filter_type below
+                get_scopes(
+                    True,
+                    use_shared,
+                    project.pk if project else None,
+                    user.pk if user else None,
+                ),
+                text,
+                threshold,
+            )
+        else:
+            ids = None
+        if ids is None:
+            adjust_similarity_threshold(threshold)
+            # Full-text search on source
+            base = self.filter(source__search=text)
+        else:
+            # Keep the most similar entries first
+            base = self.filter(pk__in=ids).order_by(
+                Case(
+                    *(When(pk=pk, then=position) for position, pk in enumerate(ids)),
+                    output_field=IntegerField(),
+                )
+            )
         # Actual database query
-        return self.filter_type(
+        return base.filter_type(
             # Type filtering
             user=user,
             project=project,
             use_shared=use_shared,
             from_file=True,
         ).filter(
-            # Full-text search on source
-            source__search=text,
             # Language filtering
             source_language=source_language,
             target_language=target_language,
@@ -100,114 +187,213 @@ class MemoryQuerySet(models.QuerySet):
             :50
         ]
 
+    def lookup_exact(
+        self,
+        source_language,
+        target_language,
+        texts: Iterable[str],
+        user,
+        project,
+        use_shared,
+    ):
+        """Return entries with source exactly matching any of the texts."""
+        # Match on hash, this can use index and works for long strings as well
+        hashes = {md5(text.encode()).hexdigest() for text in texts}  # nosec
+        return (
+            self.annotate(source_md5=MD5("source"))
+            .filter(source_md5__in=hashes)
+            .filter_type(
+                user=user,
+                project=project,
+                use_shared=use_shared,
+                from_file=True,
+            )
+            .filter(
+                source_language=source_language,
+                target_language=target_language,
+            )
+        )
+
+    def delete(self):
+        memory_index = get_memory_index()
+        if memory_index is not None:
+            memory_index.schedule_delete(self.values_list("pk", flat=True))
+        return super().delete()
+
     def prefetch_lang(self):
         return self.prefetch_related("source_language", "target_language")
 
 
 class MemoryManager(models.Manager):
-    def import_file(self, request, fileobj, langmap=None, **kwargs):
+    def import_file(self, request, fileobj, langmap=None, callback=None, **kwargs):
+        """
+        Import translation memory file.
+
+        The file is parsed incrementally and the entries are stored in batches,
+        the optional callback is invoked with number of processed entries after
+        each batch. Returns number of created entries.
+        """
         origin = os.path.basename(fileobj.name).lower()
         name, extension = os.path.splitext(origin)
         if len(name) > 25:
             origin = f"{name[:25]}...{extension}"
 
         if extension == ".tmx":
-            result = self.import_tmx(request, fileobj, origin, langmap, **kwargs)
+            if not kwargs:
+                kwargs = {"from_file": True}
+            entries = self.parse_tmx(fileobj, langmap)
         elif extension == ".json":
-            result = self.import_json(request, fileobj, origin, **kwargs)
+            entries = self.parse_json(fileobj)
         else:
             raise MemoryImportError(_("Unsupported file!"))
-        if not result:
+        with transaction.atomic():
+            found, created = self.import_entries(
+                entries, callback, origin=origin, **kwargs
+            )
+        if not found:
             raise MemoryImportError(_("No valid entries found in the uploaded file!"))
-        return result
+        return created
 
-    def import_json(self, request, fileobj, origin=None, **kwargs):
-        content = fileobj.read()
+    def parse_json(self, fileobj):
+        """Yield language, language, source, target tuples from JSON file."""
+        schema = load_schema("weblate-memory.schema.json")["items"]
+        lang_cache = {}
         try:
-            data = json.loads(force_str(content))
+            for entry in iter_json_array(fileobj):
+                validate(entry, schema)
+                try:
+                    yield (
+                        Language.objects.get_by_code(
+                            entry["source_language"], lang_cache
+                        ),
+                        Language.objects.get_by_code(
+                            entry["target_language"], lang_cache
+                        ),
+                        entry["source"],
+                        entry["target"],
+                    )
+                except Language.DoesNotExist:
+                    continue
         except ValueError as error:
             report_error(cause="Failed to parse memory")
             raise MemoryImportError(_("Failed to parse JSON file: {!s}").format(error))
-        try:
-            validate(data, load_schema("weblate-memory.schema.json"))
         except ValidationError as error:
             report_error(cause="Failed to validate memory")
             raise MemoryImportError(_("Failed to parse JSON file: {!s}").format(error))
-        found = 0
-        lang_cache = {}
-        for entry in data:
-            try:
-                self.update_entry(
-                    source_language=Language.objects.get_by_code(
-                        entry["source_language"], lang_cache
-                    ),
-                    target_language=Language.objects.get_by_code(
-                        entry["target_language"], lang_cache
-                    ),
-                    source=entry["source"],
-                    target=entry["target"],
-                    origin=origin,
-                    **kwargs,
-                )
-                found += 1
-            except Language.DoesNotExist:
-                continue
-        return found
 
-    def import_tmx(self, request, fileobj, origin=None, langmap=None, **kwargs):
-        if not kwargs:
-            kwargs = {"from_file": True}
-        try:
-            storage = tmxfile.parsefile(fileobj)
-        except (SyntaxError, AssertionError):
-            report_error(cause="Failed to parse")
-            raise MemoryImportError(_("Failed to parse TMX file!"))
-        header = next(
-            storage.document.getroot().iterchildren(storage.namespaced("header"))
-        )
+    def parse_tmx(self, fileobj, langmap=None):
+        """Yield language, language, source, target tuples from TMX file."""
         lang_cache = {}
+        source_language = None
         try:
-            source_language = Language.objects.get_by_code(
-                header.get("srclang"), lang_cache, langmap
-            )
-        except Language.DoesNotExist:
-            raise MemoryImportError(_("Failed to find source language!"))
-
-        found = 0
-        for unit in storage.units:
-            # Parse translations (translate-toolkit does not care about
-            # languages here, it just picks first and second XML elements)
-            translations = {}
-            for node in unit.getlanguageNodes():
-                lang_code, text = get_node_data(unit, node)
-                if not lang_code or not text:
+            for _event, element in etree.iterparse(
+                fileobj,
+                events=("end",),
+                tag=("{*}header", "{*}tu"),
+                resolve_entities=False,
+            ):
+                if etree.QName(element).localname == "header":
+                    try:
+                        source_language = Language.objects.get_by_code(
+                            element.get("srclang"), lang_cache, langmap
+                        )
+                    except Language.DoesNotExist:
+                        raise MemoryImportError(_("Failed to find source language!"))
                     continue
-                language = Language.objects.get_by_code(lang_code, lang_cache, langmap)
-                translations[language.code] = text
+                if source_language is None:
+                    raise MemoryImportError(_("Failed to find source language!"))
 
-            try:
-                source = translations.pop(source_language.code)
-            except KeyError:
-                # Skip if source language is not present
-                continue
+                # Parse translations (translate-toolkit does not care about
+                # languages here, it just picks first and second XML elements)
+                xml_space = getXMLspace(element, "preserve")
+                translations = {}
+                for node in element.iterchildren("{*}tuv"):
+                    lang_code, text = get_node_data(node, xml_space)
+                    if not lang_code or not text:
+                        continue
+                    language = Language.objects.get_by_code(
+                        lang_code, lang_cache, langmap
+                    )
+                    translations[language.code] = language, text
 
-            for lang, text in translations.items():
-                self.update_entry(
-                    source_language=source_language,
-                    target_language=Language.objects.get_by_code(
-                        lang, lang_cache, langmap
-                    ),
-                    source=source,
-                    target=text,
-                    origin=origin,
-                    **kwargs,
-                )
-                found += 1
-        return found
+                # Free memory used by the processed elements
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+                try:
+                    source = translations.pop(source_language.code)[1]
+                except KeyError:
+                    # Skip if source language is not present
+                    continue
+
+                for language, text in translations.values():
+                    yield source_language, language, source, text
+        except etree.XMLSyntaxError:
+            report_error(cause="Failed to parse")
+            raise MemoryImportError(_("Failed to parse TMX file!"))
 
-    def update_entry(self, **kwargs):
-        if not self.filter(**kwargs).exists():
-            self.create(**kwargs)
+    def import_entries(self, entries, callback=None, **kwargs):
+        """
+        Store entries skipping already existing ones.
+
+        The entries are iterable of source language, target language, source and
+        target tuples, returns number of processed and created entries. The
+        callback receives number of processed entries.
+        """
+        found = created = 0
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                created += self.create_entries(batch, **kwargs)
+                found += len(batch)
+                batch = []
+                if callback is not None:
+                    callback(found)
+        if batch:
+            created += self.create_entries(batch, **kwargs)
+            found += len(batch)
+            if callback is not None:
+                callback(found)
+        return found, created
+
+    def create_entries(self, batch, **kwargs) -> int:
+        """
+        Create entries from a batch with single lookup and insert.
+
+        Returns number of created entries.
+        """
+        pending = {}
+        for source_language, target_language, source, target in batch:
+            pending[(source_language.pk, target_language.pk, source, target)] = (
+                source_language,
+                target_language,
+            )
+        existing = self.filter(
+            source__in={key[2] for key in pending}, **kwargs
+        ).values_list("source_language_id", "target_language_id", "source", "target")
+        for key in existing:
+            pending.pop(key, None)
+        if not pending:
+            return 0
+        created = self.bulk_create(
+            Memory(
+                source_language=source_language,
+                target_language=target_language,
+                source=key[2],
+                target=key[3],
+                **kwargs,
+            )
+            for key, (source_language, target_language) in pending.items()
+        )
+        memory_index = get_memory_index()
+        if memory_index is not None:
+            if any(entry.pk is None for entry in created):
+                # Database does not return IDs from bulk_create
+                created = self.filter(source__in={key[2] for key in pending}, **kwargs)
+            memory_index.schedule_update(created)
+        return len(pending)
 
 
 class Memory(models.Model):
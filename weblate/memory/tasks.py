@@ -17,15 +17,33 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from typing import Optional
+import threading
+from collections import defaultdict
+from typing import Iterable, List, Optional, Tuple
 
 from django.db import transaction
 
 from weblate.machinery.base import get_machinery_language
+from weblate.memory.index import get_memory_index
 from weblate.memory.models import Memory
 from weblate.utils.celery import app
+from weblate.utils.db import is_on_commit_registered
 from weblate.utils.state import STATE_TRANSLATED
 
+# Number of units processed in a single batch
+MEMORY_BATCH_SIZE = 1000
+
+MEMORY_FIELDS = (
+    "source_language_id",
+    "target_language_id",
+    "source",
+    "target",
+    "origin",
+    "user_id",
+    "project_id",
+    "shared",
+)
+
 
 @app.task(trail=False)
 def import_memory(project_id: int, component_id: Optional[int] = None):
@@ -47,77 +65,140 @@ def import_memory(project_id: int, component_id: Optional[int] = None):
                 units = units.exclude(
                     translation__language_id=component.source_language_id
                 )
-            for unit in units.prefetch_related("translation", "translation__language"):
-                update_memory(None, unit, component, project)
+            units = units.select_related("translation", "translation__language")
+            component.project = project
+            batch = []
+            for unit in units.iterator(chunk_size=MEMORY_BATCH_SIZE):
+                unit.translation.component = component
+                batch.append((unit, None))
+                if len(batch) >= MEMORY_BATCH_SIZE:
+                    update_memory_units(batch)
+                    batch = []
+            if batch:
+                update_memory_units(batch)
 
 
 @app.task(trail=False)
 def handle_unit_translation_change(unit_id, user_id=None):
-    from weblate.auth.models import User
+    handle_translation_changes([(unit_id, user_id)])
+
+
+@app.task(trail=False)
+def handle_translation_changes(changes: List[Tuple[int, Optional[int]]]):
+    """Update translation memory for list of unit and user IDs pairs."""
     from weblate.trans.models import Unit
 
-    user = None if user_id is None else User.objects.get(pk=user_id)
-    unit = Unit.objects.select_related(
+    units = Unit.objects.select_related(
         "translation",
         "translation__language",
         "translation__component",
         "translation__component__source_language",
         "translation__component__project",
-    ).get(pk=unit_id)
-    update_memory(user, unit)
-
-
-def update_memory(user, unit, component=None, project=None):
-    component = component or unit.translation.component
-    project = project or component.project
-    params = {
-        "source_language": get_machinery_language(component.source_language),
-        "target_language": get_machinery_language(unit.translation.language),
-        "source": unit.source,
-        "target": unit.target,
-        "origin": component.full_slug,
-    }
-
-    add_project = True
-    add_shared = project.contribute_shared_tm
-    add_user = user is not None
-
-    # Check matching entries in memory
-    for matching in Memory.objects.filter(from_file=False, **params):
-        if (
-            matching.user_id is None
-            and matching.project_id == project.id
-            and not matching.shared
-        ):
-            add_project = False
-        elif (
-            add_shared
-            and matching.user_id is None
-            and matching.project_id is None
-            and matching.shared
-        ):
-            add_shared = False
-        elif (
-            add_user
-            and matching.user_id == user.id
-            and matching.project_id is None
-            and not matching.shared
-        ):
-            add_user = False
-
-    to_create = []
-
-    if add_project:
-        to_create.append(
-            Memory(user=None, project=project, from_file=False, shared=False, **params)
-        )
-    if add_shared:
-        to_create.append(
-            Memory(user=None, project=None, from_file=False, shared=True, **params)
-        )
-    if add_user:
-        to_create.append(
-            Memory(user=user, project=None, from_file=False, shared=False, **params)
+    ).in_bulk({unit_id for unit_id, _user_id in changes})
+    update_memory_units(
+        (units[unit_id], user_id) for unit_id, user_id in changes if unit_id in units
+    )
+
+
+class PendingMemoryUpdate(threading.local):
+    """Translation memory updates collected until the transaction is committed."""
+
+    def __init__(self):
+        super().__init__()
+        self.changes = {}
+
+    def add(self, unit_id: int, user_id: Optional[int] = None):
+        self.changes[(unit_id, user_id)] = True
+
+    def __call__(self):
+        changes = list(self.changes)
+        self.changes = {}
+        for start in range(0, len(changes), MEMORY_BATCH_SIZE):
+            handle_translation_changes.delay(changes[start : start + MEMORY_BATCH_SIZE])
+
+
+PENDING_MEMORY_UPDATE = PendingMemoryUpdate()
+
+
+def schedule_memory_update(unit_id: int, user_id: Optional[int] = None):
+    """
+    Schedule translation memory update for the unit.
+
+    Updates made within a single transaction are merged into batches
+    processed once it is committed.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        handle_translation_changes.delay([(unit_id, user_id)])
+        return
+    pending = PENDING_MEMORY_UPDATE
+    if is_on_commit_registered(pending):
+        pending.add(unit_id, user_id)
+    else:
+        # Discard changes from a rolled back transaction or savepoint
+        pending.changes = {}
+        pending.add(unit_id, user_id)
+        transaction.on_commit(pending)
+
+
+def update_memory_units(changes: Iterable[Tuple]):
+    """
+    Store translation memory entries for the units.
+
+    The changes are iterable of unit and user ID pairs. Entries are grouped
+    by language pair and each group is stored with a single lookup of
+    existing entries and a bulk insert.
+    """
+    languages = {}
+
+    def get_language(language):
+        if language.pk not in languages:
+            languages[language.pk] = get_machinery_language(language).pk
+        return languages[language.pk]
+
+    grouped = defaultdict(dict)
+    for unit, user_id in changes:
+        translation = unit.translation
+        component = translation.component
+        project = component.project
+        source_language_id = get_language(component.source_language)
+        target_language_id = get_language(translation.language)
+        base = (
+            source_language_id,
+            target_language_id,
+            unit.source,
+            unit.target,
+            component.full_slug,
         )
-    if to_create:
-        Memory.objects.bulk_create(to_create)
+        entries = grouped[(source_language_id, target_language_id)]
+        entries[(*base, None, project.id, False)] = True
+        if project.contribute_shared_tm:
+            entries[(*base, None, None, True)] = True
+        if user_id is not None:
+            entries[(*base, user_id, None, False)] = True
+
+    memory_index = get_memory_index()
+    for (source_language_id, target_language_id), entries in grouped.items():
+        keys = list(entries)
+        for start in range(0, len(keys), MEMORY_BATCH_SIZE):
+            batch = keys[start : start + MEMORY_BATCH_SIZE]
+            sources = {key[2] for key in batch}
+            lookup = Memory.objects.filter(
+                from_file=False,
+                source_language_id=source_language_id,
+                target_language_id=target_language_id,
+                source__in=sources,
+            )
+            existing = set(lookup.values_list(*MEMORY_FIELDS))
+            to_create = [
+                Memory(from_file=False, **dict(zip(MEMORY_FIELDS, key)))
+                for key in batch
+                if key not in existing
+            ]
+            if not to_create:
+                continue
+            created = Memory.objects.bulk_create(to_create)
+            if memory_index is not None:
+                if any(entry.pk is None for entry in created):
+                    # Database does not return IDs from bulk_create
+                    created = lookup
+                memory_index.schedule_update(created)
@@ -18,24 +18,38 @@
 #
 
 import json
-from io import StringIO
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
 from django.core.management import call_command
 from django.core.management.base import CommandError
+from django.db import transaction
+from django.test.utils import override_settings
 from django.urls import reverse
 from jsonschema import validate
 from weblate_schemas import load_schema
 
 from weblate.lang.models import Language
+from weblate.memory.index import get_memory_index
 from weblate.memory.machine import WeblateMemory
-from weblate.memory.models import Memory
-from weblate.memory.tasks import handle_unit_translation_change, import_memory
+from weblate.memory.models import Memory, iter_json_array
+from weblate.memory.tasks import (
+    PendingMemoryUpdate,
+    handle_translation_changes,
+    handle_unit_translation_change,
+    import_memory,
+    schedule_memory_update,
+)
 from weblate.memory.utils import CATEGORY_FILE
 from weblate.trans.tests.test_views import FixtureTestCase
 from weblate.trans.tests.utils import get_test_file
 from weblate.utils.db import using_postgresql
 
 
+def get_json(response):
+    return json.loads(b"".join(response.streaming_content))
+
+
 def add_document():
     Memory.objects.create(
         source_language=Language.objects.get(code="en"),
@@ -85,14 +99,79 @@ class MemoryModelTest(FixtureTestCase):
         machine_translation.batch_translate([unit])
         self.assertEqual(unit.machinery, {"best": 100, "translation": "Ahoj"})
 
+    def test_machine_batch_exact(self):
+        add_document()
+        units = [self.get_unit(), self.get_unit()]
+        units[0].source = "Hello"
+        machine_translation = WeblateMemory({})
+        with patch.object(Memory.objects, "lookup", return_value=[]) as lookup:
+            machine_translation.batch_translate(units)
+        # Fuzzy lookup is done only for string without exact match
+        lookup.assert_called_once()
+        self.assertEqual(units[0].machinery, {"best": 100, "translation": "Ahoj"})
+        self.assertEqual(units[1].machinery, {"best": -1})
+
+    @override_settings(MEMORY_INDEX="weblate.memory.index.SQLiteMemoryIndex")
+    def test_machine_index(self):
+        call_command("rebuild_index")
+        self.test_machine()
+        # Index is updated incrementally
+        unit = self.get_unit()
+        with self.captureOnCommitCallbacks(execute=True):
+            handle_unit_translation_change(unit.id, self.user.id)
+        memory_index = get_memory_index()
+
+        def lookup(*scopes):
+            return memory_index.lookup(
+                unit.translation.component.source_language.pk,
+                unit.translation.language.pk,
+                scopes,
+                unit.source,
+                0.5,
+            )
+
+        entries = Memory.objects.filter(source=unit.source)
+        project_scope = f"project-{unit.translation.component.project_id}"
+        self.assertIn(entries.get(project__isnull=False).pk, lookup(project_scope))
+        # Entries of other owners are not shortlisted
+        self.assertEqual(lookup("file", "user-0"), [])
+        # Deleted entries are removed from the index
+        with self.captureOnCommitCallbacks(execute=True):
+            entries.delete()
+        self.assertEqual(lookup(project_scope, "shared"), [])
+
     def test_import_tmx_command(self):
-        call_command("import_memory", get_test_file("memory.tmx"))
+        output = StringIO()
+        call_command("import_memory", get_test_file("memory.tmx"), stdout=output)
+        self.assertEqual(Memory.objects.count(), 2)
+        self.assertIn("Imported 2 entries", output.getvalue())
+        # Existing entries are not counted
+        output = StringIO()
+        call_command("import_memory", get_test_file("memory.tmx"), stdout=output)
         self.assertEqual(Memory.objects.count(), 2)
+        self.assertIn("Imported 0 entries", output.getvalue())
 
     def test_import_tmx2_command(self):
         call_command("import_memory", get_test_file("memory2.tmx"))
         self.assertEqual(Memory.objects.count(), 1)
 
+    def test_import_progress(self):
+        output = StringIO()
+        call_command("import_memory", get_test_file("memory.tmx"), stdout=output)
+        self.assertIn("Processed 2 entries", output.getvalue())
+        self.assertIn("Imported 2 entries", output.getvalue())
+        # Existing entries are skipped
+        call_command("import_memory", get_test_file("memory.tmx"), stdout=output)
+        self.assertEqual(Memory.objects.count(), 2)
+
+    def test_iter_json_array(self):
+        data = [{"source": "Hello", "target": "Ahoj"}, 1234567, "Čau"]
+        content = json.dumps(data, ensure_ascii=False).encode()
+        for chunk_size in (1, 3, 1000):
+            self.assertEqual(list(iter_json_array(BytesIO(content), chunk_size)), data)
+        with self.assertRaises(ValueError):
+            list(iter_json_array(BytesIO(b"[1, 2"), 2))
+
     def test_import_map(self):
         call_command(
             "import_memory", get_test_file("memory.tmx"), language_map="en_US:en"
@@ -102,9 +181,12 @@ class MemoryModelTest(FixtureTestCase):
     def test_dump_command(self):
         add_document()
         output = StringIO()
-        call_command("dump_memory", stdout=output)
+        # Languages are fetched together with the entries
+        with self.assertNumQueries(1):
+            call_command("dump_memory", stdout=output)
         data = json.loads(output.getvalue())
         validate(data, load_schema("weblate-memory.schema.json"))
+        self.assertEqual(output.getvalue(), json.dumps(data, indent=2) + "\n")
         self.assertEqual(
             data,
             [
@@ -151,6 +233,34 @@ class MemoryModelTest(FixtureTestCase):
         handle_unit_translation_change(unit.id, self.user.id)
         self.assertEqual(Memory.objects.count(), 3)
 
+    def test_import_units_batch(self):
+        unit = self.get_unit()
+        handle_translation_changes([(unit.id, None), (unit.id, self.user.id)])
+        self.assertEqual(Memory.objects.count(), 3)
+        pending = PendingMemoryUpdate()
+        pending.add(unit.id, self.user.id)
+        pending.add(unit.id, self.user.id)
+        self.assertEqual(len(pending.changes), 1)
+        pending()
+        self.assertEqual(Memory.objects.count(), 3)
+        # Collected changes are reset for the next transaction
+        self.assertEqual(pending.changes, {})
+
+    def test_schedule_rollback(self):
+        unit = self.get_unit()
+        with patch(
+            "weblate.memory.tasks.handle_translation_changes.delay"
+        ) as delay, self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    schedule_memory_update(unit.id)
+                    raise ValueError("Rollback")
+            except ValueError:
+                pass
+            # Changes after the rolled back savepoint are still flushed
+            schedule_memory_update(unit.id, self.user.id)
+        delay.assert_called_once_with([(unit.id, self.user.id)])
+
 
 class MemoryViewTest(FixtureTestCase):
     def upload_file(self, name, prefix: str = "", **kwargs):
@@ -191,7 +301,7 @@ class MemoryViewTest(FixtureTestCase):
 
         # Test download
         response = self.client.get(reverse(f"{prefix}memory-download", **kwargs))
-        validate(response.json(), load_schema("weblate-memory.schema.json"))
+        validate(get_json(response), load_schema("weblate-memory.schema.json"))
 
         # Test download
         response = self.client.get(
@@ -206,7 +316,7 @@ class MemoryViewTest(FixtureTestCase):
         response = self.client.get(
             reverse(f"{prefix}memory-download", **kwargs), {"format": "json"}
         )
-        validate(response.json(), load_schema("weblate-memory.schema.json"))
+        validate(get_json(response), load_schema("weblate-memory.schema.json"))
 
         # Test wipe
         count = Memory.objects.count()
@@ -296,10 +406,10 @@ class MemoryViewTest(FixtureTestCase):
             reverse("manage-memory-download"),
             {"format": "json", "kind": "all"},
         )
-        validate(response.json(), load_schema("weblate-memory.schema.json"))
+        validate(get_json(response), load_schema("weblate-memory.schema.json"))
         # Download shared entries
         response = self.client.get(
             reverse("manage-memory-download"),
             {"format": "json", "kind": "shared"},
         )
-        validate(response.json(), load_schema("weblate-memory.schema.json"))
+        validate(get_json(response), load_schema("weblate-memory.schema.json"))
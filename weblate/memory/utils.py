@@ -17,6 +17,11 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import json
+import textwrap
+
+from django.utils.html import escape
+
 CATEGORY_FILE = 1
 CATEGORY_SHARED = 2
 CATEGORY_PRIVATE_OFFSET = 10000000
@@ -36,3 +41,68 @@ def parse_category(category):
     if CATEGORY_PRIVATE_OFFSET <= category < CATEGORY_USER_OFFSET:
         return False, False, category - CATEGORY_PRIVATE_OFFSET, None
     return False, False, None, category - CATEGORY_USER_OFFSET
+
+
+# Number of entries fetched from the database and emitted at once
+EXPORT_CHUNK_SIZE = 1000
+
+
+def iter_entries(entries):
+    """Iterate over entries in chunks including their languages."""
+    # Prefetching is not applied to iterator() on older Django versions
+    return entries.select_related("source_language", "target_language").iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+
+
+def iter_json(entries, indent=None):
+    """
+    Serialize memory entries to JSON incrementally.
+
+    The output matches json.dumps of list of the entries as_dict.
+    """
+    if indent is None:
+        separator, end = ", ", "]"
+    else:
+        separator, end = ",", "\n]"
+    buffer = ["["]
+    first = True
+    for entry in iter_entries(entries):
+        text = json.dumps(entry.as_dict(), indent=indent)
+        if indent is not None:
+            text = "\n" + textwrap.indent(text, " " * indent)
+        buffer.append(text if first else separator + text)
+        first = False
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer = []
+    buffer.append("]" if first else end)
+    yield "".join(buffer)
+
+
+def iter_tmx(entries):
+    """Serialize memory entries to TMX incrementally."""
+    iterator = iter_entries(entries)
+    entry = next(iterator, None)
+    language = escape(entry.source_language.code if entry else "en")
+    buffer = [
+        '<?xml version="1.0" encoding="utf-8"?>\n<tmx version="1.4">\n'
+        f'<header adminlang="{language}" srclang="{language}">\n</header>\n<body>\n'
+    ]
+    while entry is not None:
+        buffer.append(
+            "<tu>\n"
+            f'<tuv xml:lang="{escape(entry.source_language.code)}">\n'
+            f"<seg>{escape(entry.source)}</seg>\n"
+            "</tuv>\n"
+            f'<tuv xml:lang="{escape(entry.target_language.code)}">\n'
+            f"<seg>{escape(entry.target)}</seg>\n"
+            "</tuv>\n"
+            "</tu>\n"
+        )
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer = []
+        entry = next(iterator, None)
+    buffer.append("</body>\n</tmx>\n")
+    yield "".join(buffer)
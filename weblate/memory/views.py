@@ -20,17 +20,18 @@
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
 from django.db.models import Count
-from django.http import JsonResponse
-from django.shortcuts import render
+from django.http import StreamingHttpResponse
 from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
+from django.utils.translation import ngettext
 from django.views.generic.base import TemplateView
 
 from weblate.memory.forms import DeleteForm, UploadForm
 from weblate.memory.models import Memory, MemoryImportError
 from weblate.memory.tasks import import_memory
+from weblate.memory.utils import iter_json, iter_tmx
 from weblate.metrics.models import Metric
 from weblate.utils import messages
 from weblate.utils.views import ErrorFormView, get_project
@@ -135,11 +136,17 @@ class UploadView(MemoryFormView):
         if not check_perm(self.request.user, "memory.edit", self.objects):
             raise PermissionDenied()
         try:
-            Memory.objects.import_file(
+            result = Memory.objects.import_file(
                 self.request, form.cleaned_data["file"], **self.objects
             )
             messages.success(
-                self.request, _("File processed, the entries will appear shortly.")
+                self.request,
+                ngettext(
+                    "File processed, %d entry was imported.",
+                    "File processed, %d entries were imported.",
+                    result,
+                )
+                % result,
             )
         except MemoryImportError as error:
             messages.error(self.request, str(error))  # noqa: G200
@@ -210,23 +217,22 @@ class MemoryView(TemplateView):
 class DownloadView(MemoryView):
     def get(self, request, *args, **kwargs):
         fmt = request.GET.get("format", "json")
-        data = Memory.objects.filter_type(**self.objects).prefetch_lang()
+        data = Memory.objects.filter_type(**self.objects)
         if "origin" in request.GET:
             data = data.filter(origin=request.GET["origin"])
         if "from_file" in self.objects and "kind" in request.GET:
             if request.GET["kind"] == "shared":
-                data = Memory.objects.filter_type(use_shared=True).prefetch_lang()
+                data = Memory.objects.filter_type(use_shared=True)
             elif request.GET["kind"] == "all":
-                data = Memory.objects.prefetch_lang()
+                data = Memory.objects.all()
         if fmt == "tmx":
-            response = render(
-                request,
-                "memory/dump.tmx",
-                {"data": data},
-                content_type="application/x-tmx",
+            response = StreamingHttpResponse(
+                iter_tmx(data), content_type="application/x-tmx"
             )
         else:
             fmt = "json"
-            response = JsonResponse([item.as_dict() for item in data], safe=False)
+            response = StreamingHttpResponse(
+                iter_json(data), content_type="application/json"
+            )
         response["Content-Disposition"] = CD_TEMPLATE.format(fmt)
         return response
@@ -181,12 +181,10 @@
     this.isMachineryLoaded = true;
     this.machinery = new Machinery();
 
-    $("#js-translate")
-      .data("services")
-      .forEach((serviceName) => {
-        increaseLoading("machinery");
-        this.fetchMachinery(serviceName);
-      });
+    if ($("#js-translate").data("services").length) {
+      increaseLoading("machinery");
+      this.fetchMachinery();
+    }
 
     this.$editor.on("submit", "#memory-search", (e) => {
       var $form = $(e.currentTarget);
@@ -210,12 +208,16 @@
     });
   };
 
-  FullEditor.prototype.fetchMachinery = function (serviceName) {
+  FullEditor.prototype.fetchMachinery = function () {
     $.ajax({
       type: "POST",
-      url: $("#js-translate").attr("href").replace("__service__", serviceName),
+      url: $("#js-translate").data("all"),
       success: (data) => {
-        this.processMachineryResults(data);
+        data.responses.forEach((response) => {
+          increaseLoading("machinery");
+          this.processMachineryResults(response);
+        });
+        decreaseLoading("machinery");
       },
       error: (jqXHR, textStatus, errorThrown) => {
         this.processMachineryError(jqXHR, textStatus, errorThrown);
@@ -17,12 +17,19 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from copy import copy
 from typing import List, Optional
 
 from celery import current_task
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
 
+from weblate.checks.runner import update_checks
+from weblate.machinery.base import (
+    MachineTranslationError,
+    dispatch_services,
+    prepare_units,
+)
 from weblate.machinery.models import MACHINERY
 from weblate.trans.models import Change, Component, Suggestion, Unit
 from weblate.utils.state import STATE_FUZZY, STATE_TRANSLATED
@@ -43,6 +50,8 @@ class AutoTranslate:
         self.filter_type = filter_type
         self.mode = mode
         self.updated = 0
+        # Units with checks to update once translated
+        self.translated_units = []
         self.progress_steps = 0
         self.target_state = STATE_FUZZY if mode == "fuzzy" else STATE_TRANSLATED
         self.component_wide = component_wide
@@ -69,11 +78,20 @@ class AutoTranslate:
         else:
             unit.is_batch_update = True
             unit.translate(
-                self.user, target, state, Change.ACTION_AUTO, propagate=False
+                self.user,
+                target,
+                state,
+                Change.ACTION_AUTO,
+                propagate=False,
+                run_checks=False,
             )
+            self.translated_units.append(unit)
         self.updated += 1
 
     def post_process(self):
+        if self.translated_units:
+            update_checks(self.translated_units)
+            self.translated_units = []
         if self.updated > 0:
             if not self.component_wide:
                 self.translation.component.update_source_checks()
@@ -146,8 +164,13 @@ class AutoTranslate:
         self.post_process()
 
     def fetch_mt(self, engines, threshold):
-        """Get the translations."""
-        units = self.get_units()
+        """
+        Get the translations.
+
+        Services using the database are queried first, remaining ones are then
+        queried in parallel.
+        """
+        units = list(self.get_units().select_related("source_unit"))
         num_units = len(units)
 
         machinery_settings = self.translation.component.project.get_machinery_settings()
@@ -163,17 +186,64 @@ class AutoTranslate:
         )
 
         self.progress_steps = 2 * (len(engines) + num_units)
+        prepare_units(units)
 
-        for pos, translation_service in enumerate(engines):
-            batch_size = translation_service.batch_size
+        processed = {}
 
+        def translate_units(translation_service, service_units):
+            batch_size = translation_service.batch_size
             for batch_start in range(0, num_units, batch_size):
                 translation_service.batch_translate(
-                    units[batch_start : batch_start + batch_size],
+                    service_units[batch_start : batch_start + batch_size],
                     self.user,
                     threshold=threshold,
                 )
-                self.set_progress(pos * num_units + batch_start)
+                processed[translation_service] = min(
+                    batch_start + batch_size, num_units
+                )
+            return service_units
+
+        def update_progress():
+            self.set_progress(min(sum(processed.values()), len(engines) * num_units))
+
+        for translation_service in engines:
+            if not translation_service.concurrent:
+                translate_units(translation_service, units)
+                update_progress()
+
+        # Each service works on own copies of the units to avoid races
+        baseline = [unit.machinery for unit in units]
+
+        def translate_copies(translation_service):
+            service_units = []
+            for unit in units:
+                service_unit = copy(unit)
+                service_unit.machinery = dict(unit.machinery)
+                service_units.append(service_unit)
+            try:
+                translate_units(translation_service, service_units)
+            except MachineTranslationError as error:
+                # Keep results fetched before the failure
+                self.translation.log_error(
+                    "machinery %s failed: %s", translation_service.name, error
+                )
+            return service_units
+
+        results = dispatch_services(
+            [engine for engine in engines if engine.concurrent],
+            translate_copies,
+            progress=update_progress,
+        )
+        for translation_service, service_units, error in results:
+            if error is not None:
+                self.translation.log_error(
+                    "machinery %s failed: %s", translation_service.name, error
+                )
+                continue
+            for unit, service_unit, original in zip(units, service_units, baseline):
+                result = service_unit.machinery
+                if result != original and result["best"] >= unit.machinery["best"]:
+                    unit.machinery = result
 
         return {
             unit.id: unit.machinery["translation"]
@@ -38,6 +38,7 @@ from weblate.checks.models import Check
 from weblate.lang.models import Language, Plural
 from weblate.memory.models import Memory
 from weblate.screenshots.models import Screenshot
+from weblate.trans.fulltext import get_fulltext
 from weblate.trans.models import (
     Comment,
     Component,
@@ -445,6 +446,11 @@ class ProjectBackup:
         ]
         units = Unit.objects.bulk_create(units)
 
+        # Update full-text index
+        fulltext = get_fulltext()
+        if fulltext is not None:
+            fulltext.schedule_update(chain(source_units, units))
+
         # Apply metadata
         for unit in chain(source_units, units):
             # Labels
@@ -0,0 +1,249 @@
+#
+# Copyright © 2012–2022 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Optional local full-text index for strings search."""
+
+import threading
+from typing import Iterable, Optional, Set, Tuple
+
+from django.db import transaction
+from django.utils.functional import cached_property
+
+from weblate.utils.db import is_on_commit_registered
+from weblate.utils.errors import report_error
+from weblate.utils.localindex import LocalIndex, get_index
+
+FULLTEXT_FIELDS = ("source", "target", "context", "note", "location")
+# Lookups of project, component and translation IDs from a unit
+SCOPE_FIELDS = (
+    "translation__component__project_id",
+    "translation__component_id",
+    "translation_id",
+)
+
+
+class PendingFullTextUpdate(threading.local):
+    """Full-text index changes collected until the transaction is committed."""
+
+    def __init__(self, index):
+        super().__init__()
+        self.index = index
+        self.units = set()
+        self.translations = set()
+
+    def __call__(self):
+        units = self.units
+        translations = self.translations
+        self.units = set()
+        self.translations = set()
+        try:
+            if units:
+                self.index.refresh_units(units)
+            for translation_id in translations:
+                self.index.delete_translation(translation_id)
+        except Exception:
+            # The database is already committed at this point
+            report_error(cause="Full-text index update failed")
+
+
+class FullTextIndex:
+    """
+    Full-text index interface.
+
+    The index is used to find matching strings in search, queries it can not
+    handle fall back to the database.
+    """
+
+    fields = FULLTEXT_FIELDS
+    scope_fields = SCOPE_FIELDS
+
+    # Maximal number of matches, bigger results are left to the database
+    max_results = 10000
+
+    # Number of units updated at once
+    batch_size = 1000
+
+    @cached_property
+    def pending(self):
+        return PendingFullTextUpdate(self)
+
+    def schedule_changes(
+        self, ids: Iterable[int] = (), translation_id: Optional[int] = None
+    ):
+        """
+        Schedule index update once the transaction is committed.
+
+        All units changed in a transaction are updated at once using their
+        committed state.
+        """
+        pending = self.pending
+        registered = is_on_commit_registered(pending)
+        if not registered:
+            # Discard changes from a rolled back transaction
+            pending.units = set()
+            pending.translations = set()
+        pending.units.update(ids)
+        if translation_id is not None:
+            pending.translations.add(translation_id)
+        if not registered:
+            transaction.on_commit(pending)
+
+    def schedule_update(self, units: Iterable):
+        """Update units in the index once the transaction is committed."""
+        self.schedule_changes(unit.pk for unit in units)
+
+    def schedule_delete(self, ids: Iterable[int]):
+        """Delete units from the index once the transaction is committed."""
+        self.schedule_changes(ids)
+
+    def schedule_delete_translation(self, translation_id: int):
+        """Delete units of a translation once the transaction is committed."""
+        self.schedule_changes(translation_id=translation_id)
+
+    def refresh_units(self, ids: Iterable[int]):
+        """Update units from the database, units no longer existing are deleted."""
+        from weblate.trans.models import Unit
+
+        ids = list(ids)
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start : start + self.batch_size]
+            values = list(
+                Unit.objects.filter(pk__in=batch).values_list(
+                    "pk", *self.fields, *self.scope_fields
+                )
+            )
+            if values:
+                self.update_units(values)
+            deleted = set(batch) - {item[0] for item in values}
+            if deleted:
+                self.delete_units(deleted)
+
+    def update_units(self, values: Iterable[Tuple]):
+        """Update units in the index, values are ID, fields and scope fields."""
+        raise NotImplementedError()
+
+    def delete_units(self, ids: Iterable[int]):
+        raise NotImplementedError()
+
+    def delete_translation(self, translation_id: int):
+        """Delete all units of a translation from the index."""
+        raise NotImplementedError()
+
+    def clear(self):
+        raise NotImplementedError()
+
+    def set_ready(self, ready: bool = True):
+        """Mark index as complete and usable for searching."""
+        raise NotImplementedError()
+
+    def search(
+        self, fields: Iterable[str], text: str, **scope: int
+    ) -> Optional[Set[int]]:
+        """
+        Return IDs of units containing the text in any of the fields.
+
+        The search can be limited to units of a project, component or
+        translation by passing project_id, component_id or translation_id.
+        None is returned when the index can not handle the query.
+        """
+        raise NotImplementedError()
+
+
+class SQLiteFullTextIndex(LocalIndex, FullTextIndex):
+    """
+    Inverted index stored on disk using SQLite FTS5 trigram tokenizer.
+
+    The projects, components and translations of the units are stored in a
+    separate table to allow limiting the search to them.
+    """
+
+    name = "fulltext"
+    # Unit ID is stored as rowid
+    schema = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS units USING fts5("
+        f"{', '.join(FULLTEXT_FIELDS)}, tokenize='trigram')",
+        "CREATE TABLE IF NOT EXISTS scopes (unit_id INTEGER PRIMARY KEY, "
+        "project_id INTEGER, component_id INTEGER, translation_id INTEGER)",
+        "CREATE INDEX IF NOT EXISTS scopes_project ON scopes (project_id)",
+        "CREATE INDEX IF NOT EXISTS scopes_component ON scopes (component_id)",
+        "CREATE INDEX IF NOT EXISTS scopes_translation ON scopes (translation_id)",
+    )
+    tables = ("units", "scopes")
+    scopes = ("project_id", "component_id", "translation_id")
+
+    def update_units(self, values: Iterable[Tuple]):
+        values = list(values)
+        split = len(self.fields) + 1
+        placeholders = ", ".join("?" for _value in range(split))
+        with self.connection as connection:
+            connection.executemany(
+                f"INSERT OR REPLACE INTO units(rowid, {', '.join(self.fields)}) "
+                f"VALUES ({placeholders})",
+                [item[:split] for item in values],
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO scopes VALUES (?, ?, ?, ?)",
+                [(item[0], *item[split:]) for item in values],
+            )
+
+    def delete_units(self, ids: Iterable[int]):
+        ids = [(pk,) for pk in ids]
+        with self.connection as connection:
+            connection.executemany("DELETE FROM units WHERE rowid = ?", ids)
+            connection.executemany("DELETE FROM scopes WHERE unit_id = ?", ids)
+
+    def delete_translation(self, translation_id: int):
+        with self.connection as connection:
+            connection.execute(
+                "DELETE FROM units WHERE rowid IN "
+                "(SELECT unit_id FROM scopes WHERE translation_id = ?)",
+                (translation_id,),
+            )
+            connection.execute(
+                "DELETE FROM scopes WHERE translation_id = ?", (translation_id,)
+            )
+
+    def search(
+        self, fields: Iterable[str], text: str, **scope: int
+    ) -> Optional[Set[int]]:
+        # Trigram tokenizer can not match shorter strings
+        if len(text) < 3 or not self.is_ready:
+            return None
+        phrase = text.replace('"', '""')
+        query = "SELECT units.rowid FROM units"
+        conditions = ["units MATCH ?"]
+        params = [f'{{{" ".join(fields)}}} : "{phrase}"']
+        if scope:
+            query += " JOIN scopes ON scopes.unit_id = units.rowid"
+            for key, value in scope.items():
+                if key not in self.scopes:
+                    raise ValueError(f"Unsupported scope: {key}")
+                conditions.append(f"scopes.{key} = ?")
+                params.append(value)
+        result = self.connection.execute(
+            f"{query} WHERE {' AND '.join(conditions)} LIMIT ?",  # nosec
+            (*params, self.max_results + 1),
+        ).fetchall()
+        if len(result) > self.max_results:
+            return None
+        return {row[0] for row in result}
+
+
+def get_fulltext() -> Optional[FullTextIndex]:
+    """Return configured full-text index or None if not configured."""
+    return get_index("FULLTEXT_INDEX")
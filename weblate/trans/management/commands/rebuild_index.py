@@ -0,0 +1,76 @@
+#
+# Copyright © 2012–2022 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from django.core.management.base import CommandError
+
+from weblate.memory.index import get_memory_index
+from weblate.memory.models import Memory
+from weblate.trans.fulltext import get_fulltext
+from weblate.trans.models import Unit
+from weblate.utils.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "rebuilds local indexes for strings search and translation memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="number of items indexed at once",
+        )
+
+    def rebuild(self, index, queryset, update, batch_size: int):
+        # Lookups fall back to the database while rebuilding
+        index.clear()
+
+        batch = []
+        for values in queryset.iterator(chunk_size=batch_size):
+            batch.append(values)
+            if len(batch) >= batch_size:
+                update(batch)
+                batch = []
+        if batch:
+            update(batch)
+
+        index.set_ready()
+
+    def handle(self, *args, **options):
+        fulltext = get_fulltext()
+        memory_index = get_memory_index()
+        if fulltext is None and memory_index is None:
+            raise CommandError("No local index is configured.")
+
+        if fulltext is not None:
+            self.rebuild(
+                fulltext,
+                Unit.objects.values_list(
+                    "pk", *fulltext.fields, *fulltext.scope_fields
+                ),
+                fulltext.update_units,
+                options["batch_size"],
+            )
+        if memory_index is not None:
+            self.rebuild(
+                memory_index,
+                Memory.objects.values_list("pk", *memory_index.fields),
+                memory_index.update_entries,
+                options["batch_size"],
+            )
@@ -21,6 +21,7 @@ import os
 from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
+from weblate.trans.fulltext import get_fulltext
 from weblate.trans.models._conf import WeblateConf
 from weblate.trans.models.agreement import ContributorAgreement
 from weblate.trans.models.alert import Alert
@@ -86,6 +87,14 @@ def component_post_delete(sender, instance, **kwargs):
         delete_object_dir(instance)
 
 
+@receiver(post_delete, sender=Translation)
+def translation_post_delete(sender, instance, **kwargs):
+    """Handler to remove translation strings from the full-text index."""
+    fulltext = get_fulltext()
+    if fulltext is not None:
+        fulltext.schedule_delete_translation(instance.pk)
+
+
 @receiver(m2m_changed, sender=Unit.labels.through)
 @disable_for_loaddata
 def change_labels(sender, instance, action, pk_set, **kwargs):
@@ -163,6 +172,11 @@ def post_delete_linked(sender, instance, **kwargs):
 @receiver(post_save, sender=Comment)
 @receiver(post_save, sender=Suggestion)
 @disable_for_loaddata
-def stats_invalidate(sender, instance, **kwargs):
+def stats_invalidate(sender, instance, created: bool = False, **kwargs):
     """Invalidate stats on new comment or suggestion."""
-    instance.unit.invalidate_related_cache()
+    added = None
+    if created and sender is Suggestion:
+        added = "suggestion_count"
+    elif created and not instance.resolved:
+        added = "comment_count"
+    instance.unit.invalidate_related_cache(added=added)
@@ -45,6 +45,16 @@ class WeblateConf(AppConf):
     # Default number of elements to display when pagination is active
     DEFAULT_PAGE_LIMIT = 100
 
+    # Number of search results stored in the session, larger results are
+    # navigated using keyset queries
+    SEARCH_KEYSET_LIMIT = 1000
+
+    # Local full-text index used for searching
+    FULLTEXT_INDEX = None
+
+    # Local index used for translation memory lookups
+    MEMORY_INDEX = None
+
     # Number of nearby messages to show in each direction
     NEARBY_MESSAGES = 15
 
@@ -177,6 +187,9 @@ Current translation status:
     REPOSITORY_ALERT_THRESHOLD = 25
     BACKGROUND_TASKS = "monthly"
 
+    # Delay for merging component stats updates
+    STATS_UPDATE_DELAY = 30
+
     SINGLE_PROJECT = False
     LICENSE_EXTRA = []
     LICENSE_FILTER = None
@@ -45,6 +45,7 @@ from weblate_language_data.ambiguous import AMBIGUOUS
 
 from weblate.checks.flags import Flags
 from weblate.checks.models import CHECKS
+from weblate.checks.runner import update_checks
 from weblate.formats.models import FILE_FORMATS
 from weblate.glossary.models import get_glossary_sources
 from weblate.lang.models import Language, get_default_lang
@@ -1851,7 +1852,7 @@ class Component(models.Model, URLMixin, PathMixin, CacheKeyMixin):
         self.log_info("running source checks for %d strings", len(self.updated_sources))
         for unit in self.updated_sources.values():
             unit.is_batch_update = True
-            unit.run_checks()
+        update_checks(self.updated_sources.values())
         self.updated_sources = {}
 
     @cached_property
@@ -2150,12 +2151,12 @@ class Component(models.Model, URLMixin, PathMixin, CacheKeyMixin):
         self.batched_checks = set()
 
     def _invalidate_triger(self):
-        from weblate.trans.tasks import update_component_stats
+        from weblate.trans.tasks import schedule_update_component_stats
 
         self._invalidate_scheduled = False
         self.log_info("updating stats caches")
         self.stats.invalidate(childs=True)
-        update_component_stats.delay(self.pk)
+        schedule_update_component_stats(self.pk)
         self.invalidate_glossary_cache()
 
     def invalidate_cache(self):
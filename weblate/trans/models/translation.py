@@ -34,6 +34,7 @@ from django.utils.translation import gettext as _
 
 from weblate.checks.flags import Flags
 from weblate.checks.models import CHECKS
+from weblate.checks.runner import update_checks
 from weblate.formats.auto import try_load
 from weblate.formats.base import UnitNotFound
 from weblate.formats.helpers import BytesIOMode
@@ -163,7 +164,10 @@ class Translation(models.Model, URLMixin, LoggerMixin, CacheKeyMixin):
         self.was_new = 0
         self.reason = ""
         self._invalidate_scheduled = False
+        self._unit_stats_scheduled = False
+        self._unit_stats_pending = {}
         self.update_changes = []
+        self.pending_checks = []
 
     @cached_property
     def full_slug(self):
@@ -470,6 +474,7 @@ class Translation(models.Model, URLMixin, LoggerMixin, CacheKeyMixin):
         except FileParseError as error:
             report_error(cause="Failed to parse file on update")
             self.log_warning("skipping update due to parse error: %s", error)
+            self.update_pending_checks()
             self.store_update_changes()
             return
 
@@ -480,6 +485,9 @@ class Translation(models.Model, URLMixin, LoggerMixin, CacheKeyMixin):
             self.unit_set.filter(id_hash__in=stale).delete()
             self.component.needs_cleanup = True
 
+        # Update checks for changed strings
+        self.update_pending_checks()
+
         # We should also do cleanup on source strings tracking objects
 
         # Update revision and stats
@@ -502,6 +510,12 @@ class Translation(models.Model, URLMixin, LoggerMixin, CacheKeyMixin):
         if self.is_source:
             self.component.preload_sources(updated)
 
+    def update_pending_checks(self):
+        """Update checks for strings changed during the update in bulk."""
+        if self.pending_checks:
+            update_checks(self.pending_checks)
+            self.pending_checks = []
+
     def store_update_changes(self):
         # Save change
         Change.objects.bulk_create(self.update_changes, batch_size=500)
@@ -884,6 +898,7 @@ class Translation(models.Model, URLMixin, LoggerMixin, CacheKeyMixin):
         )
 
         unit_set = self.unit_set.all()
+        updated = set()
 
         for set_fuzzy, unit2 in store2.iterate_merge(fuzzy):
             try:
@@ -922,7 +937,13 @@ class Translation(models.Model, URLMixin, LoggerMixin, CacheKeyMixin):
                 state,
                 change_action=Change.ACTION_UPLOAD,
                 propagate=propagate,
+                run_checks=False,
             )
+            updated.add(unit.pk)
+
+        # Update checks for all uploaded strings at once
+        if updated:
+            update_checks(unit_set.filter(pk__in=updated).prefetch_checks())
 
         if accepted > 0:
             self.invalidate_cache()
@@ -1243,6 +1264,29 @@ class Translation(models.Model, URLMixin, LoggerMixin, CacheKeyMixin):
         self._invalidate_scheduled = True
         transaction.on_commit(self._invalidate_triger)
 
+    def _update_unit_stats_triger(self):
+        self._unit_stats_scheduled = False
+        pending, self._unit_stats_pending = self._unit_stats_pending, {}
+        self.stats.update_units(pending)
+        self.component.invalidate_glossary_cache()
+
+    def invalidate_unit_cache(self, pk: int, values):
+        """Update cached stats after a single unit change.
+
+        The values are unit stats values prior to the change as returned by
+        TranslationStats.get_unit_values. Changes done within a transaction
+        are applied at once when it is committed.
+        """
+        if values is None:
+            self.invalidate_cache()
+            return
+        # Keep values prior to the first change in the transaction
+        self._unit_stats_pending.setdefault(pk, values)
+        if self._unit_stats_scheduled:
+            return
+        self._unit_stats_scheduled = True
+        transaction.on_commit(self._update_unit_stats_triger)
+
     @property
     def keys_cache_key(self):
         return f"translation-keys-{self.pk}"
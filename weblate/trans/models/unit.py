@@ -17,8 +17,9 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import json
 import re
-from typing import Generator, List, Optional, Tuple
+from typing import Generator, List, Optional, Set, Tuple
 
 from django.conf import settings
 from django.core.cache import cache
@@ -33,8 +34,9 @@ from pyparsing import ParseException
 from weblate.checks.flags import Flags
 from weblate.checks.models import CHECKS, Check
 from weblate.formats.helpers import CONTROLCHARS
-from weblate.memory.tasks import handle_unit_translation_change
+from weblate.memory.tasks import schedule_memory_update
 from weblate.trans.autofixes import fix_target
+from weblate.trans.fulltext import get_fulltext
 from weblate.trans.mixins import LoggerMixin
 from weblate.trans.models.change import Change
 from weblate.trans.models.comment import Comment
@@ -51,7 +53,7 @@ from weblate.trans.validators import validate_check_flags
 from weblate.utils import messages
 from weblate.utils.db import using_postgresql
 from weblate.utils.errors import report_error
-from weblate.utils.hash import calculate_hash, hash_to_checksum
+from weblate.utils.hash import calculate_checksum, calculate_hash, hash_to_checksum
 from weblate.utils.search import parse_query
 from weblate.utils.state import (
     STATE_APPROVED,
@@ -78,8 +80,40 @@ SIMPLE_FILTERS = {
 
 NEWLINES = re.compile(r"\r\n|\r|\n")
 
+# Expiry of cached results of the content based checks
+CHECK_RESULTS_TIMEOUT = 30 * 86400
+
+
+# Non-nullable fields usable for keyset pagination
+KEYSET_FIELDS = {
+    "id",
+    "priority",
+    "position",
+    "context",
+    "num_words",
+    "timestamp",
+    "source",
+    "target",
+}
+
+
+def schedule_fulltext_delete(units):
+    """Remove units and their translations from the full-text index."""
+    fulltext = get_fulltext()
+    if fulltext is not None:
+        # Translations are deleted together with the source units
+        fulltext.schedule_delete(
+            Unit.objects.filter(Q(pk__in=units) | Q(source_unit__in=units)).values_list(
+                "pk", flat=True
+            )
+        )
+
 
 class UnitQuerySet(models.QuerySet):
+    def delete(self):
+        schedule_fulltext_delete(self)
+        return super().delete()
+
     def filter_type(self, rqtype):
         """Basic filtering based on unit state or failed checks."""
         if rqtype in SIMPLE_FILTERS:
@@ -124,6 +158,10 @@ class UnitQuerySet(models.QuerySet):
             ),
         )
 
+    def prefetch_checks(self):
+        """Prefetch needed for updating checks in bulk."""
+        return self.prefetch().prefetch_related("source_unit", "check_set")
+
     def prefetch_bulk(self):
         """Prefetch useful for bulk editing."""
         return self.prefetch_full().prefetch_related("defined_variants")
@@ -274,6 +312,45 @@ class UnitQuerySet(models.QuerySet):
         """Return list of units ordered by ID."""
         return sorted(self.filter(id__in=ids), key=lambda unit: ids.index(unit.id))
 
+    def get_keyset_ordering(self):
+        """
+        Return ordering usable for keyset pagination.
+
+        The ordering is made unique by adding ID. None is returned when ordering
+        uses annotations or nullable fields where keyset pagination does not
+        work.
+        """
+        ordering = list(self.query.order_by)
+        fields = {field.lstrip("-") for field in ordering}
+        if not fields.issubset(KEYSET_FIELDS):
+            return None
+        if "id" not in fields:
+            ordering.append("id")
+        return ordering
+
+    def keyset_filter(self, ordering, unit_id: int, previous: bool = False):
+        """Filter units following or preceding given unit in the ordering."""
+        fields = [field.lstrip("-") for field in ordering]
+        values = Unit.objects.filter(pk=unit_id).values(*fields).get()
+        query = Q()
+        exact = {}
+        for field, order in zip(fields, ordering):
+            lookup = "lt" if order.startswith("-") != previous else "gt"
+            query |= Q(**exact, **{f"{field}__{lookup}": values[field]})
+            exact[field] = values[field]
+        return self.filter(query)
+
+    def get_keyset_neighbour(self, ordering, unit_id: int, previous: bool = False):
+        """Return ID of unit following or preceding given unit."""
+        result = self.keyset_filter(ordering, unit_id, previous)
+        if previous:
+            result = result.reverse()
+        return result.values_list("id", flat=True).first()
+
+    def get_keyset_position(self, ordering, unit_id: int):
+        """Return position of unit within the ordering."""
+        return self.keyset_filter(ordering, unit_id, previous=True).count() + 1
+
     def select_for_update(self):
         return super().select_for_update(no_key=using_postgresql())
 
@@ -361,6 +438,10 @@ class Unit(models.Model, LoggerMixin):
             return f"[{self.context}] {self.source}"
         return self.source
 
+    def delete(self, using=None, keep_parents=False):
+        schedule_fulltext_delete([self.pk])
+        return super().delete(using=using, keep_parents=keep_parents)
+
     def save(
         self,
         same_content: bool = False,
@@ -387,6 +468,14 @@ class Unit(models.Model, LoggerMixin):
             using=using,
             update_fields=update_fields,
         )
+
+        # Update full-text index
+        fulltext = get_fulltext()
+        if fulltext is not None and (
+            update_fields is None or not set(fulltext.fields).isdisjoint(update_fields)
+        ):
+            fulltext.schedule_update([self])
+
         if only_save:
             return
 
@@ -427,6 +516,7 @@ class Unit(models.Model, LoggerMixin):
         """Constructor to initialize some cache properties."""
         super().__init__(*args, **kwargs)
         self.is_batch_update = False
+        self.is_stats_update = False
         self.source_updated = False
         self.check_cache = {}
         self.trigger_update_variants = True
@@ -773,8 +863,11 @@ class Unit(models.Model, LoggerMixin):
         self.save(
             force_insert=created,
             same_content=same_source and same_target,
-            run_checks=not same_source or not same_target or not same_state,
+            run_checks=False,
         )
+        # Checks are updated in bulk once the translation is processed
+        if not same_source or not same_target or not same_state:
+            translation.pending_checks.append(self)
         # Track updated sources for source checks
         if translation.is_template:
             component.updated_sources[self.id] = self
@@ -806,7 +899,7 @@ class Unit(models.Model, LoggerMixin):
             and (not translation.is_source or component.intermediate)
             and (created or not same_source or not same_target)
         ):
-            transaction.on_commit(lambda: handle_unit_translation_change.delay(self.id))
+            schedule_memory_update(self.id)
 
     def update_state(self):
         """
@@ -991,6 +1084,16 @@ class Unit(models.Model, LoggerMixin):
             self.state = STATE_TRANSLATED
         self.original_state = self.state
 
+        # Bulk operations invalidate stats once they are completed
+        self.is_stats_update = change_action not in (
+            Change.ACTION_UPLOAD,
+            Change.ACTION_AUTO,
+            Change.ACTION_BULK_EDIT,
+        )
+        if self.is_stats_update:
+            # The database still holds previous state of the unit here
+            stats_values = self.translation.stats.get_unit_values(self.pk)
+
         # Save updated unit to database, skip running checks
         self.save(
             update_fields=update_fields,
@@ -1001,13 +1104,11 @@ class Unit(models.Model, LoggerMixin):
         # Generate Change object for this change
         change = self.generate_change(user or author, author, change_action)
 
-        if change.action not in (
-            Change.ACTION_UPLOAD,
-            Change.ACTION_AUTO,
-            Change.ACTION_BULK_EDIT,
-        ):
+        if self.is_stats_update:
+            self.is_stats_update = False
+
             # Update translation stats
-            self.translation.invalidate_cache()
+            self.translation.invalidate_unit_cache(self.pk, stats_values)
 
             # Update user stats
             change.author.profile.increase_count("translated")
@@ -1161,15 +1262,39 @@ class Unit(models.Model, LoggerMixin):
             if not comment.resolved and comment.unit_id == self.id
         ]
 
-    def run_checks(self, propagate: Optional[bool] = None):  # noqa: C901
-        """Update checks for this unit."""
-        needs_propagate = bool(propagate)
+    def get_checks_cache_key(self, src: List[str], tgt: List[str]) -> str:
+        """
+        Return content based cache key for results of the cacheable checks.
+
+        The key covers everything these checks depend on, so units with the
+        same content share the results and unchanged units can skip the checks.
+        """
+        translation = self.translation
+        component = translation.component
+        checksum = calculate_checksum(
+            json.dumps(
+                [
+                    CHECKS.cache_version,
+                    translation.language.code,
+                    translation.plural.formula,
+                    component.source_language.code,
+                    component.file_format,
+                    self.state,
+                    self.all_flags.format(),
+                    src,
+                    tgt,
+                ]
+            )
+        )
+        return f"check-results-{checksum}"
 
+    def evaluate_checks(self) -> Set[str]:
+        """Return names of failing checks for this unit without storing them."""
         src = self.get_source_plurals()
-        tgt = self.get_target_plurals()
 
-        old_checks = self.all_checks_names
-        create = []
+        # Results of the content based checks are cached
+        cache_key = None
+        cached = None
 
         if self.translation.component.is_glossary:
             # We might eventually run some checks on glossary
@@ -1181,26 +1306,53 @@ class Unit(models.Model, LoggerMixin):
             meth = "check_source"
             args = src, self
         else:
+            tgt = self.get_target_plurals()
             if self.readonly:
                 checks = {}
             else:
                 checks = CHECKS.target
+                cache_key = self.get_checks_cache_key(src, tgt)
+                cached = cache.get(cache_key)
             meth = "check_target"
             args = src, tgt, self
+        failing = set()
 
         # Run all checks
         for check, check_obj in checks.items():
             # Does the check fire?
-            if getattr(check_obj, meth)(*args):
-                if check in old_checks:
-                    # We already have this check
-                    old_checks.remove(check)
-                    # Propagation is handled in
-                    # weblate.checks.models.remove_complimentary_checks
-                else:
-                    # Create new check
-                    create.append(Check(unit=self, dismissed=False, name=check))
-                    needs_propagate |= check_obj.propagates
+            if cached is not None and check_obj.cacheable:
+                fires = check in cached
+            else:
+                fires = getattr(check_obj, meth)(*args)
+            if fires:
+                failing.add(check)
+
+        if cache_key is not None and cached is None:
+            cache.set(
+                cache_key,
+                [check for check in failing if checks[check].cacheable],
+                CHECK_RESULTS_TIMEOUT,
+            )
+
+        return failing
+
+    def run_checks(self, propagate: Optional[bool] = None):  # noqa: C901
+        """Update checks for this unit."""
+        needs_propagate = bool(propagate)
+
+        old_checks = self.all_checks_names
+        create = []
+
+        for check in self.evaluate_checks():
+            if check in old_checks:
+                # We already have this check
+                old_checks.remove(check)
+                # Propagation is handled in
+                # weblate.checks.models.remove_complimentary_checks
+            else:
+                # Create new check
+                create.append(Check(unit=self, dismissed=False, name=check))
+                needs_propagate |= CHECKS[check].propagates
 
         if create:
             Check.objects.bulk_create(create, batch_size=500, ignore_conflicts=True)
@@ -1252,7 +1404,12 @@ class Unit(models.Model, LoggerMixin):
         # This is always preset as it is used in top of this method
         self.clear_checks_cache()
 
-        if not self.is_batch_update and (create or old_checks):
+        # Stats update is handled by save_backend when saving the unit there
+        if (
+            not self.is_batch_update
+            and not self.is_stats_update
+            and (create or old_checks)
+        ):
             self.translation.invalidate_cache()
 
     def nearby(self, count):
@@ -1307,11 +1464,15 @@ class Unit(models.Model, LoggerMixin):
         author=None,
         request=None,
         add_alternative: bool = False,
+        run_checks: bool = True,
     ):
         """
         Store new translation of a unit.
 
         Propagation is currently disabled on import.
+
+        With run_checks disabled, the caller is responsible for updating checks,
+        typically using weblate.checks.runner.update_checks.
         """
         component = self.translation.component
 
@@ -1352,6 +1513,7 @@ class Unit(models.Model, LoggerMixin):
             change_action=change_action,
             propagate=propagate,
             author=author,
+            run_checks=run_checks,
             request=request,
         )
 
@@ -1359,7 +1521,8 @@ class Unit(models.Model, LoggerMixin):
         if (
             self.state >= STATE_TRANSLATED
             and component.enforced_checks
-            and self.all_checks_names & set(component.enforced_checks)
+            and (self.all_checks_names if run_checks else self.evaluate_checks())
+            & set(component.enforced_checks)
         ):
             self.state = self.original_state = STATE_FUZZY
             self.save(run_checks=False, same_content=True, update_fields=["state"])
@@ -1371,9 +1534,7 @@ class Unit(models.Model, LoggerMixin):
             and self.state >= STATE_TRANSLATED
             and not component.is_glossary
         ):
-            transaction.on_commit(
-                lambda: handle_unit_translation_change.delay(self.id, user.id)
-            )
+            schedule_memory_update(self.id, user.id)
 
         if change_action == Change.ACTION_AUTO:
             label = component.project.label_set.get_or_create(
@@ -1600,9 +1761,16 @@ class Unit(models.Model, LoggerMixin):
                 )
         return result
 
-    def invalidate_related_cache(self):
+    def invalidate_related_cache(self, added: Optional[str] = None):
         # Invalidate stats counts
-        self.translation.invalidate_cache()
+        if added is None:
+            self.translation.invalidate_cache()
+        else:
+            # Stats values prior to adding the object
+            values = self.translation.stats.get_unit_values(self.pk)
+            if values is not None:
+                values[added] -= 1
+            self.translation.invalidate_unit_cache(self.pk, values)
         # Invalidate unit cached properties
         for key in ["all_comments", "suggestions"]:
             if key in self.__dict__:
@@ -25,6 +25,7 @@ from typing import List, Optional
 from celery import current_task
 from celery.schedules import crontab
 from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
 from django.db.models import Count, F
 from django.utils import timezone
@@ -118,7 +119,12 @@ def perform_push(pk, *args, **kwargs):
 
 @app.task(trail=False)
 def update_component_stats(pk):
-    component = Component.objects.get(pk=pk)
+    # Allow scheduling new update from now on
+    cache.delete(f"stats-update-pending-{pk}")
+    try:
+        component = Component.objects.get(pk=pk)
+    except Component.DoesNotExist:
+        return
     component.stats.ensure_basic()
     project_stats = component.project.stats
     # Update language stats
@@ -129,6 +135,30 @@ def update_component_stats(pk):
         stats.ensure_basic()
 
 
+def schedule_update_component_stats(pk: int):
+    """Schedule update of component stats.
+
+    All requests made before the update is started are merged into it.
+    """
+    delay = settings.STATS_UPDATE_DELAY
+    if cache.add(f"stats-update-pending-{pk}", True, delay + 300):
+        counter = "stats-update-scheduled"
+        update_component_stats.apply_async(args=(pk,), countdown=delay)
+    else:
+        counter = "stats-update-merged"
+    try:
+        cache.incr(counter)
+    except ValueError:
+        cache.set(counter, 1, None)
+
+
+def get_stats_update_counters():
+    return {
+        "scheduled": cache.get("stats-update-scheduled", 0),
+        "merged": cache.get("stats-update-merged", 0),
+    }
+
+
 @app.task(
     trail=False,
     autoretry_for=(WeblateLockTimeout,),
@@ -0,0 +1,140 @@
+#
+# Copyright © 2012–2022 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test for full-text index."""
+
+from sqlite3 import OperationalError
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.test.utils import override_settings
+
+from weblate.trans.fulltext import get_fulltext
+from weblate.trans.models import Unit
+from weblate.trans.tests.test_views import ViewTestCase
+from weblate.utils.search import parse_query
+
+
+@override_settings(FULLTEXT_INDEX="weblate.trans.fulltext.SQLiteFullTextIndex")
+class FullTextTest(ViewTestCase):
+    def assert_search(self, query, expected):
+        units = Unit.objects.filter(translation__component=self.component)
+        self.assertEqual(
+            set(units.search(query).values_list("pk", flat=True)),
+            set(units.filter(expected).values_list("pk", flat=True)),
+        )
+
+    def test_search(self):
+        # Index is not used prior to building it
+        get_fulltext().clear()
+        self.assertEqual(parse_query("source:world"), Q(source__substring="world"))
+
+        call_command("rebuild_index")
+        self.assertIsInstance(parse_query("source:world").children[0][1], set)
+        self.assert_search("source:world", Q(source__icontains="world"))
+        self.assert_search(
+            "world",
+            Q(source__icontains="world")
+            | Q(target__icontains="world")
+            | Q(context__icontains="world"),
+        )
+        # Too short string is searched in the database
+        self.assertEqual(parse_query("source:wo"), Q(source__substring="wo"))
+
+        # Index is updated on save
+        self.edit_unit("Hello, world!\n", "Nazdar svete!\n")
+        self.assert_search("target:svete", Q(target__icontains="svete"))
+        self.assertEqual(
+            Unit.objects.search("target:svete").get().target, "Nazdar svete!\n"
+        )
+
+    def test_scope(self):
+        call_command("rebuild_index")
+        fulltext = get_fulltext()
+        translation = self.get_translation()
+        units = Unit.objects.filter(source__icontains="world")
+        self.assertEqual(
+            fulltext.search(["source"], "world"),
+            set(units.values_list("pk", flat=True)),
+        )
+        self.assertEqual(
+            fulltext.search(["source"], "world", translation_id=translation.pk),
+            set(units.filter(translation=translation).values_list("pk", flat=True)),
+        )
+        self.assertEqual(fulltext.search(["source"], "world", component_id=-1), set())
+
+    def test_delete(self):
+        call_command("rebuild_index")
+        fulltext = get_fulltext()
+        translation = self.get_translation()
+        unit = translation.unit_set.get(source__icontains="world")
+        unit.delete()
+        self.assertNotIn(unit.pk, fulltext.search(["source"], "world"))
+        # Translations of the source string are removed as well
+        source_unit = self.component.source_translation.unit_set.get(
+            source__icontains="thank"
+        )
+        source_unit.translation.unit_set.filter(pk=source_unit.pk).delete()
+        self.assertEqual(fulltext.search(["source"], "thank"), set())
+        translation_id = translation.pk
+        translation.delete()
+        self.assertEqual(
+            fulltext.search(["source"], "Hello", translation_id=translation_id),
+            set(),
+        )
+
+    def test_transaction(self):
+        fulltext = get_fulltext()
+        units = list(self.get_translation().unit_set.all())
+        connection = transaction.get_connection()
+        # Collect the changes until the transaction is committed
+        with patch(
+            "django.db.transaction.on_commit", side_effect=connection.on_commit
+        ), patch.object(fulltext, "update_units") as update_units, patch.object(
+            fulltext, "delete_units"
+        ) as delete_units, self.captureOnCommitCallbacks(
+            execute=True
+        ):
+            for unit in units:
+                unit.save(only_save=True)
+            units[0].delete()
+        # Committed state of the units is indexed
+        update_units.assert_called_once()
+        self.assertEqual(
+            {values[0] for values in update_units.call_args[0][0]},
+            {unit.pk for unit in units[1:]},
+        )
+        delete_units.assert_called_once_with({units[0].pk})
+
+    def test_error(self):
+        fulltext = get_fulltext()
+        unit = self.get_unit()
+        # Failure to update the index does not break the committed request
+        with patch.object(
+            fulltext, "update_units", side_effect=OperationalError("locked")
+        ), patch("weblate.trans.fulltext.report_error") as report_error:
+            unit.save(only_save=True)
+        report_error.assert_called_once()
+
+    @override_settings(FULLTEXT_INDEX=None, MEMORY_INDEX=None)
+    def test_not_configured(self):
+        with self.assertRaises(CommandError):
+            call_command("rebuild_index")
@@ -18,7 +18,9 @@
 #
 """Test for translation models."""
 import os
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.core.management.color import no_style
 from django.db import connection, transaction
 from django.test import LiveServerTestCase, TestCase
@@ -35,13 +37,16 @@ from weblate.trans.models import (
     ComponentList,
     Project,
     Suggestion,
+    Translation,
     Unit,
     Vote,
 )
 from weblate.trans.tests.utils import RepoTestMixin, create_test_user
 from weblate.utils.django_hacks import immediate_on_commit, immediate_on_commit_leave
 from weblate.utils.files import remove_tree
-from weblate.utils.state import STATE_TRANSLATED
+from weblate.utils.models import StoredStats
+from weblate.utils.state import STATE_FUZZY, STATE_TRANSLATED
+from weblate.utils.stats import BASIC_KEYS, BaseStats, prefetch_stats
 
 
 def fixup_languages_seq():
@@ -106,6 +111,60 @@ class ProjectTest(RepoTestCase):
         self.assertTrue(os.path.exists(project.full_path))
         self.assertIn(project.slug, project.full_path)
 
+    def test_stats_rollup(self):
+        component = self.create_link()
+        project = component.project
+        translations = Translation.objects.filter(component__project=project)
+        # Stats calculated per translation
+        expected = {
+            translation.pk: {key: getattr(translation.stats, key) for key in BASIC_KEYS}
+            for translation in translations
+        }
+        languages = {
+            stats.language.pk: stats.all for stats in project.stats.get_language_stats()
+        }
+        cache.clear()
+        StoredStats.objects.all().delete()
+
+        # Stats calculated for whole project at once
+        project = Project.objects.get(pk=project.pk)
+        project.stats.ensure_basic()
+        self.assertEqual(
+            {
+                stats.language.pk: stats.all
+                for stats in project.stats.get_language_stats()
+            },
+            languages,
+        )
+        for translation in translations.all():
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    {key: getattr(translation.stats, key) for key in BASIC_KEYS},
+                    expected[translation.pk],
+                )
+
+    def test_prefetch_stats(self):
+        component = self.create_link()
+        components = Component.objects.filter(project=component.project)
+        expected = {
+            component.pk: {key: getattr(component.stats, key) for key in BASIC_KEYS}
+            for component in components
+        }
+        cache.clear()
+        StoredStats.objects.all().delete()
+
+        # Missing stats are calculated in batch while prefetching
+        for component in prefetch_stats(components.all()):
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    {key: getattr(component.stats, key) for key in BASIC_KEYS},
+                    expected[component.pk],
+                )
+                self.assertEqual(
+                    component.stats.lazy_translated_percent,
+                    component.stats.translated_percent,
+                )
+
     def test_rename(self):
         component = self.create_link()
         self.assertTrue(Component.objects.filter(repo="weblate://test/test").exists())
@@ -220,6 +279,116 @@ class TranslationTest(RepoTestCase):
         self.assertEqual(translation.stats.all, 0)
         self.assertEqual(translation.stats.all_words, 0)
 
+    def assert_stats_consistent(self, translation, incremental_updates):
+        stats = Translation.objects.get(pk=translation.pk).stats
+        self.assertEqual(
+            stats.load().get("incremental_updates", 0), incremental_updates
+        )
+        stats.ensure_basic()
+        cached = {key: getattr(stats, key) for key in BASIC_KEYS}
+        stats.invalidate()
+        stats.ensure_basic()
+        self.assertEqual(cached, {key: getattr(stats, key) for key in BASIC_KEYS})
+
+    def test_incremental_stats(self):
+        component = self.create_component()
+        translation = component.translation_set.get(language_code="cs")
+        user = create_test_user()
+        translation.stats.ensure_basic()
+        unit = translation.unit_set.get(source="Hello, world!\n")
+        # Triggers end-newline check
+        unit.translate(user, "Ahoj svete!", STATE_TRANSLATED)
+        # Incremental update is stored in the database as well
+        key = translation.stats.cache_key
+        self.assertEqual(
+            StoredStats.objects.get_data([key])[key]["translated"],
+            Translation.objects.get(pk=translation.pk).stats.translated,
+        )
+        self.assert_stats_consistent(translation, 1)
+        unit.translate(user, "Ahoj svete!\n", STATE_FUZZY)
+        self.assert_stats_consistent(translation, 1)
+        unit = translation.unit_set.get(pk=unit.pk)
+        Suggestion.objects.add(unit, "Nazdar svete!\n", None)
+        self.assert_stats_consistent(translation, 1)
+        Comment.objects.create(user=user, unit=unit, comment="Test")
+        self.assert_stats_consistent(translation, 1)
+
+    def test_incremental_stats_transaction(self):
+        component = self.create_component()
+        translation = component.translation_set.get(language_code="cs")
+        user = create_test_user()
+        translation.stats.ensure_basic()
+        unit = translation.unit_set.get(source="Hello, world!\n")
+        callbacks = []
+        with patch.object(transaction, "on_commit", callbacks.append):
+            unit.translate(user, "Ahoj svete!", STATE_TRANSLATED)
+            unit.translate(user, "Ahoj svete!\n", STATE_FUZZY)
+        # Changes of the unit are applied at once
+        self.assertEqual(callbacks.count(translation._update_unit_stats_triger), 1)
+        for callback in callbacks:
+            callback()
+        self.assert_stats_consistent(translation, 1)
+
+    def test_incremental_stats_recalculated(self):
+        component = self.create_component()
+        translation = component.translation_set.get(language_code="cs")
+        translation.stats.ensure_basic()
+        unit = translation.unit_set.get(source="Hello, world!\n")
+        stats = Translation.objects.get(pk=translation.pk).stats
+        get_units_values = stats.get_units_values
+
+        def recalculate(pks):
+            # Concurrent full recalculation
+            translation.stats.invalidate()
+            translation.stats.ensure_basic()
+            return get_units_values(pks)
+
+        with patch.object(stats, "get_units_values", side_effect=recalculate):
+            stats.update_units({unit.pk: stats.get_unit_values(unit.pk)})
+        # The delta is not applied on top of recalculated stats
+        self.assertEqual(stats.load(), {})
+
+    @override_settings(STATS_INCREMENTAL_LIMIT=1)
+    def test_incremental_stats_limit(self):
+        component = self.create_component()
+        translation = component.translation_set.get(language_code="cs")
+        user = create_test_user()
+        translation.stats.ensure_basic()
+        unit = translation.unit_set.get(source="Hello, world!\n")
+        unit.translate(user, "Ahoj svete!\n", STATE_TRANSLATED)
+        self.assertEqual(translation.stats.load()["incremental_updates"], 1)
+        # The limit is reached, stats are recalculated
+        unit.translate(user, "Nazdar svete!\n", STATE_TRANSLATED)
+        self.assert_stats_consistent(translation, 0)
+
+    def test_stored_stats(self):
+        component = self.create_component()
+        translation = component.translation_set.get(language_code="cs")
+        translation.stats.invalidate()
+        # Recalculated stats are stored in the database
+        translation.stats.ensure_basic()
+        self.assertTrue(
+            StoredStats.objects.filter(key=translation.stats.cache_key).exists()
+        )
+        # Flushed cache falls back to the database copy
+        cache.delete(translation.stats.cache_key)
+        stats = Translation.objects.get(pk=translation.pk).stats
+        with self.assertNumQueries(1):
+            self.assertEqual(stats.all, 4)
+            self.assertEqual(stats.last_changed, translation.stats.last_changed)
+
+        # Invalidation removes the outdated database copy
+        BaseStats.delete_keys([translation.stats.cache_key])
+        self.assertFalse(
+            StoredStats.objects.filter(key=translation.stats.cache_key).exists()
+        )
+        stats = Translation.objects.get(pk=translation.pk).stats
+        with self.assertNumQueries(0):
+            self.assertEqual(stats.load(), {})
+        # Flushed cache does not bring back outdated stats
+        cache.delete(translation.stats.cache_key)
+        self.assertEqual(stats.load(), {})
+
     def test_commit_groupping(self):
         component = self.create_component()
         translation = component.translation_set.get(language_code="cs")
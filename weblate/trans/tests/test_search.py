@@ -173,6 +173,28 @@ class SearchViewTest(ViewTestCase):
         self.do_search({"offset": 4}, "4 / 4")
         self.do_search({"offset": 5}, None)
 
+    def test_search_keyset(self):
+        """Test navigation in results not stored in the session."""
+        expected = [
+            self.do_search({"offset": offset}, f"{offset} / 4").context["unit"].pk
+            for offset in range(1, 5)
+        ]
+        # Reaching the end removes search from the session
+        self.do_search({"offset": 5}, None)
+        with override_settings(SEARCH_KEYSET_LIMIT=1):
+            for offset in [1, 2, 3, 4, 3, 1, 4]:
+                response = self.do_search({"offset": offset}, f"{offset} / 4")
+                self.assertEqual(response.context["unit"].pk, expected[offset - 1])
+            session = [
+                value
+                for key, value in self.client.session.items()
+                if key.startswith("search_")
+            ]
+            self.assertIsNone(session[0]["ids"])
+            unit = self.translation.unit_set.get(pk=expected[2])
+            self.do_search({"checksum": unit.checksum}, "3 / 4")
+            self.do_search({"offset": 5}, None)
+
     def test_search_type(self):
         self.do_search({"q": "state:<translated"}, "Unfinished strings")
         self.do_search({"q": "state:needs-editing"}, None)
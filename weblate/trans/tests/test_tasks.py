@@ -19,7 +19,9 @@
 
 
 from datetime import timedelta
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test.utils import override_settings
 from django.utils import timezone
 
@@ -29,6 +31,9 @@ from weblate.trans.tasks import (
     cleanup_old_suggestions,
     cleanup_suggestions,
     daily_update_checks,
+    get_stats_update_counters,
+    schedule_update_component_stats,
+    update_component_stats,
 )
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.utils.state import STATE_TRANSLATED
@@ -107,3 +112,17 @@ class CleanupTest(ViewTestCase):
 class TasksTest(ViewTestCase):
     def test_daily_update_checks(self):
         daily_update_checks()
+
+    def test_update_component_stats(self):
+        pk = self.component.pk
+        cache.delete_many(["stats-update-scheduled", "stats-update-merged"])
+        with patch.object(update_component_stats, "apply_async") as mocked:
+            schedule_update_component_stats(pk)
+            schedule_update_component_stats(pk)
+            schedule_update_component_stats(pk)
+            self.assertEqual(mocked.call_count, 1)
+            self.assertEqual(get_stats_update_counters(), {"scheduled": 1, "merged": 2})
+            # Running the update allows scheduling new one
+            update_component_stats(pk)
+            schedule_update_component_stats(pk)
+            self.assertEqual(mocked.call_count, 2)
@@ -43,6 +43,7 @@ from weblate.checks.models import CHECKS, get_display_checks
 from weblate.glossary.forms import TermForm
 from weblate.glossary.models import get_glossary_terms
 from weblate.lang.models import Language
+from weblate.machinery.tasks import prefetch_machinery
 from weblate.screenshots.forms import ScreenshotForm
 from weblate.trans.exceptions import FileParseError
 from weblate.trans.forms import (
@@ -69,7 +70,11 @@ from weblate.utils import messages
 from weblate.utils.antispam import is_spam
 from weblate.utils.hash import hash_to_checksum
 from weblate.utils.messages import get_message_kind
-from weblate.utils.ratelimit import revert_rate_limit, session_ratelimit_post
+from weblate.utils.ratelimit import (
+    TokenBucket,
+    revert_rate_limit,
+    session_ratelimit_post,
+)
 from weblate.utils.state import STATE_FUZZY, STATE_TRANSLATED
 from weblate.utils.stats import ProjectLanguage
 from weblate.utils.views import (
@@ -237,24 +242,41 @@ def search(
     }
     session_key = f"search_{base.cache_key}_{search_url}"
 
+    allunits = unit_set.search(
+        cleaned_data.get("q", ""),
+        project=project,
+        translation=None if isinstance(base, ProjectLanguage) else base,
+    ).order_by_request(cleaned_data, base)
+    ordering = allunits.get_keyset_ordering()
+    if ordering is not None:
+        allunits = allunits.order_by(*ordering)
+    search_result["units"] = allunits
+    search_result["ordering"] = ordering
+
     if (
         use_cache
         and session_key in request.session
         and "offset" in request.GET
         and "items" in request.session[session_key]
+        and "count" in request.session[session_key]
     ):
         search_result.update(request.session[session_key])
         return search_result
 
-    allunits = unit_set.search(cleaned_data.get("q", ""), project=project)
-
     # Grab unit IDs
-    unit_ids = list(
-        allunits.order_by_request(cleaned_data, base).values_list("id", flat=True)
-    )
+    limit = settings.SEARCH_KEYSET_LIMIT
+    if ordering is None or not limit:
+        unit_ids = list(allunits.values_list("id", flat=True))
+        count = len(unit_ids)
+    else:
+        unit_ids = list(allunits.values_list("id", flat=True)[: limit + 1])
+        count = len(unit_ids)
+        if count > limit:
+            # Too many results, store only current position
+            count = allunits.count()
 
     # Check empty search results
-    if not unit_ids and not blank:
+    if not count and not blank:
         messages.warning(request, _("No strings found!"))
         return redirect(base)
 
@@ -267,7 +289,10 @@ def search(
         "items": search_items,
         "key": session_key,
         "name": str(name),
-        "ids": unit_ids,
+        "count": count,
+        "ids": unit_ids if count == len(unit_ids) else None,
+        "position": 1,
+        "unit_id": unit_ids[0] if unit_ids else None,
         "ttl": int(time.monotonic()) + 86400,
     }
     if use_cache:
@@ -277,6 +302,99 @@ def search(
     return search_result
 
 
+def get_search_ids(search_result, start: int, end: int):
+    """Return unit IDs from given range of search results."""
+    if search_result["ids"] is not None:
+        return search_result["ids"][start:end]
+    return list(search_result["units"].values_list("id", flat=True)[start:end])
+
+
+def get_search_unit_id(request, search_result, offset: int):
+    """
+    Return unit ID at given offset in search results.
+
+    For large results only the current position is stored in the session and
+    adjacent units are looked up using keyset queries.
+    """
+    if search_result["ids"] is not None:
+        return search_result["ids"][offset - 1]
+
+    position = search_result["position"]
+    unit_id = search_result["unit_id"]
+    if offset == position:
+        return unit_id
+
+    result = None
+    if abs(offset - position) == 1:
+        try:
+            result = search_result["units"].get_keyset_neighbour(
+                search_result["ordering"], unit_id, previous=offset < position
+            )
+        except Unit.DoesNotExist:
+            # The unit has been removed meanwhile
+            pass
+    if result is None:
+        result = next(iter(get_search_ids(search_result, offset - 1, offset)), None)
+
+    if result is not None:
+        set_search_position(request, search_result, offset, result)
+    return result
+
+
+def get_search_offset(request, search_result, unit_id: int):
+    """Return offset of unit in search results or None if not found."""
+    if search_result["ids"] is not None:
+        try:
+            return search_result["ids"].index(unit_id) + 1
+        except ValueError:
+            return None
+    units = search_result["units"]
+    if not units.filter(pk=unit_id).exists():
+        return None
+    offset = units.get_keyset_position(search_result["ordering"], unit_id)
+    set_search_position(request, search_result, offset, unit_id)
+    return offset
+
+
+def get_following_ids(search_result, offset: int, unit_id: int, count: int):
+    """Return IDs of units following given unit in search results."""
+    if search_result["ids"] is not None:
+        return get_search_ids(search_result, offset, offset + count)
+    units = search_result["units"].keyset_filter(search_result["ordering"], unit_id)
+    return list(units.values_list("id", flat=True)[:count])
+
+
+def prefetch_machinery_units(request, search_result, offset: int, unit):
+    """Warm up machinery cache for the following units in search results."""
+    user = request.user
+    count = settings.MACHINERY_PREFETCH
+    if (
+        not count
+        or not user.is_authenticated
+        or not user.has_perm("machinery.view", unit.translation)
+    ):
+        return
+    unit_ids = get_following_ids(search_result, offset, unit.id, count)
+    if not unit_ids:
+        return
+    bucket = TokenBucket(
+        f"machinery-prefetch-{user.id}", *settings.MACHINERY_PREFETCH_RATE_LIMIT
+    )
+    if bucket.acquire():
+        prefetch_machinery.delay(unit_ids=unit_ids, user_id=user.id)
+
+
+def set_search_position(request, search_result, offset: int, unit_id: int):
+    """Store current position in search results."""
+    search_result["position"] = offset
+    search_result["unit_id"] = unit_id
+    session_result = request.session.get(search_result["key"])
+    if session_result is not None:
+        session_result["position"] = offset
+        session_result["unit_id"] = unit_id
+        request.session.modified = True
+
+
 def perform_suggestion(unit, form, request):
     """Handle suggesion saving."""
     if form.cleaned_data["target"][0] == "":
@@ -550,7 +668,7 @@ def translate(request, project, component, lang):  # noqa: C901
         return search_result
 
     # Get number of results
-    num_results = len(search_result["ids"])
+    num_results = search_result["count"]
 
     # Search offset
     offset = search_result["offset"]
@@ -561,10 +679,7 @@ def translate(request, project, component, lang):  # noqa: C901
         checksum_form = ChecksumForm(unit_set, payload)
         if checksum_form.is_valid():
             unit = checksum_form.cleaned_data["unit"]
-            try:
-                offset = search_result["ids"].index(unit.id) + 1
-            except ValueError:
-                offset = None
+            offset = get_search_offset(request, search_result, unit.id)
         else:
             offset = None
         if offset is None:
@@ -580,7 +695,7 @@ def translate(request, project, component, lang):  # noqa: C901
 
         # Grab actual unit
         try:
-            unit = unit_set.get(pk=search_result["ids"][offset - 1])
+            unit = unit_set.get(pk=get_search_unit_id(request, search_result, offset))
         except Unit.DoesNotExist:
             # Can happen when using SID for other translation
             messages.error(request, _("Invalid search string!"))
@@ -622,6 +737,8 @@ def translate(request, project, component, lang):  # noqa: C901
     if response is not None:
         return response
 
+    prefetch_machinery_units(request, search_result, offset, unit)
+
     # Show secondary languages for signed in users
     if user.is_authenticated:
         secondary = unit.get_secondary_units(user)
@@ -827,10 +944,10 @@ def get_zen_unitdata(obj, project, unit_set, request):
         return search_result, None
 
     offset = search_result["offset"] - 1
-    search_result["last_section"] = offset + 20 >= len(search_result["ids"])
+    search_result["last_section"] = offset + 20 >= search_result["count"]
 
     units = unit_set.prefetch_full().get_ordered(
-        search_result["ids"][offset : offset + 20]
+        get_search_ids(search_result, offset, offset + 20)
     )
 
     unitdata = [
@@ -874,7 +991,7 @@ def zen(request, project, component, lang):
             "unitdata": unitdata,
             "search_query": search_result["query"],
             "filter_name": search_result["name"],
-            "filter_count": len(search_result["ids"]),
+            "filter_count": search_result["count"],
             "sort_name": sort["name"],
             "sort_query": sort["query"],
             "last_section": search_result["last_section"],
@@ -1009,14 +1126,14 @@ def browse(request, project, component, lang):
     offset = search_result["offset"]
     page = 20
     units = unit_set.prefetch_full().get_ordered(
-        search_result["ids"][(offset - 1) * page : (offset - 1) * page + page]
+        get_search_ids(search_result, (offset - 1) * page, offset * page)
     )
 
     base_unit_url = "{}?{}&offset=".format(
         reverse("browse", kwargs=obj.get_reverse_url_kwargs()),
         search_result["url"],
     )
-    num_results = ceil(len(search_result["ids"]) / page)
+    num_results = ceil(search_result["count"] / page)
     sort = get_sort_name(request, obj)
 
     return render(
@@ -208,7 +208,9 @@ def search(request, project=None, component=None, lang=None):
         else:
             units = units.filter_access(request.user)
         units = units.search(
-            search_form.cleaned_data.get("q", ""), project=context.get("project")
+            search_form.cleaned_data.get("q", ""),
+            project=context.get("project"),
+            component=context.get("component"),
         )
         if lang:
             units = units.filter(translation__language=context["language"])
@@ -940,6 +940,11 @@ real_patterns = [
         weblate.machinery.views.translate,
         name="js-translate",
     ),
+    path(
+        "js/translate-all/<int:unit_id>/",
+        weblate.machinery.views.translate_all,
+        name="js-translate-all",
+    ),
     path(
         "js/memory/<int:unit_id>/",
         weblate.machinery.views.memory,
@@ -18,7 +18,7 @@
 #
 """Database specific code to extend Django."""
 
-from django.db import connection, models
+from django.db import connection, models, transaction
 from django.db.models import Case, IntegerField, Sum, When
 from django.db.models.lookups import PatternLookup
 
@@ -40,6 +40,18 @@ def using_postgresql():
     return connection.vendor == "postgresql"
 
 
+def is_on_commit_registered(func, using=None) -> bool:
+    """
+    Check whether the function is registered to run on commit.
+
+    Functions registered in a rolled back savepoint are removed by Django, so
+    this can be used to register a function once per transaction.
+    """
+    return any(
+        item[1] is func for item in transaction.get_connection(using).run_on_commit
+    )
+
+
 def adjust_similarity_threshold(value: float):
     """
     Adjusts pg_trgm.similarity_threshold for the % operator.
@@ -0,0 +1,105 @@
+#
+# Copyright © 2012–2022 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Indexes stored locally in SQLite databases."""
+
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+from django.conf import settings
+
+from weblate.utils.classloader import load_class
+from weblate.utils.data import data_dir
+
+INDEXES = {}
+
+
+class LocalIndex:
+    """
+    Index stored in SQLite database in the data directory.
+
+    The database is shared by all processes, each thread uses own connection.
+    """
+
+    name = ""
+    # SQL statements to create the database schema
+    schema = ()
+    # Tables holding the indexed data
+    tables = ()
+
+    def __init__(self):
+        self.local = threading.local()
+
+    @property
+    def filename(self):
+        return data_dir("index", f"{self.name}.sqlite3")
+
+    @property
+    def connection(self):
+        # SQLite connections can not be shared between threads
+        if not hasattr(self.local, "connections"):
+            self.local.connections = {}
+        filename = self.filename
+        connection = self.local.connections.get(filename)
+        if connection is None:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            connection = sqlite3.connect(filename, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                for statement in self.schema:
+                    connection.execute(statement)
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+                )
+            self.local.connections[filename] = connection
+        return connection
+
+    def clear(self):
+        """Remove all data and mark index as not ready."""
+        with self.connection as connection:
+            for table in self.tables:
+                connection.execute(f"DELETE FROM {table}")  # nosec
+            connection.execute("DELETE FROM meta")
+
+    def set_ready(self, ready: bool = True):
+        """Mark index as complete and usable for lookups."""
+        with self.connection as connection:
+            if ready:
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('ready', '1')")
+            else:
+                connection.execute("DELETE FROM meta WHERE key = 'ready'")
+
+    @property
+    def is_ready(self):
+        return (
+            self.connection.execute("SELECT 1 FROM meta WHERE key = 'ready'").fetchone()
+            is not None
+        )
+
+
+def get_index(setting: str) -> Optional[LocalIndex]:
+    """Return index configured in the setting or None if not configured."""
+    name = getattr(settings, setting)
+    if not name:
+        return None
+    if name not in INDEXES:
+        INDEXES[name] = load_class(name, setting)()
+    return INDEXES[name]
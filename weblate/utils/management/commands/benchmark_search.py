@@ -0,0 +1,77 @@
+#
+# Copyright © 2012–2022 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+from timeit import timeit
+
+from weblate.utils.management.base import BaseCommand
+from weblate.utils.search import parse_query, parse_string
+
+QUERIES = (
+    "state:<translated",
+    "has:check",
+    "state:>=translated AND NOT has:suggestion",
+    "source:hello OR target:hello",
+    "changed:[2020-01-01 to 2020-12-31] changed_by:admin",
+    "((source:a OR target:b) AND NOT (state:<translated OR has:check))"
+    " OR (language:cs AND component:test)",
+)
+
+
+class Command(BaseCommand):
+    """Measure search query parser throughput."""
+
+    help = "performs search parser benchmark"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--count", type=int, default=100, help="number of iterations"
+        )
+        parser.add_argument(
+            "query", nargs="*", help="queries to parse, defaults to built-in set"
+        )
+
+    def report(self, name, duration, count):
+        self.stdout.write(
+            f"{name}: {1000 * duration / count:.3f} ms per iteration, "
+            f"{count / duration:.1f} iterations per second"
+        )
+
+    def handle(self, *args, **options):
+        queries = options["query"] or QUERIES
+        count = options["count"]
+
+        def parse_all():
+            for query in queries:
+                parse_query(query)
+
+        # Parsing without cache
+        self.report(
+            "Parser",
+            timeit(
+                lambda: [parse_string.__wrapped__(query) for query in queries],
+                number=count,
+            ),
+            count,
+        )
+
+        # Building queries with cached parser
+        parse_all()
+        self.report("Cached parser", timeit(parse_all, number=count), count)
+        self.stdout.write(str(parse_string.cache_info()))
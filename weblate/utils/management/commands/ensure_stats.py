@@ -20,14 +20,37 @@ from datetime import date
 
 from weblate.metrics.models import Metric
 from weblate.metrics.tasks import collect_metrics
+from weblate.trans.models import Translation
 from weblate.utils.management.base import BaseCommand
-from weblate.utils.stats import GlobalStats
+from weblate.utils.stats import GlobalStats, store_translation_stats
 
 
 class Command(BaseCommand):
     help = "ensures that stats are present"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--store",
+            action="store_true",
+            help="calculate stats for all translations and store them in database",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="number of translations processed at once",
+        )
+
     def handle(self, *args, **options):
+        if options["store"]:
+            batch = []
+            for translation in Translation.objects.iterator():
+                batch.append(translation)
+                if len(batch) >= options["batch_size"]:
+                    store_translation_stats(batch)
+                    batch = []
+            if batch:
+                store_translation_stats(batch)
         GlobalStats().ensure_basic()
         if not Metric.objects.filter(
             date=date.today(), scope=Metric.SCOPE_GLOBAL
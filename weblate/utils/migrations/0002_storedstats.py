@@ -0,0 +1,40 @@
+# Generated by Django 4.1 on 2022-09-05 10:12
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("utils", "0001_alter_role"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredStats",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=190, unique=True)),
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder
+                    ),
+                ),
+                ("timestamp", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Stored stats",
+                "verbose_name_plural": "Stored stats",
+            },
+        ),
+    ]
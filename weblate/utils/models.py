@@ -17,11 +17,16 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from datetime import datetime
+from typing import Dict, Iterable
 
 from appconf import AppConf
 from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils.dateparse import parse_datetime
 
 from weblate.trans.models import Change
 from weblate.utils.decorators import disable_for_loaddata
@@ -77,6 +82,8 @@ class WeblateConf(AppConf):
 
     HIDE_VERSION = False
 
+    STATS_INCREMENTAL_LIMIT = 100
+
     CSP_SCRIPT_SRC = []
     CSP_IMG_SRC = []
     CSP_CONNECT_SRC = []
@@ -89,6 +96,56 @@ class WeblateConf(AppConf):
         prefix = ""
 
 
+def serialize_stats(data: Dict) -> Dict:
+    """Serialize timestamps in stats without losing precision."""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in data.items()
+    }
+
+
+class StoredStatsQuerySet(models.QuerySet):
+    def get_data(self, keys: Iterable[str]) -> Dict[str, Dict]:
+        """Return stored stats data for given cache keys."""
+        result = {}
+        for key, data in self.filter(key__in=keys).values_list("key", "data"):
+            # The timestamp is serialized as string in JSON
+            if data.get("last_changed"):
+                data["last_changed"] = parse_datetime(data["last_changed"])
+            result[key] = data
+        return result
+
+    def store_many(self, data: Dict[str, Dict]):
+        # Avoid exposing missing rows to concurrent readers
+        with transaction.atomic():
+            self.filter(key__in=data.keys()).delete()
+            self.bulk_create(
+                [
+                    StoredStats(key=key, data=serialize_stats(value))
+                    for key, value in data.items()
+                ],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+
+
+class StoredStats(models.Model):
+    """Persistent copy of cached stats used when the cache is empty."""
+
+    key = models.CharField(max_length=190, unique=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    timestamp = models.DateTimeField(auto_now=True)
+
+    objects = StoredStatsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Stored stats"
+        verbose_name_plural = "Stored stats"
+
+    def __str__(self):
+        return self.key
+
+
 @receiver(post_save, sender=Change)
 @disable_for_loaddata
 def update_source(sender, instance, created, **kwargs):
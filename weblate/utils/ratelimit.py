@@ -17,6 +17,9 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import os
+import time
+
 from django.conf import settings
 from django.contrib.auth import logout
 from django.core.cache import cache
@@ -26,7 +29,9 @@ from django.template.loader import render_to_string
 
 from weblate.logger import LOGGER
 from weblate.utils import messages
+from weblate.utils.data import data_dir
 from weblate.utils.hash import calculate_checksum
+from weblate.utils.lock import WeblateLock
 from weblate.utils.request import get_ip_address
 
 
@@ -125,3 +130,72 @@ def session_ratelimit_post(scope):
         return rate_wrap
 
     return session_ratelimit_post_inner
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter shared using the cache.
+
+    Allows bursts up to capacity requests, which are then refilled over
+    the period. The bucket is stored as a counter of reserved tokens, every
+    token becoming available at counter / rate seconds, so it can be updated
+    atomically using cache increments.
+    """
+
+    def __init__(self, key: str, capacity: int, period: float):
+        self.key = key
+        self.period = period
+        self.rate = capacity / period
+
+    def reserve(self) -> float:
+        """Reserve a token, returns number of seconds until it is available."""
+        now = time.time()
+        full = int((now - self.period) * self.rate)
+        try:
+            reserved = cache.incr(self.key)
+        except ValueError:
+            cache.add(self.key, full, None)
+            reserved = cache.incr(self.key)
+        if reserved <= full:
+            # The bucket was refilled meanwhile, move the counter to the present.
+            # This is done under the lock to avoid concurrent callers moving
+            # the counter by the whole gap each.
+            with self.get_lock():
+                current = cache.get(self.key, 0)
+                if current <= full:
+                    reserved = cache.incr(self.key, full + 1 - current)
+                else:
+                    # Other caller has already moved the counter, the token
+                    # reserved before is part of the skipped gap
+                    reserved = cache.incr(self.key)
+        return max(0.0, reserved / self.rate - now)
+
+    def get_lock(self):
+        lock_path = data_dir("home")
+        os.makedirs(lock_path, exist_ok=True)
+        return WeblateLock(
+            lock_path,
+            "token-bucket",
+            0,
+            self.key,
+            "lock:{scope}:{slug}",
+            ".{scope}-{slug}.lock",
+            timeout=10,
+        )
+
+    def release(self):
+        """Return reserved token to the bucket."""
+        try:
+            cache.decr(self.key)
+        except ValueError:
+            pass
+
+    def acquire(self, max_wait: float = 0) -> bool:
+        """Wait for a token, returns False when it would take too long."""
+        wait = self.reserve()
+        if wait > max_wait:
+            self.release()
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
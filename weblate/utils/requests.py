@@ -17,21 +17,132 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import os
+import time
+from contextvars import ContextVar
+from threading import Lock
+from typing import Optional
+
 import requests
 from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from weblate.logger import LOGGER
 from weblate.utils.errors import report_error
 from weblate.utils.version import USER_AGENT
 
+# Delay between retries is exponentially growing from this
+RETRY_BACKOFF = 0.5
+# Status codes indicating temporary server errors
+RETRY_STATUS = (500, 502, 504)
+
+SESSIONS = {}
+SESSIONS_LOCK = Lock()
+
+# Monotonic time limit for retrying the request being performed
+REQUEST_DEADLINE: ContextVar[Optional[float]] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineRetry(Retry):
+    """
+    Retry configuration respecting deadline of the request.
+
+    Connection errors are retried for all requests as nothing was sent to the
+    server, temporary server errors only for idempotent methods.
+    """
+
+    def is_exhausted(self):
+        deadline = REQUEST_DEADLINE.get()
+        if deadline is not None:
+            # Give up when the next attempt would start after the deadline
+            if time.monotonic() + self.get_backoff_time() >= deadline:
+                return True
+        return super().is_exhausted()
+
+
+def get_session(name: str, pool_size: int = 10, retries: int = 0):
+    """
+    Return session shared in the current process.
+
+    The session keeps connections alive and reuses them for following requests.
+    """
+    # Connections can not be shared with forked processes
+    key = (os.getpid(), name)
+    with SESSIONS_LOCK:
+        if key not in SESSIONS:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=pool_size,
+                pool_maxsize=pool_size,
+                max_retries=DeadlineRetry(
+                    total=retries,
+                    backoff_factor=RETRY_BACKOFF,
+                    status_forcelist=RETRY_STATUS,
+                    raise_on_status=False,
+                ),
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            SESSIONS[key] = session
+        return SESSIONS[key]
 
-def request(method, url, headers=None, **kwargs):
+
+def get_connection_count(session) -> int:
+    """Return number of connections opened by the session."""
+    result = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                result += pool.num_connections
+    return result
+
+
+def record_connection_usage(connections: int):
+    """Count number of requests and new connections made."""
+    for key, delta in (("http-requests", 1), ("http-connections", connections)):
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            cache.set(key, delta, None)
+
+
+def get_connection_counters():
+    return {
+        "requests": cache.get("http-requests", 0),
+        "connections": cache.get("http-connections", 0),
+    }
+
+
+def request(
+    method,
+    url,
+    headers=None,
+    session: Optional[requests.Session] = None,
+    deadline: Optional[float] = None,
+    **kwargs,
+):
+    """
+    Perform HTTP request.
+
+    The deadline limits time in seconds spent by retrying the request.
+    """
     agent = {"User-Agent": USER_AGENT}
     if headers:
         headers.update(agent)
     else:
         headers = agent
-    response = requests.request(method, url, headers=headers, **kwargs)
+    token = REQUEST_DEADLINE.set(
+        None if deadline is None else time.monotonic() + deadline
+    )
+    try:
+        response = (session or requests).request(method, url, headers=headers, **kwargs)
+    finally:
+        REQUEST_DEADLINE.reset(token)
     response.raise_for_status()
     return response
 
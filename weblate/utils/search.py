@@ -21,7 +21,7 @@ import re
 from datetime import datetime
 from functools import lru_cache, reduce
 from itertools import chain
-from typing import Dict
+from typing import Dict, List
 
 from dateutil.parser import ParserError, parse
 from django.db.models import Q
@@ -36,9 +36,11 @@ from pyparsing import (
     infix_notation,
     one_of,
 )
+from rapidfuzz import process
 from rapidfuzz.distance import DamerauLevenshtein
 
 from weblate.checks.parser import RawQuotedString
+from weblate.trans.fulltext import get_fulltext
 from weblate.trans.util import PLURAL_SEPARATOR
 from weblate.utils.db import re_escape, using_postgresql
 from weblate.utils.state import (
@@ -60,6 +62,27 @@ class Comparer:
         """Returns string similarity in range 0 - 100%."""
         return int(100 * DamerauLevenshtein.normalized_similarity(first, second))
 
+    def similarity_many(self, first, candidates: List[str], cutoff: int = 0):
+        """
+        Returns similarity of a string to each of the candidates.
+
+        The computation is abandoned early for candidates less similar than the
+        cutoff, these get similarity of 0.
+        """
+        result = [0] * len(candidates)
+        for _candidate, score, index in process.extract(
+            first,
+            candidates,
+            scorer=DamerauLevenshtein.normalized_similarity,
+            processor=None,
+            score_cutoff=cutoff / 100,
+            limit=None,
+        ):
+            score = int(100 * score)
+            if score >= cutoff:
+                result[index] = score
+        return result
+
 
 # Field type definitions
 PLAIN_FIELDS = ("source", "target", "context", "note", "location")
@@ -403,17 +426,42 @@ class TermExpr:
             return NONTEXT_FIELDS[field]
         raise ValueError(f"Unsupported field: {field}")
 
+    def fulltext_query(self, fields, match, context: Dict):
+        """Lookup substring in the full-text index if configured."""
+        fulltext = get_fulltext()
+        if fulltext is None or not isinstance(match, str):
+            return None
+        # Limit the lookup to the searched objects to stay within its limits
+        scope = {
+            f"{key}_id": context[key].pk
+            for key in ("project", "component", "translation")
+            if context.get(key) is not None
+        }
+        ids = fulltext.search(fields, match, **scope)
+        if ids is None:
+            return None
+        return Q(pk__in=ids)
+
     def as_sql(self, context: Dict):
         field = self.field
         match = self.match
         # Simple term based search
         if not field:
+            query = self.fulltext_query(("source", "target", "context"), match, context)
+            if query is not None:
+                return query
             return (
                 Q(source__substring=self.match)
                 | Q(target__substring=self.match)
                 | Q(context__substring=self.match)
             )
 
+        # Substring search in the full-text index
+        if field in PLAIN_FIELDS and self.operator == ":":
+            query = self.fulltext_query((field,), match, context)
+            if query is not None:
+                return query
+
         # Field specific code
         field_method = getattr(self, f"{field}_field", None)
         if field_method is not None:
@@ -483,11 +531,18 @@ def parser_to_query(obj, context: Dict):
 
 @lru_cache(maxsize=512)
 def parse_string(text):
+    """Parse query string.
+
+    The parsed result is cached and has to be context independent, context
+    is applied while building the query in parser_to_query.
+    """
     if "\x00" in text:
         raise ValueError("Invalid query string.")
     return QUERY.parse_string(text, parse_all=True)
 
 
 def parse_query(text, **context):
-    parsed = parse_string(text)
+    # Leading and trailing whitespace is insignificant, strip it to avoid
+    # polluting the parser cache
+    parsed = parse_string(text.strip())
     return parser_to_query(parsed, context)
@@ -17,6 +17,8 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import os
+from collections import defaultdict
 from copy import copy
 from datetime import timedelta
 from itertools import chain
@@ -25,19 +27,22 @@ from typing import Optional
 from uuid import uuid4
 
 import sentry_sdk
+from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Count, Q, Sum
+from django.db.models import Count, Exists, OuterRef, Q, Sum
 from django.db.models.functions import Length
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.functional import cached_property
 
-from weblate.checks.models import CHECKS
+from weblate.checks.models import CHECKS, Check
 from weblate.lang.models import Language
 from weblate.trans.filter import get_filter_choice
 from weblate.trans.util import translation_percent
+from weblate.utils.data import data_dir
 from weblate.utils.db import conditional_sum
+from weblate.utils.lock import WeblateLock
 from weblate.utils.state import (
     STATE_APPROVED,
     STATE_EMPTY,
@@ -96,6 +101,143 @@ def zero_stats(keys):
     return stats
 
 
+def annotate_unit_counts(queryset, distinct: bool = False):
+    """Annotate units with counts of related objects used in stats."""
+    return queryset.annotate(
+        active_checks_count=Count(
+            "check", filter=Q(check__dismissed=False), distinct=distinct
+        ),
+        dismissed_checks_count=Count(
+            "check", filter=Q(check__dismissed=True), distinct=distinct
+        ),
+        suggestion_count=Count("suggestion", distinct=distinct),
+        comment_count=Count(
+            "comment", filter=Q(comment__resolved=False), distinct=distinct
+        ),
+    )
+
+
+# Lookups on units annotated by annotate_unit_counts
+COUNT_LOOKUPS = {
+    "unlabeled": {"source_unit__labels__isnull": True},
+    "checks": {"active_checks_count__gt": 0},
+    "dismissed_checks": {"dismissed_checks_count__gt": 0},
+    "suggestions": {"suggestion_count__gt": 0},
+    "nosuggestions": {"suggestion_count": 0},
+    "comments": {"comment_count__gt": 0},
+}
+
+# Lookups on units annotated by annotate_unit_exists
+EXISTS_LOOKUPS = {
+    "unlabeled": {"has_labels": False},
+    "checks": {"has_active_checks": True},
+    "dismissed_checks": {"has_dismissed_checks": True},
+    "suggestions": {"has_suggestions": True},
+    "nosuggestions": {"has_suggestions": False},
+    "comments": {"has_comments": True},
+}
+
+
+def annotate_unit_exists(queryset):
+    """Annotate units with presence of related objects used in stats.
+
+    Unlike annotate_unit_counts this can be used in grouped queries.
+    """
+    from weblate.trans.models import Comment, Suggestion, Unit
+
+    return queryset.annotate(
+        has_active_checks=Exists(
+            Check.objects.filter(unit=OuterRef("pk"), dismissed=False)
+        ),
+        has_dismissed_checks=Exists(
+            Check.objects.filter(unit=OuterRef("pk"), dismissed=True)
+        ),
+        has_suggestions=Exists(Suggestion.objects.filter(unit=OuterRef("pk"))),
+        has_comments=Exists(
+            Comment.objects.filter(unit=OuterRef("pk"), resolved=False)
+        ),
+        has_labels=Exists(
+            Unit.labels.through.objects.filter(unit=OuterRef("source_unit"))
+        ),
+    )
+
+
+def get_basic_aggregates(lookups):
+    """Return aggregations calculating basic stats for units."""
+    conditions = {
+        "fuzzy": {"state": STATE_FUZZY},
+        "readonly": {"state": STATE_READONLY},
+        "translated": {"state__gte": STATE_TRANSLATED},
+        "todo": {"state__lt": STATE_TRANSLATED},
+        "nottranslated": {"state": STATE_EMPTY},
+        # Review workflow
+        "approved": {"state": STATE_APPROVED},
+        # Labels
+        "unlabeled": lookups["unlabeled"],
+        # Checks
+        "allchecks": lookups["checks"],
+        "translated_checks": {"state": STATE_TRANSLATED, **lookups["checks"]},
+        "dismissed_checks": lookups["dismissed_checks"],
+        # Suggestions
+        "suggestions": lookups["suggestions"],
+        "nosuggestions": {"state__lt": STATE_TRANSLATED, **lookups["nosuggestions"]},
+        "approved_suggestions": {
+            "state__gte": STATE_APPROVED,
+            **lookups["suggestions"],
+        },
+        # Comments
+        "comments": lookups["comments"],
+    }
+    result = {
+        "all": Count("id"),
+        "all_words": Sum("num_words"),
+        "all_chars": Sum(Length("source")),
+    }
+    for name, condition in conditions.items():
+        result[name] = conditional_sum(1, **condition)
+        result[f"{name}_words"] = conditional_sum("num_words", **condition)
+        result[f"{name}_chars"] = conditional_sum(Length("source"), **condition)
+    return result
+
+
+def get_unit_stats_keys(values):
+    """Return basic stats the unit is counted in.
+
+    This has to match conditions used in TranslationStats._prefetch_basic.
+    """
+    state = values["state"]
+    result = {"all"}
+    if state == STATE_FUZZY:
+        result.add("fuzzy")
+    if state == STATE_READONLY:
+        result.add("readonly")
+    if state >= STATE_TRANSLATED:
+        result.add("translated")
+    else:
+        result.add("todo")
+    if state == STATE_EMPTY:
+        result.add("nottranslated")
+    if state == STATE_APPROVED:
+        result.add("approved")
+    if not values["labels_count"]:
+        result.add("unlabeled")
+    if values["active_checks_count"]:
+        result.add("allchecks")
+        if state == STATE_TRANSLATED:
+            result.add("translated_checks")
+    if values["dismissed_checks_count"]:
+        result.add("dismissed_checks")
+    if values["suggestion_count"]:
+        result.add("suggestions")
+        if state >= STATE_APPROVED:
+            result.add("approved_suggestions")
+    elif state < STATE_TRANSLATED:
+        result.add("nosuggestions")
+    if values["comment_count"]:
+        result.add("comments")
+    return result
+
+
 def prefetch_stats(queryset):
     """Fetch stats from cache for a queryset."""
     # Force evaluating queryset/iterator, we need all objects
@@ -118,6 +260,30 @@ def prefetch_stats(queryset):
     return result
 
 
+def persist_stats_many(stats):
+    """Store basic stats for many objects in the database at once."""
+    from weblate.utils.models import StoredStats
+
+    StoredStats.objects.store_many(
+        {stats_obj.cache_key: stats_obj.get_basic_data() for stats_obj in stats}
+    )
+
+
+def save_stats_many(stats):
+    """Save stats for many objects at once."""
+    stats = list(stats)
+    cache.set_many(
+        {stats_obj.cache_key: stats_obj._data for stats_obj in stats}, 30 * 86400
+    )
+    persist_stats_many(stats)
+
+
+def store_translation_stats(translations):
+    """Calculate basic stats for translations and store all of them."""
+    translations = prefetch_stats(translations)
+    save_stats_many(translation.stats for translation in translations)
+
+
 class BaseStats:
     """Caching statistics calculator."""
 
@@ -177,15 +343,39 @@ class BaseStats:
 
     @staticmethod
     def prefetch_many(stats):
+        from weblate.utils.models import StoredStats
+
         lookup = {i.cache_key: i for i in stats if not i.is_loaded}
         if not lookup:
             return
         data = cache.get_many(lookup.keys())
+        missing = set(lookup.keys()) - set(data.keys())
+        if missing:
+            stored = StoredStats.objects.get_data(missing)
+            if stored:
+                cache.set_many(stored, 30 * 86400)
+                data.update(stored)
         for item, value in data.items():
             lookup[item].set_data(value)
         for item in set(lookup.keys()) - set(data.keys()):
             lookup[item].set_data({})
 
+        # Calculate missing stats in batches instead of one by one on access
+        pending = defaultdict(list)
+        for item in lookup.values():
+            if "all" not in item._data:
+                pending[item.__class__].append(item)
+        for stats_class, items in pending.items():
+            stats_class.prefetch_basic_many(items)
+
+    @classmethod
+    def prefetch_basic_many(cls, stats):
+        """Calculate missing basic stats for many objects.
+
+        By default these are calculated on demand for each object.
+        """
+        return
+
     @cached_property
     def has_review(self):
         return True
@@ -202,22 +392,54 @@ class BaseStats:
         if name not in self._data:
             was_pending = self._pending_save
             self._pending_save = True
-            if name in self.basic_keys:
+            recalculated = name in self.basic_keys
+            if recalculated:
                 self.prefetch_basic()
             else:
                 self.calculate_item(name)
             if not was_pending:
                 self.save()
+                if recalculated:
+                    persist_stats_many([self])
                 self._pending_save = False
         return self._data[name]
 
     def load(self):
-        return cache.get(self.cache_key, {})
+        from weblate.utils.models import StoredStats
+
+        result = cache.get(self.cache_key)
+        if result is None:
+            # Fallback to the persistent copy
+            result = StoredStats.objects.get_data([self.cache_key]).get(
+                self.cache_key, {}
+            )
+            if result:
+                cache.set(self.cache_key, result, 30 * 86400)
+        return result
 
     def save(self):
         """Save stats to cache."""
         cache.set(self.cache_key, self._data, 30 * 86400)
 
+    def get_basic_data(self):
+        """Return basic stats which are stored in the database."""
+        return {
+            key: value for key, value in self._data.items() if key in self.basic_keys
+        }
+
+    @staticmethod
+    def delete_keys(keys):
+        """
+        Invalidate stats in the cache and in the database.
+
+        Empty stats are stored instead of deleting the keys, this way the
+        database is not queried for the outdated stats.
+        """
+        from weblate.utils.models import StoredStats
+
+        cache.set_many(dict.fromkeys(keys, {}), 30 * 86400)
+        StoredStats.objects.filter(key__in=keys).delete()
+
     def get_invalidate_keys(
         self,
         language: Optional[Language] = None,
@@ -230,7 +452,7 @@ class BaseStats:
         """Invalidate local and cache data."""
         self.clear()
         keys = self.get_invalidate_keys(language, childs)
-        cache.delete_many(keys)
+        self.delete_keys(keys)
 
     def clear(self):
         """Clear local cache."""
@@ -257,6 +479,7 @@ class BaseStats:
             self.prefetch_basic()
             if save:
                 self.save()
+                persist_stats_many([self])
             return True
         return False
 
@@ -383,104 +606,158 @@ class TranslationStats(BaseStats):
     def has_review(self):
         return self._object.enable_review
 
+    @classmethod
+    def prefetch_basic_many(cls, stats):
+        """Calculate missing basic stats for translations using a single query.
+
+        The units of all translations are aggregated in a single grouped query
+        instead of doing an aggregation query for each translation.
+        """
+        from weblate.trans.models import Change, Unit
+
+        pending = {stats_obj.pk: stats_obj for stats_obj in stats}
+        with sentry_sdk.start_span(op="stats", description=f"ROLLUP {len(pending)}"):
+            values = (
+                annotate_unit_exists(Unit.objects.filter(translation_id__in=pending))
+                .values("translation_id")
+                .annotate(**get_basic_aggregates(EXISTS_LOOKUPS))
+                .order_by()
+            )
+            values = {item.pop("translation_id"): item for item in values}
+
+            # Last change timestamps
+            change_ids = cache.get_many([f"last-content-change-{pk}" for pk in pending])
+            changes = Change.objects.in_bulk(change_ids.values())
+
+            for pk, stats_obj in pending.items():
+                # Translations without units are missing in the result
+                for key, value in values.get(pk, zero_stats(BASIC_KEYS)).items():
+                    stats_obj.store(key, value)
+                stats_obj.store("languages", 1)
+                stats_obj.store("version", uuid4().hex)
+                change_id = change_ids.get(f"last-content-change-{pk}")
+                if change_id in changes:
+                    stats_obj.store_last_change(changes[change_id])
+                else:
+                    stats_obj.fetch_last_change()
+
+            save_stats_many(pending.values())
+
     def _prefetch_basic(self):
-        base = self._object.unit_set.annotate(
-            active_checks_count=Count("check", filter=Q(check__dismissed=False)),
-            dismissed_checks_count=Count("check", filter=Q(check__dismissed=True)),
-            suggestion_count=Count("suggestion"),
-            comment_count=Count("comment", filter=Q(comment__resolved=False)),
-        )
-        stats = base.aggregate(
-            all=Count("id"),
-            all_words=Sum("num_words"),
-            all_chars=Sum(Length("source")),
-            fuzzy=conditional_sum(1, state=STATE_FUZZY),
-            fuzzy_words=conditional_sum("num_words", state=STATE_FUZZY),
-            fuzzy_chars=conditional_sum(Length("source"), state=STATE_FUZZY),
-            readonly=conditional_sum(1, state=STATE_READONLY),
-            readonly_words=conditional_sum("num_words", state=STATE_READONLY),
-            readonly_chars=conditional_sum(Length("source"), state=STATE_READONLY),
-            translated=conditional_sum(1, state__gte=STATE_TRANSLATED),
-            translated_words=conditional_sum("num_words", state__gte=STATE_TRANSLATED),
-            translated_chars=conditional_sum(
-                Length("source"), state__gte=STATE_TRANSLATED
-            ),
-            todo=conditional_sum(1, state__lt=STATE_TRANSLATED),
-            todo_words=conditional_sum("num_words", state__lt=STATE_TRANSLATED),
-            todo_chars=conditional_sum(Length("source"), state__lt=STATE_TRANSLATED),
-            nottranslated=conditional_sum(1, state=STATE_EMPTY),
-            nottranslated_words=conditional_sum("num_words", state=STATE_EMPTY),
-            nottranslated_chars=conditional_sum(Length("source"), state=STATE_EMPTY),
-            # Review workflow
-            approved=conditional_sum(1, state=STATE_APPROVED),
-            approved_words=conditional_sum("num_words", state=STATE_APPROVED),
-            approved_chars=conditional_sum(Length("source"), state=STATE_APPROVED),
-            # Labels
-            unlabeled=conditional_sum(1, source_unit__labels__isnull=True),
-            unlabeled_words=conditional_sum(
-                "num_words", source_unit__labels__isnull=True
-            ),
-            unlabeled_chars=conditional_sum(
-                Length("source"), source_unit__labels__isnull=True
-            ),
-            # Checks
-            allchecks=conditional_sum(1, active_checks_count__gt=0),
-            allchecks_words=conditional_sum("num_words", active_checks_count__gt=0),
-            allchecks_chars=conditional_sum(
-                Length("source"), active_checks_count__gt=0
-            ),
-            translated_checks=conditional_sum(
-                1, state=STATE_TRANSLATED, active_checks_count__gt=0
-            ),
-            translated_checks_words=conditional_sum(
-                "num_words", state=STATE_TRANSLATED, active_checks_count__gt=0
-            ),
-            translated_checks_chars=conditional_sum(
-                Length("source"), state=STATE_TRANSLATED, active_checks_count__gt=0
-            ),
-            dismissed_checks=conditional_sum(1, dismissed_checks_count__gt=0),
-            dismissed_checks_words=conditional_sum(
-                "num_words", dismissed_checks_count__gt=0
-            ),
-            dismissed_checks_chars=conditional_sum(
-                Length("source"), dismissed_checks_count__gt=0
-            ),
-            # Suggestions
-            suggestions=conditional_sum(1, suggestion_count__gt=0),
-            suggestions_words=conditional_sum("num_words", suggestion_count__gt=0),
-            suggestions_chars=conditional_sum(Length("source"), suggestion_count__gt=0),
-            nosuggestions=conditional_sum(
-                1, state__lt=STATE_TRANSLATED, suggestion_count=0
-            ),
-            nosuggestions_words=conditional_sum(
-                "num_words", state__lt=STATE_TRANSLATED, suggestion_count=0
-            ),
-            nosuggestions_chars=conditional_sum(
-                Length("source"), state__lt=STATE_TRANSLATED, suggestion_count=0
-            ),
-            approved_suggestions=conditional_sum(
-                1, state__gte=STATE_APPROVED, suggestion_count__gt=0
-            ),
-            approved_suggestions_words=conditional_sum(
-                "num_words", state__gte=STATE_APPROVED, suggestion_count__gt=0
-            ),
-            approved_suggestions_chars=conditional_sum(
-                Length("source"), state__gte=STATE_APPROVED, suggestion_count__gt=0
-            ),
-            # Comments
-            comments=conditional_sum(1, comment_count__gt=0),
-            comments_words=conditional_sum("num_words", comment_count__gt=0),
-            comments_chars=conditional_sum(Length("source"), comment_count__gt=0),
-        )
+        base = annotate_unit_counts(self._object.unit_set)
+        stats = base.aggregate(**get_basic_aggregates(COUNT_LOOKUPS))
         for key, value in stats.items():
             self.store(key, value)
 
         # Calculate some values
         self.store("languages", 1)
+        self.store("version", uuid4().hex)
 
         # Last change timestamp
         self.fetch_last_change()
 
+    def get_unit_values(self, pk: int):
+        """Fetch unit values needed for incremental stats update.
+
+        Returns None if incremental updates are disabled.
+        """
+        if not settings.STATS_INCREMENTAL_LIMIT:
+            return None
+        return self.get_units_values([pk]).get(pk)
+
+    def get_units_values(self, pks):
+        """Fetch unit values needed for incremental stats update of many units."""
+        values = (
+            annotate_unit_counts(
+                self._object.unit_set.filter(pk__in=pks), distinct=True
+            )
+            .annotate(
+                labels_count=Count("source_unit__labels", distinct=True),
+                num_chars=Length("source"),
+            )
+            .values(
+                "pk",
+                "state",
+                "num_words",
+                "num_chars",
+                "labels_count",
+                "active_checks_count",
+                "dismissed_checks_count",
+                "suggestion_count",
+                "comment_count",
+            )
+        )
+        return {item.pop("pk"): item for item in values}
+
+    def apply_unit_values(self, values, sign: int):
+        for key in get_unit_stats_keys(values):
+            self._data[key] += sign
+            self._data[f"{key}_words"] += sign * values["num_words"]
+            self._data[f"{key}_chars"] += sign * values["num_chars"]
+
+    def get_lock(self):
+        lock_path = data_dir("home")
+        os.makedirs(lock_path, exist_ok=True)
+        return WeblateLock(
+            lock_path,
+            "translation-stats",
+            self._object.pk,
+            str(self._object.pk),
+            file_template=".{scope}-{key}.lock",
+            timeout=10,
+        )
+
+    def update_units(self, old_values):
+        """Update cached stats based on change of units.
+
+        The old_values is a dict of unit values prior to the change as returned
+        by get_unit_values. Only the difference between previous and current
+        unit state is applied to the cached stats. The stats are fully
+        recalculated once STATS_INCREMENTAL_LIMIT of incremental updates is
+        reached to avoid drifting from the database.
+        """
+        # Concurrent updates would otherwise overwrite each other
+        with self.get_lock():
+            data = self.load()
+            updates = data.get("incremental_updates", 0)
+            if (
+                not BASIC_KEYS.issubset(data)
+                or updates >= settings.STATS_INCREMENTAL_LIMIT
+            ):
+                self.invalidate()
+                return
+
+            # Derived items such as checks or labels are calculated on demand
+            self._data = {
+                key: value
+                for key, value in data.items()
+                if key in BASIC_KEYS or key == "version"
+            }
+            new_values = self.get_units_values(old_values.keys())
+            for pk, values in old_values.items():
+                self.apply_unit_values(values, -1)
+                # The unit might have been deleted meanwhile
+                if pk in new_values:
+                    self.apply_unit_values(new_values[pk], 1)
+            self._data["incremental_updates"] = updates + 1
+            self.fetch_last_change()
+
+            # Stats recalculated or invalidated meanwhile might already include
+            # the change
+            current = self.load()
+            if not BASIC_KEYS.issubset(current) or current.get("version") != data.get(
+                "version"
+            ):
+                self.invalidate()
+                return
+            self.save()
+            persist_stats_many([self])
+
+        # Parents are aggregated from the cached translation stats
+        keys = self.get_invalidate_keys()
+        keys.discard(self.cache_key)
+        self.delete_keys(keys)
+
     def get_last_change_obj(self):
         from weblate.trans.models import Change
 
@@ -500,8 +777,9 @@ class TranslationStats(BaseStats):
         return last_change
 
     def fetch_last_change(self):
-        last_change = self.get_last_change_obj()
+        self.store_last_change(self.get_last_change_obj())
 
+    def store_last_change(self, last_change):
         if last_change is None:
             self.store("last_changed", None)
             self.store("last_author", None)
@@ -691,6 +969,41 @@ class ComponentStats(LanguageStats):
     def save_lazy_translated_percent(self):
         cache.set(self.lazy_translated_percent_key, self.translated_percent, 30 * 86400)
 
+    @classmethod
+    def prefetch_basic_many(cls, stats):
+        """Calculate missing component stats based on stats for translations.
+
+        Translations of all components are fetched in a single query and their
+        stats are calculated in batch as well.
+        """
+        from weblate.trans.models import Translation
+
+        pending = {stats_obj.pk: stats_obj for stats_obj in stats}
+        for stats_obj in pending.values():
+            stats_obj.translation_set = []
+        translations = prefetch_stats(
+            Translation.objects.filter(component_id__in=pending).select_related(
+                "language"
+            )
+        )
+        for translation in translations:
+            stats_obj = pending[translation.component_id]
+            component = translation.component = stats_obj.obj
+            if translation.language_id == component.source_language_id:
+                component.__dict__["source_translation"] = translation
+            stats_obj.translation_set.append(translation)
+
+        for stats_obj in pending.values():
+            stats_obj.ensure_basic(save=False)
+        save_stats_many(pending.values())
+        cache.set_many(
+            {
+                stats_obj.lazy_translated_percent_key: stats_obj.translated_percent
+                for stats_obj in pending.values()
+            },
+            30 * 86400,
+        )
+
     def save(self):
         super().save()
         self.save_lazy_translated_percent()
@@ -878,6 +1191,40 @@ class ProjectLanguageStats(LanguageStats):
         super()._prefetch_basic()
         self.store("languages", 1)
 
+    @classmethod
+    def prefetch_basic_many(cls, stats):
+        """Calculate missing project language stats based on stats for translations.
+
+        Translations of all project languages are fetched in a single query and
+        their stats are calculated in batch as well.
+        """
+        from weblate.trans.models import Translation
+
+        pending = {}
+        components = {}
+        for stats_obj in stats:
+            stats_obj.translation_set = []
+            pending[stats_obj.project.pk, stats_obj.language.pk] = stats_obj
+            for component in stats_obj.component_set:
+                components[component.pk] = component
+        translations = prefetch_stats(
+            Translation.objects.filter(
+                component_id__in=components,
+                language_id__in={language_id for _project_id, language_id in pending},
+            )
+        )
+        for translation in translations:
+            component = translation.component = components[translation.component_id]
+            if translation.language_id == component.source_language_id:
+                component.__dict__["source_translation"] = translation
+            stats_obj = pending.get((component.project_id, translation.language_id))
+            if stats_obj is not None:
+                stats_obj.translation_set.append(translation)
+
+        for stats_obj in pending.values():
+            stats_obj.ensure_basic(save=False)
+        save_stats_many(pending.values())
+
     def get_single_language_stats(self, language):
         return self
 
@@ -26,6 +26,7 @@ from django.test import SimpleTestCase, TestCase
 from django.test.utils import override_settings
 
 from weblate.trans.tests.utils import TempDirMixin
+from weblate.utils.models import StoredStats
 
 
 class CommandTests(SimpleTestCase, TempDirMixin):
@@ -58,9 +59,20 @@ class CommandTests(SimpleTestCase, TempDirMixin):
         call_command("celery_queues", stdout=output)
         self.assertIn("celery:", output.getvalue())
 
+    def test_benchmark_search(self):
+        output = StringIO()
+        call_command("benchmark_search", "--count", "2", stdout=output)
+        self.assertIn("iterations per second", output.getvalue())
+
 
 class DBCommandTests(TestCase):
     def test_stats(self):
         output = StringIO()
         call_command("ensure_stats", stdout=output)
         self.assertEqual("", output.getvalue())
+
+    def test_stats_store(self):
+        output = StringIO()
+        call_command("ensure_stats", "--store", stdout=output)
+        self.assertEqual("", output.getvalue())
+        self.assertTrue(StoredStats.objects.filter(key="stats-global").exists())
@@ -22,12 +22,14 @@ from time import sleep
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.messages.storage import default_storage
 from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.cache import cache
 from django.http.request import HttpRequest
 from django.test import SimpleTestCase
 from django.test.utils import override_settings
 
 from weblate.auth.models import User
 from weblate.utils.ratelimit import (
+    TokenBucket,
     check_rate_limit,
     reset_rate_limit,
     revert_rate_limit,
@@ -122,3 +124,32 @@ class RateLimitUserTest(RateLimitTest):
         request = super().get_request()
         request.user = User()
         return request
+
+
+class TokenBucketTest(SimpleTestCase):
+    def setUp(self):
+        cache.delete("test-bucket")
+
+    def test_burst(self):
+        bucket = TokenBucket("test-bucket", 3, 3600)
+        for _unused in range(3):
+            self.assertTrue(bucket.acquire())
+        self.assertFalse(bucket.acquire())
+        # Rejected request does not consume the token
+        self.assertLess(bucket.reserve(), 1201)
+
+    def test_idle(self):
+        bucket = TokenBucket("test-bucket", 3, 3600)
+        # Counter left behind long time ago
+        cache.set("test-bucket", 0, None)
+        # Concurrent caller reserved meanwhile, but did not move the counter yet
+        cache.incr("test-bucket")
+        for _unused in range(3):
+            self.assertTrue(bucket.acquire())
+        self.assertFalse(bucket.acquire())
+
+    def test_wait(self):
+        bucket = TokenBucket("test-bucket", 1, 0.2)
+        self.assertTrue(bucket.acquire())
+        self.assertFalse(bucket.acquire())
+        self.assertTrue(bucket.acquire(max_wait=1))
@@ -0,0 +1,45 @@
+#
+# Copyright © 2012–2022 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import time
+from unittest import TestCase
+
+from weblate.utils.requests import REQUEST_DEADLINE, DeadlineRetry
+
+
+class RetryTest(TestCase):
+    def test_methods(self):
+        retry = DeadlineRetry(total=2, status_forcelist=(502,))
+        self.assertTrue(retry.is_retry("GET", 502))
+        # Non-idempotent requests are not repeated on server errors
+        self.assertFalse(retry.is_retry("POST", 502))
+
+    def test_deadline(self):
+        retry = DeadlineRetry(total=2)
+        self.assertFalse(retry.is_exhausted())
+        token = REQUEST_DEADLINE.set(time.monotonic() - 1)
+        try:
+            self.assertTrue(retry.is_exhausted())
+        finally:
+            REQUEST_DEADLINE.reset(token)
+        token = REQUEST_DEADLINE.set(time.monotonic() + 10)
+        try:
+            self.assertFalse(retry.is_exhausted())
+        finally:
+            REQUEST_DEADLINE.reset(token)
@@ -27,7 +27,7 @@ from weblate.trans.models import Change, Unit
 from weblate.trans.tests.test_views import ViewTestCase
 from weblate.trans.util import PLURAL_SEPARATOR
 from weblate.utils.db import using_postgresql
-from weblate.utils.search import Comparer, parse_query
+from weblate.utils.search import Comparer, parse_query, parse_string
 from weblate.utils.state import (
     STATE_APPROVED,
     STATE_EMPTY,
@@ -49,6 +49,16 @@ class ComparerTest(SimpleTestCase):
         # for unicode strings
         self.assertEqual(Comparer().similarity("NICHOLASŸ", "NICHOLAS"), 88)
 
+    def test_many(self):
+        comparer = Comparer()
+        candidates = ["a", "b", "ab", "NICHOLAS"]
+        self.assertEqual(
+            comparer.similarity_many("a", candidates),
+            [comparer.similarity("a", candidate) for candidate in candidates],
+        )
+        self.assertEqual(comparer.similarity_many("a", candidates, 60), [100, 0, 0, 0])
+        self.assertEqual(comparer.similarity_many("a", []), [])
+
 
 class SearchMixin:
     def assert_query(self, string, expected, exists=False, **context):
@@ -135,6 +145,12 @@ class QueryParserTest(TestCase, SearchMixin):
     def test_empty(self):
         self.assert_query("", Q())
 
+    def test_cache(self):
+        parse_string.cache_clear()
+        self.assert_query("source:hello", Q(source__substring="hello"))
+        self.assert_query(" source:hello ", Q(source__substring="hello"))
+        self.assertEqual(parse_string.cache_info().hits, 1)
+
     def test_invalid(self):
         with self.assertRaises(ValueError):
             self.assert_query(
@@ -46,11 +46,13 @@ from weblate.configuration.models import Setting
 from weblate.configuration.views import CustomCSSView
 from weblate.trans.forms import AnnouncementForm
 from weblate.trans.models import Alert, Announcement, Component, Project
+from weblate.trans.tasks import get_stats_update_counters
 from weblate.trans.util import redirect_param
 from weblate.utils import messages
 from weblate.utils.celery import get_queue_stats
 from weblate.utils.checks import measure_cache_latency, measure_database_latency
 from weblate.utils.errors import report_error
+from weblate.utils.requests import get_connection_counters
 from weblate.utils.tasks import database_backup, settings_backup
 from weblate.utils.version import GIT_LINK, GIT_REVISION
 from weblate.utils.views import show_form_errors
@@ -280,6 +282,8 @@ def performance(request):
         "celery_latency": cache.get("celery_latency"),
         "database_latency": measure_database_latency(),
         "cache_latency": measure_cache_latency(),
+        "stats_updates": get_stats_update_counters(),
+        "http_connections": get_connection_counters(),
     }
 
     return render(request, "manage/performance.html", context)